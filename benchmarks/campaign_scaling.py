@@ -0,0 +1,117 @@
+"""
+Measures how the per-campaign queries scale with the number of campaigns.
+
+    python benchmarks/campaign_scaling.py --campaigns 100 1000 5000
+
+Runs against a throwaway test database (like manage.py test), fills it
+with more and more campaigns and times the queries of one campaign after
+each step. The latency should stay about the same as the tables grow.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import django
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stonetop_site.settings')
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from campaign.models import (
+    Campaign, Character, NPCInstance, FollowerInstance,
+    InventoryItem, ItemInstance,
+)
+
+
+CHARACTERS = 5
+NPCS = 20
+ITEMS = 20
+
+
+def add_campaigns(user, items, start, stop):
+    campaigns = Campaign.objects.bulk_create([
+        Campaign(gm=user, name=f'Campaign {i}', code=f'{i}', status='Open') for i in range(start, stop)
+    ])
+    characters = Character.objects.bulk_create([
+        Character(player=user, campaign=campaign, character_name=f'Character {i}')
+        for campaign in campaigns for i in range(CHARACTERS)
+    ])
+    npcs = NPCInstance.objects.bulk_create([
+        NPCInstance(
+            player=user, campaign=campaign, character_name=f'npc {i:03d}',
+            max_hp=6, damage='d6', instinct='To protect',
+        )
+        for campaign in campaigns for i in range(NPCS)
+    ])
+    FollowerInstance.objects.bulk_create([
+        FollowerInstance(npc_instance=npc, character=characters[i // NPCS * CHARACTERS], campaign=npc.campaign)
+        for i, npc in enumerate(npcs) if i % NPCS < CHARACTERS
+    ])
+    ItemInstance.objects.bulk_create([
+        ItemInstance(item=items[i % len(items)], character=character, outfitted=i % 2 == 0)
+        for character in characters for i in range(ITEMS)
+    ], batch_size=5000)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def time_query(queryset, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        list(queryset.all())
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def per_campaign_queries(campaign):
+    character = Character.objects.filter(campaign=campaign).order_by('id')[0]
+    return {
+        'characters': Character.objects.filter(campaign=campaign),
+        'npc search': NPCInstance.objects.filter(campaign=campaign, character_name__istartswith='NPC 01'),
+        'followers': FollowerInstance.objects.filter(campaign=campaign).values_list('npc_instance_id', flat=True),
+        'inventory': ItemInstance.objects.filter(character=character, outfitted=True).select_related('item'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--campaigns', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--runs', type=int, default=200, help='Runs per query (the median is shown).')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        user = get_user_model().objects.create_user(username='benchmark', email='benchmark@example.com', password='benchmark')
+        items = InventoryItem.objects.bulk_create([
+            InventoryItem(name=f'Item {i}', weight=1, default_item=True) for i in range(50)
+        ])
+
+        results = []
+        count = 0
+        for total in sorted(args.campaigns):
+            add_campaigns(user, items, count, total)
+            count = total
+            queries = per_campaign_queries(Campaign.objects.order_by('id')[0])
+            results.append((total, {name: time_query(qs, args.runs) for name, qs in queries.items()}))
+
+        names = list(results[0][1])
+        print('campaigns  ' + ''.join(f'{name:>14}' for name in names))
+        for total, timings in results:
+            print(f'{total:>9}  ' + ''.join(f'{timings[name]:>11.3f} ms' for name in names))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == '__main__':
+    main()
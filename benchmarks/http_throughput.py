@@ -0,0 +1,74 @@
+"""
+Measures the request throughput of a running server.
+
+    python benchmarks/http_throughput.py http://127.0.0.1:8000/campaigns/ --concurrency 8 --requests 2000
+
+Each client thread keeps its own keep-alive connection open. Pass
+--sessionid to benchmark pages that need a logged in user.
+"""
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def run_client(url, count, headers, timings, errors):
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path += f'?{parts.query}'
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+            if response.getheader('Connection', '').lower() == 'close':
+                connection.close()
+        except (OSError, http.client.HTTPException) as error:
+            errors.append(error)
+            connection.close()
+        timings.append(time.perf_counter() - start)
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=1000, help='Total number of requests.')
+    parser.add_argument('--sessionid', help='Value of the sessionid cookie to send.')
+    args = parser.parse_args()
+
+    headers = {'Connection': 'keep-alive'}
+    if args.sessionid:
+        headers['Cookie'] = f'sessionid={args.sessionid}'
+
+    timings = []
+    errors = []
+    per_client = args.requests // args.concurrency
+    clients = [
+        threading.Thread(target=run_client, args=(args.url, per_client, headers, timings, errors))
+        for _ in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+
+    timings.sort()
+    print(f'requests:    {len(timings)} ({len(errors)} errors)')
+    print(f'throughput:  {len(timings) / elapsed:.1f} req/s')
+    print(f'latency p50: {statistics.median(timings) * 1000:.1f} ms')
+    print(f'latency p95: {timings[int(len(timings) * 0.95) - 1] * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -25,7 +25,8 @@ from .models import (
     TheRanger, TheSeeker, TheWouldBeHero,
     GameMasterMoves, NonPlayerCharacter,
     NPCInstance, FollowerInstance,
-    InventoryItem, ItemInstance 
+    InventoryItem, ItemInstance,
+    CampaignEvent, CharacterSnapshot,
 )
 
 from django_summernote.admin import SummernoteModelAdmin
@@ -33,6 +34,7 @@ from django_summernote.admin import SummernoteModelAdmin
 
 class BackgroundAdmin(SummernoteModelAdmin):
     summernote_fields = ('description', 'description2', 'description3')
+    prepopulated_fields = {'slug': ('background',)}
 
 
 class MovesAdmin(SummernoteModelAdmin):
@@ -57,6 +59,7 @@ class InvocationAdmin(SummernoteModelAdmin):
 
 class MajorArcanumAdmin(SummernoteModelAdmin):
     summernote_fields = ('description1', 'description2', 'description3')
+    prepopulated_fields = {'slug': ('name',)}
 
 
 class MinorArcanumAdmin(SummernoteModelAdmin):
@@ -86,6 +89,7 @@ class InventoryItemAdmin(admin.ModelAdmin):
 @admin.register(Tags)
 class TagsAdmin(admin.ModelAdmin):
     search_fields = ['name']
+    prepopulated_fields = {'slug': ('name',)}
 
 
 @admin.register(DefaultNPC)
@@ -174,4 +178,6 @@ admin.site.register(ArcanaMoveExtras)
 admin.site.register(MajorArcanum, MajorArcanumAdmin)
 admin.site.register(MajorArcanaInstance)
 admin.site.register(MinorArcanum, MinorArcanumAdmin)
-admin.site.register(MinorArcanaInstance)
\ No newline at end of file
+admin.site.register(MinorArcanaInstance)
+admin.site.register(CampaignEvent)
+admin.site.register(CharacterSnapshot)
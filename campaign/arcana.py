@@ -0,0 +1,248 @@
+"""
+How a character progresses with their arcana: which tasks there are and
+which moves and consequences they can take next.
+
+Every arcanum's tasks, moves and consequences, and the move or consequence
+each of them requires, are compiled once per catalog version into an
+ArcanaGraph, so the update forms need no queries for them. Progress is
+then worked out in memory from an instance's marks and what it has taken:
+
+    rules = get_arcana_graph().major[arcana_id]
+    progress = rules.progress(marks, task_ids, move_ids, consequence_ids)
+    progress.moves, progress.consequences
+
+A move can be unlocked once
+- every task of the arcanum is done,
+- its marks track is full (when it has one),
+- the move it requires has been unlocked.
+A consequence can be taken once the consequence it requires has been.
+Minor arcana have no requirements, their moves unlock like a major
+arcanum's move that requires none.
+
+Unlocking moves writes an ArcanaMoveInstance for each of them with one
+INSERT for every instance at once:
+
+    unlock_moves([(arcana_instance, [arcana_move_id, ...]), ...])
+"""
+import logging
+from collections import namedtuple
+
+from django.db import transaction
+
+from campaign.catalog import get_catalog
+from campaign.models import (
+    MajorArcanum, MinorArcanum, MajorArcanaTasks, MinorArcanaTasks,
+    ArcanaMoves, ArcanaConsequences, MinorArcanaMoves,
+    MajorArcanaInstance, ArcanaMoveInstance,
+)
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+ArcanaMoveRule = namedtuple('ArcanaMoveRule', [
+    'id', 'name', 'description', 'total_charges', 'charge_name', 'requires',
+])
+ConsequenceRule = namedtuple('ConsequenceRule', ['id', 'description', 'requires'])
+MinorMoveRule = namedtuple('MinorMoveRule', ['id', 'description', 'requires'])
+
+# tasks_done and track_full say whether moves can be unlocked at all,
+# moves and consequences are the ids that can be taken next
+Progress = namedtuple('Progress', ['tasks_done', 'track_full', 'moves', 'consequences'])
+
+_graph = None
+
+
+def prerequisite_order(rules):
+    """
+    The rules' ids ordered so each comes after the one it requires.
+    Rules whose requirements loop back on themselves can never be taken,
+    so they are left out.
+    """
+    dependents = {}
+    waiting = {}
+    for pk, rule in rules.items():
+        if rule.requires is None:
+            continue
+        waiting[pk] = 1
+        if rule.requires in rules and rule.requires != pk:
+            dependents.setdefault(rule.requires, []).append(pk)
+    order = [pk for pk in rules if pk not in waiting]
+    for pk in order:
+        for dependent in dependents.get(pk, []):
+            waiting[dependent] -= 1
+            if not waiting[dependent]:
+                order.append(dependent)
+    if len(order) < len(rules):
+        logger.warning(
+            'Arcana rules %s require each other and are left out',
+            sorted(pk for pk in rules if waiting.get(pk)),
+        )
+    return order
+
+
+class ArcanumRules(object):
+    """
+    The compiled rules of one arcanum.
+    tasks are (id, description) pairs, moves and consequences map ids to
+    their rule, in prerequisite order.
+    """
+    def __init__(self, total_marks, tasks, moves, consequences=None):
+        self.total_marks = total_marks
+        self.tasks = tasks
+        self.moves = {pk: moves[pk] for pk in prerequisite_order(moves)}
+        consequences = consequences or {}
+        self.consequences = {pk: consequences[pk] for pk in prerequisite_order(consequences)}
+
+    def progress(self, marks, task_ids, move_ids=(), consequence_ids=()):
+        tasks_done = {pk for pk, _ in self.tasks} <= set(task_ids)
+        track_full = not self.total_marks or (marks or 0) >= self.total_marks
+        return Progress(
+            tasks_done, track_full,
+            self.unlockable(self.moves, move_ids) if tasks_done and track_full else [],
+            self.unlockable(self.consequences, consequence_ids),
+        )
+
+    def unlockable(self, rules, taken_ids):
+        taken = set(taken_ids)
+        return [
+            pk for pk, rule in rules.items()
+            if pk not in taken and (rule.requires is None or rule.requires in taken)
+        ]
+
+    def errors(self, marks, task_ids, move_ids, consequence_ids, taken_move_ids=()):
+        """
+        The reasons the moves and consequences can't all be taken together
+        with the tasks and marks (move_ids includes the moves taken before,
+        taken_move_ids).
+        """
+        errors = []
+        progress = self.progress(marks, task_ids)
+        new_move_ids = [pk for pk in self.moves if pk in set(move_ids) - set(taken_move_ids)]
+        if new_move_ids and not progress.tasks_done:
+            errors.append('Every task has to be done before a move can be unlocked.')
+        if new_move_ids and not progress.track_full:
+            errors.append(f'All {self.total_marks} marks are needed before a move can be unlocked.')
+        for label, rules, chosen in (
+            ('move', self.moves, move_ids), ('consequence', self.consequences, consequence_ids),
+        ):
+            chosen = set(chosen)
+            for pk, rule in rules.items():
+                if pk in chosen and rule.requires is not None and rule.requires not in chosen:
+                    required = rules.get(rule.requires)
+                    errors.append(
+                        f'{self.label(rule)} requires {self.label(required) if required else f"another {label}"}.'
+                    )
+        return errors
+
+    def label(self, rule):
+        return rule.name if isinstance(rule, ArcanaMoveRule) else f'"{rule.description}"'
+
+
+class ArcanaGraph(object):
+    """
+    The compiled rules of every arcanum: major and minor map arcanum ids
+    to their ArcanumRules.
+    """
+    def __init__(self, major, minor):
+        self.major = major
+        self.minor = minor
+
+    @classmethod
+    def compile(cls, version=None):
+        major_tasks = {}
+        for pk, arcana_id, description in MajorArcanaTasks.objects.values_list(
+            'id', 'arcana_id', 'description',
+        ).order_by('id'):
+            major_tasks.setdefault(arcana_id, []).append((pk, description))
+        moves = {}
+        for pk, arcana_id, name, description, total_charges, charge_name, requires in ArcanaMoves.objects.values_list(
+            'id', 'arcana_id', 'name', 'description', 'total_charges', 'charge_name',
+            'move_requirements__required_move_id',
+        ).order_by('id'):
+            moves.setdefault(arcana_id, {})[pk] = ArcanaMoveRule(
+                pk, name, description, total_charges, charge_name, requires,
+            )
+        consequences = {}
+        for pk, arcana_id, description, requires in ArcanaConsequences.objects.values_list(
+            'id', 'arcana_id', 'description', 'consequence_requirements__required_consequence_id',
+        ).order_by('id'):
+            consequences.setdefault(arcana_id, {})[pk] = ConsequenceRule(pk, description, requires)
+        major = {
+            pk: ArcanumRules(
+                total_marks, major_tasks.get(pk, []), moves.get(pk, {}), consequences.get(pk, {}),
+            )
+            for pk, total_marks in MajorArcanum.objects.values_list('id', 'total_marks')
+        }
+
+        minor_tasks = {}
+        for pk, arcana_id, description in MinorArcanaTasks.objects.values_list(
+            'id', 'arcana_id', 'description',
+        ).order_by('id'):
+            minor_tasks.setdefault(arcana_id, []).append((pk, description))
+        minor_moves = {}
+        for pk, arcana_id, description in MinorArcanaMoves.objects.values_list(
+            'id', 'arcana_id', 'description',
+        ).order_by('id'):
+            minor_moves.setdefault(arcana_id, {})[pk] = MinorMoveRule(pk, description, None)
+        minor = {
+            pk: ArcanumRules(total_marks, minor_tasks.get(pk, []), minor_moves.get(pk, {}))
+            for pk, total_marks in MinorArcanum.objects.values_list('id', 'total_marks')
+        }
+        graph = cls(major, minor)
+        graph.version = version
+        return graph
+
+
+def get_arcana_graph():
+    """
+    Returns the arcana graph, compiling it again whenever the catalog
+    snapshot has been rebuilt (the rules changed, possibly in another process).
+    """
+    global _graph
+    catalog = get_catalog()
+    version = (catalog.path, catalog.modified)
+    if _graph is None or _graph.version != version:
+        _graph = ArcanaGraph.compile(version)
+    return _graph
+
+
+def taken_move_ids(instance):
+    """
+    The ids of the ArcanaMoves a major arcana instance has unlocked.
+    """
+    return list(MajorArcanaInstance.moves.through.objects.filter(
+        majorarcanainstance_id=instance.pk,
+    ).values_list('arcanamoveinstance__arcana_move_id', flat=True))
+
+
+def unlock_moves(unlocks):
+    """
+    Adds the ArcanaMoves to the major arcana instances, unlocks being
+    (instance, arcana move ids) pairs that have been checked with
+    ArcanumRules.errors(). One INSERT for the move instances and one for
+    the links, however many instances and moves there are.
+    """
+    unlocks = [(instance, list(move_ids)) for instance, move_ids in unlocks if move_ids]
+    if not unlocks:
+        return []
+    with transaction.atomic():
+        move_instances = ArcanaMoveInstance.objects.bulk_create([
+            ArcanaMoveInstance(arcana_move_id=move_id)
+            for _, move_ids in unlocks
+            for move_id in move_ids
+        ], batch_size=BATCH_SIZE)
+        links = []
+        created = iter(move_instances)
+        Link = MajorArcanaInstance.moves.through
+        for instance, move_ids in unlocks:
+            for _ in move_ids:
+                links.append(Link(majorarcanainstance_id=instance.pk, arcanamoveinstance_id=next(created).pk))
+        Link.objects.bulk_create(links, batch_size=BATCH_SIZE)
+    return move_instances
+
+
+def clear():
+    global _graph
+    _graph = None
@@ -0,0 +1,491 @@
+"""
+Read-only snapshot of the rules catalog (moves, backgrounds, arcana, items...).
+
+The catalog is written once to a compact binary file and memory-mapped by
+every worker, so the pages are shared between processes and lookups by id,
+playbook, or name don't need to query the database.
+
+File layout (all integers little-endian):
+    header | section directory | records | name indexes | playbook indexes | string table
+
+Each record is the object id followed by one slot per field: an int64 for
+integer fields or an (offset, length) pair into the string table for text.
+"""
+import bisect
+import mmap
+import os
+import struct
+import time
+import zlib
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection
+
+from campaign.models import (
+    Background, Instinct, AppearanceAttribute,
+    SpecialPossessions, Moves,
+    MajorArcanum, MinorArcanum,
+    InventoryItem, SmallItem,
+    MoveRequirements, StatRequirement, MajorArcanaTasks, MinorArcanaTasks,
+    PlaceOfOrigin, RemarkableTraits, DanuOfferings, HistoryOfViolence,
+    SymbolOfAuthority, TheChronical, DemandsOfAratis,
+    HeliorWorship, LightbearerPredecessor, FearAndAnger,
+    ArcanaMoves, ArcanaMoveRequirements, ArcanaConsequences, ArcanaConsequenceRequirements,
+    MinorArcanaMoves,
+)
+from campaign.values import (
+    BackgroundValue, InstinctValue, AppearanceAttributeValue,
+    SpecialPossessionValue, MoveValue,
+    MajorArcanumValue, MinorArcanumValue,
+    ItemValue, SmallItemValue,
+)
+
+
+MAGIC = b'STCATLOG'
+FORMAT_VERSION = 2
+
+PLAYBOOK_LOOKUP = 'character_class__class_name'
+
+# Field kinds (anything not listed is text):
+#   'i' integer, 'b' boolean, 'r' the str() of a related object,
+#   ('m', lookup, order) a tuple of strings from a many-to-many or reverse relation
+ARCANA_TAGS = ('m', 'tags__name', 'tags__name')
+
+# section name: (model, value class, playbook lookup, field kinds)
+SECTIONS = {
+    'backgrounds': (Background, BackgroundValue, PLAYBOOK_LOOKUP, {
+        'total_charges': 'i',
+    }),
+    'instincts': (Instinct, InstinctValue, PLAYBOOK_LOOKUP, {}),
+    'appearance_attributes': (AppearanceAttribute, AppearanceAttributeValue, PLAYBOOK_LOOKUP, {}),
+    'special_possessions': (SpecialPossessions, SpecialPossessionValue, PLAYBOOK_LOOKUP, {
+        'total_uses': 'i', 'is_follower': 'b',
+    }),
+    'moves': (Moves, MoveValue, PLAYBOOK_LOOKUP, {
+        'take_move_limit': 'i', 'total_uses': 'i', 'total_charges': 'i',
+        'move_requirements': 'r',
+    }),
+    'major_arcana': (MajorArcanum, MajorArcanumValue, None, {
+        'weight': 'i', 'armor': 'i', 'total_marks': 'i', 'total_charges': 'i',
+        'tags': ARCANA_TAGS,
+        'tasks': ('m', 'majorarcanatasks__description', 'majorarcanatasks__id'),
+    }),
+    'minor_arcana': (MinorArcanum, MinorArcanumValue, None, {
+        'weight': 'i', 'armor': 'i', 'total_marks': 'i', 'total_charges': 'i',
+        'tags': ARCANA_TAGS,
+        'tasks': ('m', 'minorarcanatasks__description', 'minorarcanatasks__id'),
+    }),
+    'items': (InventoryItem, ItemValue, None, {
+        'weight': 'i', 'total_uses': 'i', 'armor': 'i',
+    }),
+    'small_items': (SmallItem, SmallItemValue, None, {
+        'total_uses': 'i', 'armor': 'i',
+    }),
+}
+
+# Models that the snapshot is built from (used to know when to rebuild it)
+CATALOG_MODELS = [section[0] for section in SECTIONS.values()] + [
+    # Tags are left out: players create them all the time, and they only reach
+    # the snapshot through the arcana they are on (see campaign.signals.tag_changed)
+    MoveRequirements, MajorArcanaTasks, MinorArcanaTasks,
+    # Not in the snapshot, but the move graph (campaign.eligibility) is built from it
+    StatRequirement,
+    # Not in the snapshot either, the character generator (campaign.generator) is built from them
+    PlaceOfOrigin, RemarkableTraits, DanuOfferings, HistoryOfViolence,
+    SymbolOfAuthority, TheChronical, DemandsOfAratis,
+    HeliorWorship, LightbearerPredecessor, FearAndAnger,
+    # Nor are the arcana moves and consequences (campaign.arcana)
+    ArcanaMoves, ArcanaMoveRequirements, ArcanaConsequences, ArcanaConsequenceRequirements,
+    MinorArcanaMoves,
+]
+CATALOG_M2M_THROUGH = [
+    Moves.character_class.through,
+    Moves.playbook_access.through,
+    AppearanceAttribute.character_class.through,
+    SpecialPossessions.character_class.through,
+    MajorArcanum.tags.through,
+    MinorArcanum.tags.through,
+]
+
+# Changes whenever a section or field is added, so old files get rebuilt
+SCHEMA_VERSION = zlib.crc32(repr(
+    [(name, s[1]._fields, s[2], sorted(s[3].items())) for name, s in SECTIONS.items()]
+).encode())
+
+HEADER = struct.Struct('<8sIIIIq')  # magic, format, schema, sections, string table offset, built at
+SECTION = struct.Struct('<32sIIIII')  # name, record count, records, name index, playbooks, playbook count
+PLAYBOOK = struct.Struct('<IIII')  # name offset, name length, indexes offset, index count
+INDEX = struct.Struct('<I')
+
+INT_NULL = -2 ** 63
+STR_NULL = 0xFFFFFFFF
+# Separates the strings of a many-to-many field
+LIST_SEPARATOR = '\x1f'
+
+
+class CatalogSnapshotError(Exception):
+    """
+    Raised when a snapshot file is missing, corrupt, or out of date.
+    """
+
+
+def _kinds(section):
+    """
+    Returns the (field, kind) pairs of a section's value class, without the id.
+    """
+    value_class, kinds = SECTIONS[section][1], SECTIONS[section][3]
+    return [(field, kinds.get(field, 's')) for field in value_class._fields[1:]]
+
+
+def _record_struct(section):
+    fmt = '<q' + ''.join('q' if kind in ('i', 'b') else 'II' for _, kind in _kinds(section))
+    return struct.Struct(fmt)
+
+
+def _catalog_queryset(model):
+    # Rebuilt from the primary: a lagging replica would bake in the old rules
+    queryset = model.objects.using(DEFAULT_DB_ALIAS)
+    if model in (InventoryItem, SmallItem):
+        # Only the default items are part of the rules catalog
+        queryset = queryset.filter(default_item=True)
+    return queryset
+
+
+def _section_rows(section):
+    """
+    Returns the rows of a section in id order, one value per field.
+    """
+    model = SECTIONS[section][0]
+    queryset = _catalog_queryset(model)
+    kinds = _kinds(section)
+    rows = {
+        row[0]: list(row[1:]) for row in queryset.order_by('id').values_list(
+            'id', *[field for field, kind in kinds if not isinstance(kind, tuple)]
+        )
+    }
+    columns = [field for field, kind in kinds if not isinstance(kind, tuple)]
+    for field, kind in kinds:
+        if kind == 'r':
+            related = model._meta.get_field(field).related_model
+            labels = {obj.pk: str(obj) for obj in related.objects.using(DEFAULT_DB_ALIAS).select_related()}
+            column = columns.index(field)
+            for row in rows.values():
+                row[column] = labels.get(row[column])
+    # The many-to-many strings are added after, in field order
+    for position, (field, kind) in enumerate(kinds):
+        if isinstance(kind, tuple):
+            _, lookup, order = kind
+            lists = {}
+            for pk, value in queryset.filter(**{f'{lookup}__isnull': False}).order_by(
+                'id', order
+            ).values_list('id', lookup):
+                lists.setdefault(pk, []).append(value)
+            for pk, row in rows.items():
+                row.insert(position, LIST_SEPARATOR.join(lists.get(pk, [])))
+    return [(pk, *row) for pk, row in rows.items()]
+
+
+def build_snapshot(path):
+    """
+    Writes the catalog snapshot to path and returns the number of records.
+    The file is written to a temporary file first and then moved into place,
+    so workers never map a half written snapshot.
+    """
+    strings = bytearray()
+    string_offsets = {}
+
+    def add_string(value):
+        if value is None:
+            return 0, STR_NULL
+        data = str(value).encode('utf-8')
+        if data not in string_offsets:
+            string_offsets[data] = len(strings)
+            strings.extend(data)
+        return string_offsets[data], len(data)
+
+    sections = []
+    for section_name, (model, value_class, playbook_lookup, _) in SECTIONS.items():
+        record_struct = _record_struct(section_name)
+        kinds = _kinds(section_name)
+        rows = _section_rows(section_name)
+        records = bytearray()
+        for row in rows:
+            values = [row[0]]
+            for (field, kind), value in zip(kinds, row[1:]):
+                if kind in ('i', 'b'):
+                    values.append(INT_NULL if value is None else int(value))
+                else:
+                    values.extend(add_string(value))
+            records.extend(record_struct.pack(*values))
+
+        # Record positions sorted by name (then id)
+        name_position = value_class._fields.index(value_class.name_field)
+        by_name = sorted(range(len(rows)), key=lambda i: (rows[i][name_position] or '', rows[i][0]))
+        name_index = b''.join(INDEX.pack(i) for i in by_name)
+
+        # Record positions for each playbook, also sorted by name
+        playbooks = {}
+        if playbook_lookup:
+            positions = {row[0]: i for i, row in enumerate(rows)}
+            pairs = _catalog_queryset(model).filter(
+                **{f'{playbook_lookup}__isnull': False}
+            ).values_list('id', playbook_lookup)
+            for pk, class_name in pairs:
+                if pk in positions:
+                    playbooks.setdefault(class_name, []).append(positions[pk])
+            rank = {position: i for i, position in enumerate(by_name)}
+            for class_name in playbooks:
+                playbooks[class_name] = sorted(set(playbooks[class_name]), key=rank.get)
+        sections.append((section_name, len(rows), bytes(records), name_index, playbooks))
+
+    # Lay out the file now that the sizes are known
+    offset = HEADER.size + SECTION.size * len(sections)
+    body = bytearray()
+    directory = bytearray()
+    for section_name, count, records, name_index, playbooks in sections:
+        records_offset = offset + len(body)
+        body.extend(records)
+        name_index_offset = offset + len(body)
+        body.extend(name_index)
+
+        index_arrays = bytearray()
+        entries = bytearray()
+        entries_size = PLAYBOOK.size * len(playbooks)
+        playbook_offset = offset + len(body)
+        for class_name, positions in sorted(playbooks.items()):
+            name_offset, name_length = add_string(class_name)
+            entries.extend(PLAYBOOK.pack(
+                name_offset, name_length,
+                playbook_offset + entries_size + len(index_arrays), len(positions),
+            ))
+            index_arrays.extend(b''.join(INDEX.pack(i) for i in positions))
+        body.extend(entries)
+        body.extend(index_arrays)
+
+        directory.extend(SECTION.pack(
+            section_name.encode(), count, records_offset,
+            name_index_offset, playbook_offset, len(playbooks),
+        ))
+
+    string_table_offset = offset + len(body)
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, SCHEMA_VERSION, len(sections),
+        string_table_offset, int(time.time()),
+    )
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(directory)
+        f.write(body)
+        f.write(strings)
+    os.replace(tmp_path, path)
+    return sum(section[1] for section in sections)
+
+
+class CatalogSnapshot(object):
+    """
+    Memory-mapped, read-only view of a snapshot file.
+    Records are returned as the value objects from campaign.values.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, schema, section_count, strings_offset, built_at = HEADER.unpack_from(self._buffer, 0)
+        except struct.error:
+            raise CatalogSnapshotError(f'{path} is not a catalog snapshot.')
+        if magic != MAGIC:
+            raise CatalogSnapshotError(f'{path} is not a catalog snapshot.')
+        if version != FORMAT_VERSION or schema != SCHEMA_VERSION:
+            raise CatalogSnapshotError(f'{path} was built for a different catalog version.')
+        self.built_at = built_at
+        self._strings_offset = strings_offset
+        self._sections = {}
+        for i in range(section_count):
+            name, *section = SECTION.unpack_from(self._buffer, HEADER.size + i * SECTION.size)
+            name = name.rstrip(b'\0').decode()
+            self._sections[name] = (_record_struct(name), _kinds(name), *section)
+
+    def close(self):
+        self._buffer.close()
+
+    def _string(self, offset, length):
+        if length == STR_NULL:
+            return None
+        start = self._strings_offset + offset
+        return self._buffer[start:start + length].decode('utf-8')
+
+    def _section(self, section):
+        try:
+            return self._sections[section]
+        except KeyError:
+            raise CatalogSnapshotError(f'The catalog has no {section} section.')
+
+    def _record_id(self, section, position):
+        record_struct, _, _, records_offset, *_ = self._section(section)
+        return struct.unpack_from('<q', self._buffer, records_offset + position * record_struct.size)[0]
+
+    def _record(self, section, position):
+        record_struct, kinds, _, records_offset, *_ = self._section(section)
+        values = iter(record_struct.unpack_from(self._buffer, records_offset + position * record_struct.size))
+        record = [next(values)]
+        for field, kind in kinds:
+            if kind in ('i', 'b'):
+                value = next(values)
+                if value == INT_NULL:
+                    value = None
+                elif kind == 'b':
+                    value = bool(value)
+                record.append(value)
+            elif isinstance(kind, tuple):
+                value = self._string(next(values), next(values))
+                record.append(tuple(value.split(LIST_SEPARATOR)) if value else ())
+            else:
+                record.append(self._string(next(values), next(values)))
+        return SECTIONS[section][1]._make(record)
+
+    def _name_position(self, section, index):
+        name_index_offset = self._section(section)[4]
+        return INDEX.unpack_from(self._buffer, name_index_offset + index * INDEX.size)[0]
+
+    def _name_at(self, section, position):
+        record_struct, kinds, _, records_offset, *_ = self._section(section)
+        name_field = SECTIONS[section][1].name_field
+        # Find where the name slot sits in the record
+        slot = 1
+        for field, kind in kinds:
+            if field == name_field:
+                break
+            slot += 1 if kind in ('i', 'b') else 2
+        values = record_struct.unpack_from(self._buffer, records_offset + position * record_struct.size)
+        return self._string(values[slot], values[slot + 1]) or ''
+
+    def count(self, section):
+        return self._section(section)[2]
+
+    def all(self, section):
+        """
+        Returns every record in the section ordered by name.
+        """
+        return [
+            self._record(section, self._name_position(section, i))
+            for i in range(self.count(section))
+        ]
+
+    def get(self, section, pk):
+        """
+        Returns the record with the given id, or None.
+        Records are stored in id order so this is a binary search.
+        """
+        low, high = 0, self.count(section)
+        while low < high:
+            middle = (low + high) // 2
+            if self._record_id(section, middle) < pk:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count(section) and self._record_id(section, low) == pk:
+            return self._record(section, low)
+        return None
+
+    def get_by_name(self, section, name):
+        """
+        Returns the first record with the given name, or None.
+        """
+        names = _NameSequence(self, section)
+        index = bisect.bisect_left(names, name)
+        if index < len(names) and names[index] == name:
+            return self._record(section, self._name_position(section, index))
+        return None
+
+    def for_playbook(self, section, class_name):
+        """
+        Returns the records available to a playbook ordered by name.
+        """
+        *_, playbooks_offset, playbook_count = self._section(section)
+        for i in range(playbook_count):
+            name_offset, name_length, indexes_offset, index_count = PLAYBOOK.unpack_from(
+                self._buffer, playbooks_offset + i * PLAYBOOK.size
+            )
+            if self._string(name_offset, name_length) == class_name:
+                return [
+                    self._record(section, INDEX.unpack_from(self._buffer, indexes_offset + j * INDEX.size)[0])
+                    for j in range(index_count)
+                ]
+        return []
+
+
+class _NameSequence(object):
+    """
+    Sequence of a section's names in sorted order, for use with bisect.
+    """
+    def __init__(self, snapshot, section):
+        self.snapshot = snapshot
+        self.section = section
+
+    def __len__(self):
+        return self.snapshot.count(self.section)
+
+    def __getitem__(self, index):
+        position = self.snapshot._name_position(self.section, index)
+        return self.snapshot._name_at(self.section, position)
+
+
+# Seconds between two checks of the snapshot file for a rebuild by another process
+CHECK_INTERVAL = 1.0
+
+_catalog = None
+_checked = None  # time.monotonic() of the last check
+
+
+def snapshot_path():
+    """
+    Returns the snapshot file for the current database, so that
+    test databases never share a snapshot with the real one.
+    """
+    return f"{settings.CATALOG_SNAPSHOT_PATH}.{connection.settings_dict['NAME']}"
+
+
+def invalidate_snapshot():
+    """
+    Removes the snapshot file so that it is rebuilt on the next lookup.
+    """
+    global _checked
+    _checked = None
+    try:
+        os.remove(snapshot_path())
+    except FileNotFoundError:
+        pass
+
+
+def get_catalog():
+    """
+    Returns the snapshot for this process, building the file if it
+    does not exist yet and re-mapping it when it has been rebuilt.
+    The file is checked at most once every CHECK_INTERVAL seconds.
+    """
+    global _catalog, _checked
+    path = snapshot_path()
+    now = time.monotonic()
+    if _catalog is not None and _catalog.path == path and _checked is not None and now - _checked < CHECK_INTERVAL:
+        return _catalog
+    try:
+        modified = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        build_snapshot(path)
+        modified = os.stat(path).st_mtime_ns
+    if _catalog is None or _catalog.path != path or _catalog.modified != modified:
+        try:
+            catalog = CatalogSnapshot(path)
+        except CatalogSnapshotError:
+            build_snapshot(path)
+            modified = os.stat(path).st_mtime_ns
+            catalog = CatalogSnapshot(path)
+        catalog.modified = modified
+        # The old mapping is not closed, other threads may still be reading it.
+        # It is unmapped once the last of them lets go of it.
+        _catalog = catalog
+    _checked = now
+    return _catalog
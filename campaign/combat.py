@@ -0,0 +1,258 @@
+"""
+A whole combat round in one request: damage to characters, followers and
+NPCs, and the uses, charges, marks and ammo the players burn.
+
+A round is a list of changes {target_type, id, field, delta}. The deltas
+of the same row are added up, and every (target_type, field) is a single
+UPDATE with a CASE giving each row its delta, kept between 0 and the
+maximum like campaign.counters. Ammo moves along AMMO_CHOICES (a delta of
+-1 takes 'full' to 'plenty left'). The round runs in one transaction, so
+it is applied completely or not at all:
+
+    values = apply_round(user, campaign_id, [
+        {'target_type': 'npc', 'id': 4, 'field': 'hp', 'delta': -5},
+        {'target_type': 'item', 'id': 9, 'field': 'ammo', 'delta': -1},
+    ])
+"""
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from campaign import events
+from campaign.constants import AMMO_CHOICES
+from campaign.counters import COUNTERS, MAX_DELTA, Counter
+from campaign.models import (
+    Character, NPCInstance,
+    MoveInstance, ItemInstance, SmallItemInstance, SpecialPossessionInstance,
+    MajorArcanaInstance, MinorArcanaInstance,
+)
+
+
+MAX_CHANGES = 200
+
+# Row ids are bigints
+MAX_ID = 2 ** 63 - 1
+
+AMMO_LEVELS = [value for value, _ in AMMO_CHOICES]  # from full to all out
+
+
+class AmmoLevel(object):
+    """
+    An ammo field, moved along AMMO_LEVELS.
+    """
+    def __init__(self, field='ammo'):
+        self.field = field
+
+    def batch_value(self, deltas):
+        last = len(AMMO_LEVELS) - 1
+        return Case(
+            *[
+                When(pk=pk, **{self.field: level}, then=Value(AMMO_LEVELS[min(max(i - delta, 0), last)]))
+                for pk, delta in deltas.items()
+                for i, level in enumerate(AMMO_LEVELS)
+            ],
+            # Items without ammo keep their NULL
+            default=F(self.field),
+        )
+
+
+def batch_value(spec, deltas):
+    """
+    The new value of spec's field for the rows in deltas (pk: delta).
+    """
+    if isinstance(spec, AmmoLevel):
+        return spec.batch_value(deltas)
+    return spec.new_value(Case(
+        *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+        default=Value(0), output_field=IntegerField(),
+    ))
+
+
+class Target(object):
+    """
+    The rows of model a round can change and their fields.
+    owners are the lookups from model to the characters the rows belong to
+    (None for the characters themselves), without owners only the GM can
+    change them. key is the lookup of the ids in the request (a follower's
+    id is its FollowerInstance, its HP is on the NPC instance).
+    """
+    def __init__(self, model, fields, owners=(), key='pk'):
+        self.model = model
+        self.fields = fields
+        self.owners = owners
+        self.key = key
+
+    def rows(self, user, campaign_id):
+        """
+        The rows the user can change: all of the campaign's for its GM,
+        the rows of their own characters for a player.
+        """
+        if not self.owners:
+            return self.model.objects.filter(campaign_id=campaign_id, campaign__gm=user)
+        access = Q(pk__in=[])
+        for owner in self.owners:
+            prefix = f'{owner}__' if owner else ''
+            access |= Q(**{f'{prefix}campaign_id': campaign_id}) & (
+                Q(**{f'{prefix}player': user}) | Q(**{f'{prefix}campaign__gm': user})
+            )
+        return self.model.objects.filter(access)
+
+    def owner_fields(self):
+        """
+        The lookups of the id of the character a row belongs to.
+        """
+        return [f'{owner}__id' if owner else 'pk' for owner in self.owners]
+
+
+NPC_HP = Counter(NPCInstance, 'current_hp', maximum='max_hp', start=F('max_hp'))
+
+TARGETS = {
+    'character': Target(Character, {'hp': COUNTERS['hp'], 'xp': COUNTERS['xp']}, owners=[None]),
+    'follower': Target(
+        NPCInstance, {'hp': NPC_HP}, owners=['followerinstance__character'], key='followerinstance__id',
+    ),
+    'npc': Target(NPCInstance, {'hp': NPC_HP}),
+    'move': Target(
+        MoveInstance, {'uses': COUNTERS['move-uses'], 'charges': COUNTERS['move-charges']}, owners=['character'],
+    ),
+    'item': Target(
+        ItemInstance, {'uses': COUNTERS['item-uses'], 'ammo': AmmoLevel()},
+        owners=['character', 'follower__character'],
+    ),
+    'small-item': Target(
+        SmallItemInstance, {'uses': COUNTERS['small-item-uses'], 'ammo': AmmoLevel()},
+        owners=['character', 'follower__character'],
+    ),
+    'special-possession': Target(
+        SpecialPossessionInstance, {'uses': COUNTERS['special-possession-uses']},
+        owners=['character_to_special_possessions'],
+    ),
+    'major-arcana': Target(
+        MajorArcanaInstance, {
+            'marks': COUNTERS['major-arcana-marks'],
+            'charges': Counter(MajorArcanaInstance, 'charges', maximum=('arcana', 'total_charges')),
+        },
+        owners=['character', 'follower__character'],
+    ),
+    'minor-arcana': Target(
+        MinorArcanaInstance, {
+            'marks': COUNTERS['minor-arcana-marks'],
+            'charges': Counter(MinorArcanaInstance, 'charges', maximum=('arcana', 'total_charges')),
+        },
+        owners=['character', 'follower__character'],
+    ),
+}
+
+
+def whole_number(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def parse_changes(changes):
+    """
+    Returns the changes as (target_type, id, field, delta) tuples.
+    Raises ValueError with every problem found. Deltas, and the total delta
+    of every changed field (recorded as its event's delta), are kept within
+    MAX_DELTA like campaign.counters.
+    """
+    if not isinstance(changes, list) or not changes:
+        raise ValueError('changes must be a list of changes.')
+    if len(changes) > MAX_CHANGES:
+        raise ValueError(f'A round can have at most {MAX_CHANGES} changes.')
+    parsed = []
+    errors = []
+    for i, change in enumerate(changes):
+        if not isinstance(change, dict):
+            errors.append(f'Change {i} must be an object.')
+            continue
+        target_type, pk, field, delta = (change.get(key) for key in ('target_type', 'id', 'field', 'delta'))
+        if target_type not in TARGETS:
+            errors.append(f"Change {i}: target_type must be one of {', '.join(TARGETS)}.")
+        elif field not in TARGETS[target_type].fields:
+            errors.append(f"Change {i}: field must be one of {', '.join(TARGETS[target_type].fields)}.")
+        elif not whole_number(pk) or not whole_number(delta):
+            errors.append(f'Change {i}: id and delta must be whole numbers.')
+        elif not 0 < pk <= MAX_ID:
+            errors.append(f'Change {i}: id must be a positive number up to {MAX_ID}.')
+        elif not -MAX_DELTA <= delta <= MAX_DELTA:
+            errors.append(f'Change {i}: delta must be between -{MAX_DELTA} and {MAX_DELTA}.')
+        else:
+            parsed.append((target_type, pk, field, delta))
+    totals = {}
+    for target_type, pk, field, delta in parsed:
+        totals[(target_type, pk, field)] = totals.get((target_type, pk, field), 0) + delta
+    errors += [
+        f'The changes to the {field} of {target_type} {pk} must add up to between -{MAX_DELTA} and {MAX_DELTA}.'
+        for (target_type, pk, field), total in totals.items()
+        if not -MAX_DELTA <= total <= MAX_DELTA
+    ]
+    if errors:
+        raise ValueError(' '.join(errors))
+    return parsed
+
+
+def apply_round(user, campaign_id, changes):
+    """
+    Applies the changes, records their events and returns the new value of
+    every changed field, in the order of the changes. Raises ValueError (and
+    changes nothing) when a change is invalid or its row is not one the
+    user can change.
+    """
+    changes = parse_changes(changes)
+    ids = {}
+    for target_type, pk, field, delta in changes:
+        ids.setdefault(target_type, set()).add(pk)
+
+    with transaction.atomic():
+        # Requested id: row pk, for the rows the user can change
+        rows = {}
+        characters = {}
+        errors = []
+        for target_type, target_ids in ids.items():
+            target = TARGETS[target_type]
+            rows[target_type] = {}
+            for key, pk, *owners in target.rows(user, campaign_id).filter(
+                **{f'{target.key}__in': target_ids}
+            ).values_list(target.key, 'pk', *target.owner_fields()).distinct():
+                rows[target_type][key] = pk
+                characters[(target_type, key)] = next((owner for owner in owners if owner is not None), None)
+            errors += [
+                f'There is no {target_type} {pk} you can change in this campaign.'
+                for pk in sorted(target_ids - set(rows[target_type]))
+            ]
+        if errors:
+            raise ValueError(' '.join(errors))
+
+        deltas = {}
+        for target_type, pk, field, delta in changes:
+            row_deltas = deltas.setdefault((target_type, field), {})
+            row = rows[target_type][pk]
+            row_deltas[row] = row_deltas.get(row, 0) + delta
+        for (target_type, field), row_deltas in deltas.items():
+            target = TARGETS[target_type]
+            spec = target.fields[field]
+            # Bumping the version makes open update forms merge instead of overwriting
+            target.model.objects.filter(pk__in=row_deltas).update(**{
+                spec.field: batch_value(spec, row_deltas), 'version': F('version') + 1,
+            })
+
+        values = {}
+        for target_type, target_rows in rows.items():
+            target = TARGETS[target_type]
+            fields = {target.fields[field].field for (changed, field) in deltas if changed == target_type}
+            for row in target.model.objects.filter(pk__in=target_rows.values()).values('pk', *fields):
+                values[(target_type, row['pk'])] = row
+
+    # The total delta of each changed field, in the order of the changes
+    totals = {}
+    for target_type, pk, field, delta in changes:
+        totals[(target_type, pk, field)] = totals.get((target_type, pk, field), 0) + delta
+    results = []
+    round_events = []
+    for (target_type, pk, field), delta in totals.items():
+        value = values[(target_type, rows[target_type][pk])][TARGETS[target_type].fields[field].field]
+        results.append({'target_type': target_type, 'id': pk, 'field': field, 'value': value})
+        round_events.append(events.event(
+            campaign_id, characters[(target_type, pk)], target_type, pk, field, delta, value, user,
+        ))
+    events.record(round_events)
+    return results
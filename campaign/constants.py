@@ -30,13 +30,25 @@ BLESSED_BACKGROUND_MOVES = {
 }
 
 # There are no starting moves
-# for The Fox
+# for The Fox, just one move from each pair
+FOX_MOVE_CHOICES = [
+    ['AMBUSH', 'SKILL AT ARMS'],
+    ['DANGER SENSE', 'PERCEPTIVE'],
+]
+
+FOX_BACKGROUND_MOVE_CHOICES = {
+    'A LIFE OF CRIME': [['BURGLE', 'LIGHT FINGERS']],
+}
 
 HEAVY_STARTING_MOVES = [
     'DANGEROUS',
     'HARD TO KILL',
 ]
 
+HEAVY_MOVE_CHOICES = [
+    ['ARMORED', 'UNCANNY REFLEXES'],
+]
+
 JUDGE_STARTING_MOVES = [
     'CENSURE',
     'CHRONICLER OF STONETOP',
@@ -106,11 +118,23 @@ SEEKER_BACKGROUND_MOVES = {
     "WITCH HUNTER": "EVERYTHING BLEEDS",
 }
 
+# Background slug: major arcanum slugs the Seeker chooses from
+SEEKER_BACKGROUND_ARCANA = {
+    'patriot': ['hectumel-codex', 'red-scepter', 'staff-of-the-lidless-orb'],
+    'antiquarian': ['norubas-ice-sphere', 'azure-hand', 'mindgem'],
+    'witch-hunter': ['demonhide-cloak', 'redwood-effigy', 'twisted-spear'],
+}
+
 WOULD_BE_HERO_STARTING_MOVES = [
     "ANGER IS A GIFT",
     "POTENTIAL FOR GREATNESS",
 ]
 
+# The scores a new character assigns to their stats (in any order)
+STARTING_STATS = [2, 1, 1, 0, 0, -1]
+
+WOULD_BE_HERO_STARTING_STATS = [1, 0, 0, 0, 0, -1]
+
 COMPLEXITY_CHOICES = [
     ('low complexity', 'low complexity'),
     ('low/medium complexity', 'low/medium complexity'),
@@ -303,6 +327,14 @@ PRONOUNS = [
     ("they/them", "they/them"),
 ]
 
+# Names for spawned NPCs and generated characters (see campaign/spawning.py and campaign/generator.py)
+NPC_NAMES = [
+    'Aeda', 'Agnes', 'Ardwin', 'Bertha', 'Bram', 'Cedric', 'Dunstan', 'Edda',
+    'Elfric', 'Freya', 'Garth', 'Gerda', 'Hedda', 'Helmund', 'Ida', 'Jorund',
+    'Kenna', 'Lida', 'Lothar', 'Maeve', 'Mathilde', 'Odo', 'Olwen', 'Osric',
+    'Petra', 'Rolf', 'Rowena', 'Sigrid', 'Tamsin', 'Ulf', 'Wenda', 'Wulfric',
+]
+
 AMMO_CHOICES = [
     ('full', 'full'),
     ('plenty left', 'plenty left'),
@@ -310,6 +342,29 @@ AMMO_CHOICES = [
     ('all out', 'all out'),
 ]
 
+# Event log codes: (code, target type, field), see campaign/events.py.
+# The codes are stored in the log, so only ever add to the end of this list
+EVENT_FIELDS = [
+    (1, 'character', 'hp'),
+    (2, 'character', 'xp'),
+    (3, 'character', 'stock'),
+    (4, 'follower', 'hp'),
+    (5, 'npc', 'hp'),
+    (6, 'move', 'uses'),
+    (7, 'move', 'charges'),
+    (8, 'item', 'uses'),
+    (9, 'item', 'ammo'),
+    (10, 'small-item', 'uses'),
+    (11, 'small-item', 'ammo'),
+    (12, 'special-possession', 'uses'),
+    (13, 'major-arcana', 'marks'),
+    (14, 'major-arcana', 'charges'),
+    (15, 'minor-arcana', 'marks'),
+    (16, 'minor-arcana', 'charges'),
+]
+
+EVENT_CODES = [(code, f'{target_type} {field}') for code, target_type, field in EVENT_FIELDS]
+
 # NPC CONSTANTS:
 
 NPC_TYPE = [
@@ -362,6 +417,15 @@ ANIMAL_COMPANION_INSTINCTS = [
     ('To run rampant', 'To run rampant'),
 ]
 
+# Animal type: slug of the tag of the attribute it starts with
+ANIMAL_COMPANION_STARTING_TAGS = {
+    'Bird': 'tiny',
+    'Critter': 'tiny',
+    'Brute': 'tough',
+    'Predator': 'fierce',
+    'Steed': 'large',
+}
+
 ANIMAL_COMPANION_COSTS = [
 
     ('Play, grooming, training, affection', 'Play, grooming, training, affection'),
@@ -0,0 +1,144 @@
+"""
+Counters that players tick up and down during play (HP, XP, uses, charges,
+stock and marks).
+
+Each change is a single UPDATE that adds the delta and keeps the value
+between 0 and its maximum, so clicks from several devices at once are
+neither lost nor push the value out of range:
+
+    value = adjust('move-uses', user, campaign_id, character_id, delta=-1, pk=move_instance_id)
+"""
+from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from campaign import events
+from campaign.models import (
+    Character, TheBlessed,
+    MoveInstance, ItemInstance, SmallItemInstance,
+    SpecialPossessionInstance,
+    MajorArcanaInstance, MinorArcanaInstance,
+)
+
+
+# Largest change a single request can make to a counter, well inside the
+# 32-bit integer columns of the counters and of CampaignEvent.delta
+MAX_DELTA = 10000
+
+
+def check_delta(delta):
+    if not -MAX_DELTA <= delta <= MAX_DELTA:
+        raise ValueError(f'delta must be between -{MAX_DELTA} and {MAX_DELTA}.')
+
+
+class Counter(object):
+    """
+    A counter field of model.
+
+    maximum is either a field of the same row or a (foreign key, field)
+    pair for a maximum set on the related rules row (like total_uses).
+    owner is the lookup from model to the character (None for characters).
+    start is the value of an empty field (0 unless given).
+    """
+    def __init__(self, model, field, maximum=None, owner='character', start=None):
+        self.model = model
+        self.field = field
+        self.maximum = maximum
+        self.owner = owner
+        self.start = Value(0) if start is None else start
+
+    @property
+    def per_character(self):
+        return self.owner is None
+
+    def rows(self, user, campaign_id, character_id, pk=None):
+        """
+        The row to change, if the user is the character's player or the campaign's GM.
+        """
+        prefix = f'{self.owner}__' if self.owner else ''
+        rows = self.model.objects.filter(
+            Q(**{f'{prefix}id': character_id, f'{prefix}campaign_id': campaign_id}),
+            Q(**{f'{prefix}player': user}) | Q(**{f'{prefix}campaign__gm': user}),
+        )
+        if not self.per_character:
+            rows = rows.filter(pk=pk)
+        return rows
+
+    def maximum_expression(self):
+        if self.maximum is None:
+            return None
+        if isinstance(self.maximum, str):
+            return F(self.maximum)
+        foreign_key, field = self.maximum
+        related_model = self.model._meta.get_field(foreign_key).related_model
+        return Subquery(related_model.objects.filter(pk=OuterRef(f'{foreign_key}_id')).values(field)[:1])
+
+    def new_value(self, delta):
+        """
+        delta is a number or an expression (like a CASE with a delta per row).
+        """
+        if not hasattr(delta, 'resolve_expression'):
+            delta = Value(delta)
+        value = Coalesce(F(self.field), self.start) + delta
+        maximum = self.maximum_expression()
+        if maximum is not None:
+            # LEAST ignores a NULL maximum (no limit)
+            value = Least(value, maximum, output_field=IntegerField())
+        return Greatest(value, Value(0), output_field=IntegerField())
+
+
+COUNTERS = {
+    'hp': Counter(Character, 'current_hp', maximum='max_hp', owner=None),
+    'xp': Counter(Character, 'experience_points', owner=None),
+    'stock': Counter(TheBlessed, 'current_stock', maximum='stock_max', owner=None),
+    'move-uses': Counter(MoveInstance, 'uses', maximum=('move', 'total_uses')),
+    'move-charges': Counter(MoveInstance, 'charges', maximum=('move', 'total_charges')),
+    'item-uses': Counter(ItemInstance, 'uses', maximum=('item', 'total_uses')),
+    'small-item-uses': Counter(SmallItemInstance, 'uses', maximum=('small_item', 'total_uses')),
+    'special-possession-uses': Counter(
+        SpecialPossessionInstance, 'uses', maximum=('special_possession', 'total_uses'),
+        owner='character_to_special_possessions',
+    ),
+    'major-arcana-marks': Counter(MajorArcanaInstance, 'marks', maximum=('arcana', 'total_marks')),
+    'minor-arcana-marks': Counter(MinorArcanaInstance, 'marks', maximum=('arcana', 'total_marks')),
+}
+
+
+# Counter: the target type and field of its events (see campaign/events.py)
+COUNTER_EVENTS = {
+    'hp': ('character', 'hp'),
+    'xp': ('character', 'xp'),
+    'stock': ('character', 'stock'),
+    'move-uses': ('move', 'uses'),
+    'move-charges': ('move', 'charges'),
+    'item-uses': ('item', 'uses'),
+    'small-item-uses': ('small-item', 'uses'),
+    'special-possession-uses': ('special-possession', 'uses'),
+    'major-arcana-marks': ('major-arcana', 'marks'),
+    'minor-arcana-marks': ('minor-arcana', 'marks'),
+}
+
+
+def adjust(name, user, campaign_id, character_id, delta, pk=None):
+    """
+    Adds delta to the counter, records the event and returns its new value.
+    Raises ValueError for a delta over MAX_DELTA and the model's DoesNotExist
+    if there is no such row for this user.
+    """
+    check_delta(delta)
+    counter = COUNTERS[name]
+    rows = counter.rows(user, campaign_id, character_id, pk)
+    target_id = character_id if counter.per_character else pk
+    # Bumping the version makes open update forms merge instead of overwriting
+    # (the stock's version is on the character table, a second UPDATE)
+    with transaction.atomic(savepoint=False):
+        updated = rows.update(**{counter.field: counter.new_value(delta), 'version': F('version') + 1})
+        # Read while the UPDATE still holds the row lock, so the value is
+        # this change's and not one made by another request since
+        if updated:
+            value = counter.model.objects.values_list(counter.field, flat=True).get(pk=target_id)
+    if not updated:
+        raise counter.model.DoesNotExist
+    target_type, field = COUNTER_EVENTS[name]
+    events.record([events.event(campaign_id, character_id, target_type, target_id, field, delta, value, user)])
+    return value
@@ -0,0 +1,226 @@
+"""
+The rules a new character has to follow (starting moves and possessions,
+background moves, required move pairs, the stat array...).
+
+The per-playbook lists in campaign.constants are compiled into sets of ids
+once per catalog version, so checking a submission is a few set operations
+and every broken rule is reported at once:
+
+    errors = validate_character(
+        'The Blessed', background_id, move_ids, possession_ids, stats,
+    )
+
+The create forms use it for their clean(), and it works the same for
+anything else that makes characters from ids (an API, an importer...).
+"""
+from collections import Counter
+
+from campaign.catalog import get_catalog
+from campaign.models import Background, Moves, SpecialPossessions
+from campaign.constants import (
+    BLESSED_STARTING_MOVES, BLESSED_BACKGROUND_MOVES,
+    FOX_MOVE_CHOICES, FOX_BACKGROUND_MOVE_CHOICES,
+    HEAVY_STARTING_MOVES, HEAVY_MOVE_CHOICES,
+    JUDGE_STARTING_MOVES, JUDGE_STARTING_POSSESSIONS,
+    LIGHTBEARER_STARTING_MOVES,
+    MARSHAL_STARTING_MOVES, MARSHAL_BACKGROUND_MOVES,
+    RANGER_STARTING_MOVES, RANGER_BACKGROUND_MOVES, RANGER_STARTING_POSSESSIONS,
+    SEEKER_STARTING_MOVES, SEEKER_BACKGROUND_MOVES, SEEKER_STARTING_POSSESSIONS,
+    WOULD_BE_HERO_STARTING_MOVES,
+    STARTING_STATS, WOULD_BE_HERO_STARTING_STATS,
+)
+
+
+# Playbook: the lists its rules are built from (missing keys have no rule)
+PLAYBOOK_RULES = {
+    'The Blessed': {
+        'starting_moves': BLESSED_STARTING_MOVES,
+        'background_moves': BLESSED_BACKGROUND_MOVES,
+    },
+    'The Fox': {
+        'move_choices': FOX_MOVE_CHOICES,
+        'background_move_choices': FOX_BACKGROUND_MOVE_CHOICES,
+    },
+    'The Heavy': {
+        'starting_moves': HEAVY_STARTING_MOVES,
+        'move_choices': HEAVY_MOVE_CHOICES,
+        'move_choice_error': '{moves} move is required for The Heavy.',
+    },
+    'The Judge': {
+        'starting_moves': JUDGE_STARTING_MOVES,
+        'starting_possessions': JUDGE_STARTING_POSSESSIONS,
+    },
+    'The Lightbearer': {
+        'starting_moves': LIGHTBEARER_STARTING_MOVES,
+    },
+    'The Marshal': {
+        'starting_moves': MARSHAL_STARTING_MOVES,
+        'background_moves': MARSHAL_BACKGROUND_MOVES,
+    },
+    'The Ranger': {
+        'starting_moves': RANGER_STARTING_MOVES,
+        'background_moves': RANGER_BACKGROUND_MOVES,
+        'starting_possessions': RANGER_STARTING_POSSESSIONS,
+    },
+    'The Seeker': {
+        'starting_moves': SEEKER_STARTING_MOVES,
+        'background_moves': SEEKER_BACKGROUND_MOVES,
+        'starting_possessions': SEEKER_STARTING_POSSESSIONS,
+    },
+    'The Would-Be Hero': {
+        'starting_moves': WOULD_BE_HERO_STARTING_MOVES,
+        'stats': WOULD_BE_HERO_STARTING_STATS,
+    },
+}
+
+STAT_FIELDS = ['strength', 'dexterity', 'intelligence', 'wisdom', 'constitution', 'charisma']
+
+_rules = None
+
+
+class Requirement(object):
+    """
+    At least one of ids (of moves or possessions) has to be chosen,
+    otherwise message is the error.
+    """
+    __slots__ = ('ids', 'message', 'of')
+
+    def __init__(self, ids, message, of='moves'):
+        self.ids = frozenset(ids)
+        self.message = message
+        self.of = of
+
+    def met_by(self, chosen):
+        return not self.ids.isdisjoint(chosen[self.of])
+
+
+class PlaybookRules(object):
+    """
+    The compiled rules of one playbook.
+    background_requirements maps background ids to their requirements.
+    """
+    def __init__(self, requirements, background_requirements, stats):
+        self.requirements = requirements
+        self.background_requirements = background_requirements
+        self.stats = Counter(stats)
+        scores = ', '.join(f'+{score}' if score > 0 else f'{score}' for score in stats)
+        self.stats_message = f"Stats should have the following scores (they can be in any order): {scores}."
+
+
+class CreationRules(object):
+    """
+    The compiled rules of every playbook and the move prerequisites.
+    """
+    def __init__(self, version=None):
+        self.version = version
+        self.move_names = {}
+        self.prerequisites = {}
+        move_ids = {}
+        for pk, name, requires in Moves.objects.values_list(
+            'id', 'name', 'move_requirements__move_restricted_id'
+        ):
+            self.move_names[pk] = name
+            move_ids.setdefault(name, set()).add(pk)
+            if requires is not None:
+                self.prerequisites[pk] = requires
+        possession_ids = {}
+        for pk, name in SpecialPossessions.objects.values_list('id', 'possession_name'):
+            possession_ids.setdefault(name, set()).add(pk)
+        background_ids = {}
+        for pk, name, class_name in Background.objects.values_list(
+            'id', 'background', 'character_class__class_name'
+        ):
+            background_ids.setdefault((class_name, name), set()).add(pk)
+
+        def moves(names):
+            return set().union(*[move_ids.get(name, ()) for name in names])
+
+        self.playbooks = {}
+        for class_name, spec in PLAYBOOK_RULES.items():
+            requirements = [
+                Requirement(move_ids.get(name, ()), f"{name} is a required starting move.")
+                for name in spec.get('starting_moves', [])
+            ]
+            requirements += [
+                Requirement(
+                    possession_ids.get(name, ()), f"{name} is a required starting special possession.",
+                    of='possessions',
+                )
+                for name in spec.get('starting_possessions', [])
+            ]
+            choice_error = spec.get('move_choice_error', '{moves} move is required.')
+            requirements += [
+                Requirement(moves(names), choice_error.format(moves=' or '.join(names)))
+                for names in spec.get('move_choices', [])
+            ]
+
+            background_requirements = {}
+            for background, names in spec.get('background_moves', {}).items():
+                # A background needs one move, or every move of a list
+                names = names if isinstance(names, list) else [names]
+                for pk in background_ids.get((class_name, background), ()):
+                    background_requirements.setdefault(pk, []).extend(
+                        Requirement(move_ids.get(name, ()), f"{name} move is required for {background} background.")
+                        for name in names
+                    )
+            for background, choices in spec.get('background_move_choices', {}).items():
+                for pk in background_ids.get((class_name, background), ()):
+                    background_requirements.setdefault(pk, []).extend(
+                        Requirement(
+                            moves(names),
+                            f"{' or '.join(names)} move is required with {background} background.",
+                        )
+                        for names in choices
+                    )
+            self.playbooks[class_name] = PlaybookRules(
+                requirements, background_requirements, spec.get('stats', STARTING_STATS),
+            )
+        self.default_playbook = PlaybookRules([], {}, STARTING_STATS)
+
+    def validate(self, playbook, background_id, move_ids, possession_ids, stats):
+        """
+        Returns the error messages for a new character of the playbook.
+        move_ids are checked in the order given, stats maps the
+        stat fields (strength...) to their scores.
+        """
+        rules = self.playbooks.get(playbook, self.default_playbook)
+        move_ids = list(move_ids)
+        chosen = {'moves': set(move_ids), 'possessions': set(possession_ids)}
+        errors = []
+
+        for pk in move_ids:
+            requires = self.prerequisites.get(pk)
+            if requires is not None and requires not in chosen['moves']:
+                errors.append(f"{self.move_names[pk]} requires the {self.move_names[requires]} move.")
+
+        for requirement in rules.requirements + rules.background_requirements.get(background_id, []):
+            if not requirement.met_by(chosen):
+                errors.append(requirement.message)
+
+        scores = [stats.get(field) for field in STAT_FIELDS]
+        if Counter(scores) != rules.stats:
+            your_stats = ', '.join(f'{field.capitalize()}: {score}' for field, score in zip(STAT_FIELDS, scores))
+            errors.append(f"{rules.stats_message} Your stats are as follows: {your_stats}.")
+        return errors
+
+
+def get_creation_rules():
+    """
+    Returns the compiled rules, compiling them again whenever the
+    catalog snapshot has been rebuilt.
+    """
+    global _rules
+    catalog = get_catalog()
+    version = (catalog.path, catalog.modified)
+    if _rules is None or _rules.version != version:
+        _rules = CreationRules(version)
+    return _rules
+
+
+def validate_character(playbook, background_id, move_ids, possession_ids, stats):
+    return get_creation_rules().validate(playbook, background_id, move_ids, possession_ids, stats)
+
+
+def clear():
+    global _rules
+    _rules = None
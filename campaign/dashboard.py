@@ -0,0 +1,144 @@
+"""
+The GM's view of the whole party on one page: HP, armor, debilities, XP,
+load, what is left of every limited move, item and possession, the Blessed's
+stock, ammo and the followers' HP.
+
+Every section is one query for the whole campaign (load is summed by
+subqueries on the character rows), so the page costs the same number of
+queries for two characters or twenty:
+
+    for row in party_dashboard(campaign_id):
+        row['load'], row['resources'], row['followers']
+"""
+from django.db.models import IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from campaign.models import (
+    Character, ItemInstance, SmallItemInstance,
+    SpecialPossessionInstance, MajorArcanaInstance, MinorArcanaInstance,
+    FollowerInstance,
+)
+
+
+# The most weight for each load (see includes/character_detail_inventory.html),
+# more than the last is overloaded
+LOADS = [(3, 'Light'), (6, 'Normal'), (9, 'Heavy')]
+CAPACITY = LOADS[-1][0]
+
+
+def load_name(weight):
+    for most, name in LOADS:
+        if weight <= most:
+            return name
+    return 'Overloaded'
+
+
+def outfitted_weight(model, weight_field):
+    """
+    The weight a character has outfitted of model, as a subquery.
+    """
+    return Coalesce(Subquery(
+        model.objects.filter(character_id=OuterRef('pk'), outfitted=True).order_by().values(
+            'character_id'
+        ).annotate(total=Sum(weight_field)).values('total')[:1],
+        output_field=IntegerField(),
+    ), Value(0))
+
+
+def resource(row, name, value, maximum, kind):
+    return {'name': row[name], 'value': row[value], 'maximum': row[maximum], 'kind': kind}
+
+
+def party_dashboard(campaign_id):
+    """
+    A row for every character of the campaign, ordered by name.
+    resources are the moves, items and possessions with uses or charges
+    (value None means untracked yet), ammo the ammo of the items that have it.
+    """
+    characters = Character.objects.filter(campaign_id=campaign_id).annotate(
+        item_weight=outfitted_weight(ItemInstance, 'item__weight'),
+        major_arcana_weight=outfitted_weight(MajorArcanaInstance, 'arcana__weight'),
+        minor_arcana_weight=outfitted_weight(MinorArcanaInstance, 'arcana__weight'),
+    ).order_by('character_name', 'id').values(
+        'id', 'character_name', 'character_class', 'player__username',
+        'current_hp', 'max_hp', 'armor', 'weakened', 'dazed', 'miserable',
+        'experience_points', 'level', 'theblessed__current_stock', 'theblessed__stock_max',
+        'item_weight', 'major_arcana_weight', 'minor_arcana_weight',
+    )
+    rows = {}
+    for character in characters:
+        load = character['item_weight'] + character['major_arcana_weight'] + character['minor_arcana_weight']
+        rows[character['id']] = {
+            'id': character['id'],
+            'character_name': character['character_name'],
+            'character_class': character['character_class'],
+            'player': character['player__username'],
+            'current_hp': character['current_hp'],
+            'max_hp': character['max_hp'],
+            'armor': character['armor'],
+            'debilities': [debility for debility in ('weakened', 'dazed', 'miserable') if character[debility]],
+            'experience_points': character['experience_points'],
+            'level': character['level'],
+            'load': load,
+            'load_name': load_name(load),
+            'capacity': CAPACITY,
+            'stock': character['theblessed__current_stock'],
+            'stock_max': character['theblessed__stock_max'],
+            'resources': [],
+            'ammo': [],
+            'followers': [],
+        }
+
+    # Move instances only belong to characters through Character.move_instances
+    for move in Character.move_instances.through.objects.filter(
+        Q(moveinstance__move__total_uses__isnull=False) | Q(moveinstance__move__total_charges__isnull=False),
+        character__campaign_id=campaign_id,
+    ).order_by('moveinstance__move__name', 'moveinstance_id').values(
+        'character_id', 'moveinstance__move__name',
+        'moveinstance__uses', 'moveinstance__move__total_uses',
+        'moveinstance__charges', 'moveinstance__move__total_charges',
+    ):
+        resources = rows[move['character_id']]['resources']
+        if move['moveinstance__move__total_uses'] is not None:
+            resources.append(resource(
+                move, 'moveinstance__move__name', 'moveinstance__uses', 'moveinstance__move__total_uses', 'uses',
+            ))
+        if move['moveinstance__move__total_charges'] is not None:
+            resources.append(resource(
+                move, 'moveinstance__move__name', 'moveinstance__charges', 'moveinstance__move__total_charges',
+                'charges',
+            ))
+
+    for model, item in ((ItemInstance, 'item'), (SmallItemInstance, 'small_item')):
+        for row in model.objects.filter(
+            Q(**{f'{item}__total_uses__isnull': False}) | Q(**{f'{item}__has_ammo': True}),
+            character__campaign_id=campaign_id,
+        ).order_by(f'{item}__name', 'id').values(
+            'character_id', f'{item}__name', 'uses', f'{item}__total_uses', f'{item}__has_ammo', 'ammo',
+        ):
+            character = rows[row['character_id']]
+            if row[f'{item}__total_uses'] is not None:
+                character['resources'].append(resource(row, f'{item}__name', 'uses', f'{item}__total_uses', 'uses'))
+            if row[f'{item}__has_ammo']:
+                character['ammo'].append({'name': row[f'{item}__name'], 'ammo': row['ammo']})
+
+    for possession in SpecialPossessionInstance.objects.filter(
+        character__campaign_id=campaign_id, special_possession__total_uses__isnull=False,
+    ).order_by('special_possession__possession_name', 'id').values(
+        'character_id', 'special_possession__possession_name', 'uses', 'special_possession__total_uses',
+    ):
+        rows[possession['character_id']]['resources'].append(resource(
+            possession, 'special_possession__possession_name', 'uses', 'special_possession__total_uses', 'uses',
+        ))
+
+    for follower in FollowerInstance.objects.filter(
+        campaign_id=campaign_id, character__campaign_id=campaign_id,
+    ).order_by('npc_instance__character_name', 'id').values(
+        'character_id', 'npc_instance__character_name', 'npc_instance__current_hp', 'npc_instance__max_hp',
+    ):
+        rows[follower['character_id']]['followers'].append({
+            'name': follower['npc_instance__character_name'],
+            'current_hp': follower['npc_instance__current_hp'],
+            'max_hp': follower['npc_instance__max_hp'],
+        })
+    return list(rows.values())
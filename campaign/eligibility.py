@@ -0,0 +1,159 @@
+"""
+Which moves a character can take when leveling up.
+
+The moves and their requirements are compiled once per catalog version into
+a MoveGraph: one rule per move and, per playbook, its moves ordered so that
+a move always comes after the move it requires (a prerequisite DAG).
+Checking a character is then a single pass over the moves they own:
+
+    move_ids = eligible_move_ids(character, owned_move_ids)
+
+A move can be taken when
+- it is in the character's playbook, or in a playbook that one of their
+  moves gives access to (playbook_access, like Dabbler),
+- it is not restricted to another playbook (restricted_by_character),
+- the character's level and stat are high enough,
+- the character already has the move it requires,
+- they have taken it fewer times than its take_move_limit.
+"""
+import logging
+from collections import Counter, namedtuple
+
+from campaign.catalog import get_catalog
+from campaign.models import Moves
+
+
+logger = logging.getLogger(__name__)
+
+MoveRule = namedtuple('MoveRule', [
+    'id', 'limit', 'playbook', 'level', 'stat', 'stat_value', 'requires', 'access',
+])
+
+_graph = None
+
+
+class MoveGraph(object):
+    """
+    The compiled move rules.
+    rules maps move ids to MoveRule, playbooks maps class names to
+    their move ids in prerequisite order.
+    """
+    def __init__(self, rules, playbook_moves):
+        self.rules = rules
+        self.playbooks = {
+            class_name: self.prerequisite_order(move_ids)
+            for class_name, move_ids in playbook_moves.items()
+        }
+
+    @classmethod
+    def compile(cls, version=None):
+        rules = {}
+        for (pk, limit, playbook, level, stat, stat_value, requires) in Moves.objects.values_list(
+            'id', 'take_move_limit',
+            'move_requirements__restricted_by_character',
+            'move_requirements__level_restricted',
+            'move_requirements__stat_restricted__stat',
+            'move_requirements__stat_restricted__value',
+            'move_requirements__move_restricted_id',
+        ):
+            rules[pk] = MoveRule(
+                pk, limit, playbook, level, stat.lower() if stat else None, stat_value, requires, set(),
+            )
+        for pk, class_name in Moves.playbook_access.through.objects.values_list(
+            'moves_id', 'characterclass__class_name'
+        ):
+            rules[pk].access.add(class_name)
+
+        playbook_moves = {}
+        for pk, class_name in Moves.character_class.through.objects.values_list(
+            'moves_id', 'characterclass__class_name'
+        ).order_by('moves__name', 'moves_id'):
+            playbook_moves.setdefault(class_name, []).append(pk)
+        graph = cls(rules, playbook_moves)
+        graph.version = version
+        return graph
+
+    def prerequisite_order(self, move_ids):
+        """
+        Orders the move ids so each move comes after the move it requires.
+        Moves whose requirements loop back on themselves can never be
+        taken, so they are left out.
+        """
+        in_playbook = set(move_ids)
+        dependents = {}
+        waiting = {}
+        for pk in move_ids:
+            requires = self.rules[pk].requires
+            if requires in in_playbook and requires != pk:
+                dependents.setdefault(requires, []).append(pk)
+                waiting[pk] = 1
+            elif requires == pk:
+                waiting[pk] = 1
+        order = [pk for pk in move_ids if pk not in waiting]
+        for pk in order:
+            for dependent in dependents.get(pk, []):
+                waiting[dependent] -= 1
+                if not waiting[dependent]:
+                    order.append(dependent)
+        if len(order) < len(move_ids):
+            logger.warning(
+                'Moves %s require each other and are left out',
+                sorted(pk for pk in move_ids if waiting.get(pk)),
+            )
+        return order
+
+    def eligible(self, character, owned_move_ids):
+        """
+        Returns the ids of the moves the character can take, in prerequisite order.
+        """
+        taken = Counter()
+        playbooks = [character.character_class]
+        for pk in owned_move_ids:
+            taken[pk] += 1
+            rule = self.rules.get(pk)
+            if rule is not None:
+                playbooks.extend(class_name for class_name in rule.access if class_name not in playbooks)
+
+        move_ids = []
+        seen = set()
+        for class_name in playbooks:
+            for pk in self.playbooks.get(class_name, []):
+                if pk not in seen and self.can_take(self.rules[pk], character, taken):
+                    move_ids.append(pk)
+                seen.add(pk)
+        return move_ids
+
+    def can_take(self, rule, character, taken):
+        if taken[rule.id] >= rule.limit:
+            return False
+        if rule.playbook is not None and rule.playbook != character.character_class:
+            return False
+        if rule.level is not None and character.level < rule.level:
+            return False
+        if rule.stat is not None and getattr(character, rule.stat) < rule.stat_value:
+            return False
+        if rule.requires is not None and not taken[rule.requires]:
+            return False
+        return True
+
+
+def get_move_graph():
+    """
+    Returns the move graph, compiling it again whenever the catalog snapshot
+    has been rebuilt (the rules changed, possibly in another process).
+    """
+    global _graph
+    catalog = get_catalog()
+    version = (catalog.path, catalog.modified)
+    if _graph is None or _graph.version != version:
+        _graph = MoveGraph.compile(version)
+    return _graph
+
+
+def eligible_move_ids(character, owned_move_ids):
+    return get_move_graph().eligible(character, owned_move_ids)
+
+
+def clear():
+    global _graph
+    _graph = None
@@ -0,0 +1,258 @@
+"""
+Monte Carlo simulation of a fight between the party and a group of NPCs.
+
+Each round every standing member of the party (characters, their followers
+and animal companions) rolls 2d6 plus their attack stat against a random
+standing enemy:
+- 10+: they deal their damage,
+- 7-9: they deal their damage and a random enemy deals theirs back,
+- 6-: a random enemy deals their damage to them.
+Damage is a roll of the damage die minus the target's armor. Characters
+attack with the best of STR and DEX (with disadvantage when weakened),
+followers and companions with +0. The fight is won when every enemy is
+down, lost when the whole party is, and a draw after MAX_ROUNDS.
+
+Fights are played in chunks of CHUNK_SIZE with a seeded random.Random per
+chunk, so the same seed gives the same results however the chunks are
+split between processes:
+
+    encounter = load_encounter(campaign_id, npc_ids)
+    result = simulate(encounter, runs=50000, workers=4, time_budget=10)
+    result.as_json()['win_rate']
+"""
+import random
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+from campaign.models import AnimalCompanion, Character, FollowerInstance, NPCInstance
+from campaign.odds import NORMAL, DISADVANTAGE
+
+
+MAX_ROUNDS = 30
+CHUNK_SIZE = 500
+
+# Smaller batches finish before a process pool would have started
+POOL_THRESHOLD = 5000
+
+DEFAULT_DAMAGE = 'D6'
+
+Combatant = namedtuple('Combatant', ['name', 'kind', 'hp', 'armor', 'damage', 'stat', 'roll'])
+Encounter = namedtuple('Encounter', ['party', 'enemies'])
+
+
+def die_sides(damage):
+    """
+    'D8' -> 8
+    """
+    return int((damage or DEFAULT_DAMAGE)[1:])
+
+
+def load_encounter(campaign_id, npc_ids, character_ids=None):
+    """
+    The campaign's characters (or only character_ids), with their followers
+    and animal companions, against the campaign's NPCs in npc_ids.
+    Everyone starts at their current HP.
+    """
+    characters = Character.objects.filter(campaign_id=campaign_id).order_by('character_name', 'id')
+    if character_ids is not None:
+        characters = characters.filter(id__in=character_ids)
+    party = []
+    ids = []
+    for character in characters.values(
+        'id', 'character_name', 'current_hp', 'armor', 'damage_die', 'strength', 'dexterity', 'weakened',
+    ):
+        ids.append(character['id'])
+        party.append(Combatant(
+            character['character_name'], 'character', character['current_hp'], character['armor'],
+            die_sides(character['damage_die']), max(character['strength'], character['dexterity']),
+            DISADVANTAGE if character['weakened'] else NORMAL,
+        ))
+
+    for follower in FollowerInstance.objects.filter(campaign_id=campaign_id, character_id__in=ids).order_by(
+        'npc_instance__character_name', 'id'
+    ).values(
+        'npc_instance__character_name', 'npc_instance__current_hp', 'npc_instance__max_hp',
+        'npc_instance__armor', 'npc_instance__damage',
+    ):
+        party.append(Combatant(
+            follower['npc_instance__character_name'], 'follower',
+            follower['npc_instance__max_hp'] if follower['npc_instance__current_hp'] is None
+            else follower['npc_instance__current_hp'],
+            follower['npc_instance__armor'], die_sides(follower['npc_instance__damage']), 0, NORMAL,
+        ))
+
+    for companion in AnimalCompanion.objects.filter(character_id__in=ids).order_by('name', 'id').values(
+        'name', 'current_hp', 'max_hp', 'armor', 'damage',
+        'animal_type__base_hp', 'animal_type__base_armor__armor', 'animal_type__base_damage__damage_die',
+    ):
+        # Companions without their own stats use their animal type's
+        max_hp = companion['max_hp'] if companion['max_hp'] is not None else companion['animal_type__base_hp']
+        party.append(Combatant(
+            companion['name'], 'companion',
+            max_hp if companion['current_hp'] is None else companion['current_hp'],
+            companion['armor'] if companion['armor'] is not None else companion['animal_type__base_armor__armor'],
+            die_sides(companion['damage'] or companion['animal_type__base_damage__damage_die']), 0, NORMAL,
+        ))
+
+    enemies = [
+        Combatant(
+            npc['character_name'], 'npc', npc['max_hp'] if npc['current_hp'] is None else npc['current_hp'],
+            npc['armor'], die_sides(npc['damage']), 0, NORMAL,
+        )
+        for npc in NPCInstance.objects.filter(campaign_id=campaign_id, id__in=npc_ids).order_by(
+            'character_name', 'id'
+        ).values('character_name', 'current_hp', 'max_hp', 'armor', 'damage')
+    ]
+    return Encounter(party, enemies)
+
+
+def roll_2d6(roll, random):
+    """
+    random is a Random's random(): int(random() * 6) is a d6 - 1 and takes
+    a third of the time of randint(1, 6).
+    """
+    if roll == NORMAL:
+        return int(random() * 6) + int(random() * 6) + 2
+    dice = sorted([int(random() * 6), int(random() * 6), int(random() * 6)])
+    return (dice[0] + dice[1] if roll == DISADVANTAGE else dice[1] + dice[2]) + 2
+
+
+def damage(random, attacker, target):
+    return max(int(random() * attacker.damage) + 1 - target.armor, 0)
+
+
+def fight(encounter, rng):
+    """
+    Plays out one fight. Returns won (True, False or None for a draw),
+    the number of rounds and the party's HP at the end.
+    """
+    party, enemies = encounter
+    random = rng.random
+    party_hp = [member.hp for member in party]
+    enemy_hp = [enemy.hp for enemy in enemies]
+    standing = [i for i, hp in enumerate(party_hp) if hp > 0]
+    foes = [i for i, hp in enumerate(enemy_hp) if hp > 0]
+    if not foes:
+        return True, 0, party_hp
+    if not standing:
+        return False, 0, party_hp
+
+    for rounds in range(1, MAX_ROUNDS + 1):
+        for i in list(standing):
+            if party_hp[i] <= 0:
+                continue
+            member = party[i]
+            total = roll_2d6(member.roll, random) + member.stat
+            if total >= 7:
+                target = foes[int(random() * len(foes))]
+                enemy_hp[target] -= damage(random, member, enemies[target])
+                if enemy_hp[target] <= 0:
+                    foes.remove(target)
+                    if not foes:
+                        return True, rounds, party_hp
+            if total < 10:
+                party_hp[i] -= damage(random, enemies[foes[int(random() * len(foes))]], member)
+                if party_hp[i] <= 0:
+                    standing.remove(i)
+                    if not standing:
+                        return False, rounds, party_hp
+    return None, MAX_ROUNDS, party_hp
+
+
+class Tally(object):
+    """
+    The totals of a batch of fights, which add up across chunks.
+    """
+    def __init__(self, encounter):
+        self.encounter = encounter
+        self.runs = self.wins = self.wipes = 0
+        self.rounds = Counter()
+        self.hp_lost = [0] * len(encounter.party)
+        self.truncated = False
+
+    def add(self, won, rounds, party_hp):
+        self.runs += 1
+        self.wins += won is True
+        self.wipes += won is False
+        self.rounds[rounds] += 1
+        for i, (member, hp) in enumerate(zip(self.encounter.party, party_hp)):
+            self.hp_lost[i] += max(member.hp, 0) - max(hp, 0)
+
+    def merge(self, other):
+        self.runs += other.runs
+        self.wins += other.wins
+        self.wipes += other.wipes
+        self.rounds.update(other.rounds)
+        self.hp_lost = [a + b for a, b in zip(self.hp_lost, other.hp_lost)]
+
+    def as_json(self):
+        runs = self.runs or 1
+        rounds = sorted(self.rounds.elements())
+        return {
+            'runs': self.runs,
+            'truncated': self.truncated,
+            'win_rate': self.wins / runs,
+            'wipe_rate': self.wipes / runs,
+            'draw_rate': (self.runs - self.wins - self.wipes) / runs,
+            'rounds': {
+                'mean': sum(rounds) / runs,
+                'median': rounds[len(rounds) // 2] if rounds else 0,
+                'min': rounds[0] if rounds else 0,
+                'max': rounds[-1] if rounds else 0,
+            },
+            'hp_loss': [
+                {'name': member.name, 'kind': member.kind, 'hp': member.hp, 'expected': lost / runs}
+                for member, lost in zip(self.encounter.party, self.hp_lost)
+            ],
+        }
+
+
+def run_chunk(encounter, runs, seed):
+    rng = random.Random(seed)
+    tally = Tally(encounter)
+    for _ in range(runs):
+        tally.add(*fight(encounter, rng))
+    return tally
+
+
+def chunks(runs, seed):
+    for i, start in enumerate(range(0, runs, CHUNK_SIZE)):
+        yield min(CHUNK_SIZE, runs - start), f'{seed}-{i}'
+
+
+def simulate(encounter, runs, seed=None, workers=1, time_budget=None):
+    """
+    Plays runs fights and returns their Tally. Batches of more than
+    POOL_THRESHOLD runs are split across workers processes. Once
+    time_budget (in seconds) is spent no more chunks are waited for and the
+    tally is marked truncated.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    tally = Tally(encounter)
+
+    if workers > 1 and runs > POOL_THRESHOLD:
+        # Not a with block: its exit would wait for every chunk, past the time budget
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [
+                executor.submit(run_chunk, encounter, size, chunk_seed) for size, chunk_seed in chunks(runs, seed)
+            ]
+            for future in futures:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                tally.merge(future.result(timeout=timeout))
+        except TimeoutError:
+            tally.truncated = True
+        finally:
+            # Drops the chunks that haven't started, the running ones finish in the background
+            executor.shutdown(wait=not tally.truncated, cancel_futures=True)
+        return tally
+
+    for size, chunk_seed in chunks(runs, seed):
+        if deadline is not None and time.monotonic() >= deadline:
+            tally.truncated = True
+            break
+        tally.merge(run_chunk(encounter, size, chunk_seed))
+    return tally
@@ -0,0 +1,198 @@
+"""
+The history of what happened at the table: damage taken, uses and charges
+spent, XP marked, arcana marks and ammo.
+
+Every change is a narrow CampaignEvent row (a code for the target type and
+field, the target's id, the delta and the new value). During a request the
+events are kept in a buffer and written with one INSERT when it ends
+(see campaign.middleware.EventLogMiddleware); outside of one they are
+written at once:
+
+    record([event(campaign_id, character_id, 'move', move_instance_id, 'uses', -1, 2, user)])
+
+The changes an event describes are committed before it is written, so the
+log never fails a request: events whose delta or value don't fit their
+column are dropped when they are recorded, and a failed INSERT is logged
+and rolled back on its own.
+
+As each event holds the new value, a character's state is rebuilt by
+replaying its events in order over its latest snapshot. Events older than
+the retention are compacted: they are replayed into a CharacterSnapshot
+per character and deleted (the NPCs' old events are simply deleted).
+"""
+import json
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import DatabaseError, transaction
+from django.db.models import Max
+
+from campaign.constants import AMMO_CHOICES, EVENT_FIELDS
+from campaign.models import CampaignEvent, CharacterSnapshot
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+# The range of the delta and value columns
+MIN_INT = -2 ** 31
+MAX_INT = 2 ** 31 - 1
+
+CODES = {(target_type, field): code for code, target_type, field in EVENT_FIELDS}
+FIELDS = {code: (target_type, field) for code, target_type, field in EVENT_FIELDS}
+
+AMMO_LEVELS = [value for value, _ in AMMO_CHOICES]
+
+# The events of the current request, None outside of one
+_buffer = ContextVar('campaign_events', default=None)
+
+
+def encode(field, value):
+    if field == 'ammo' and value is not None:
+        return AMMO_LEVELS.index(value)
+    return value
+
+
+def decode(field, value):
+    if field == 'ammo' and value is not None:
+        return AMMO_LEVELS[value]
+    return value
+
+
+def event(campaign_id, character_id, target_type, target_id, field, delta, value, user=None):
+    return CampaignEvent(
+        campaign_id=campaign_id, character_id=character_id, user=user,
+        code=CODES[(target_type, field)], target_id=target_id, delta=delta, value=encode(field, value),
+    )
+
+
+def fits(change):
+    return MIN_INT <= change.delta <= MAX_INT and (change.value is None or MIN_INT <= change.value <= MAX_INT)
+
+
+def record(events):
+    """
+    Adds the events to the request's buffer, or writes them when there is none.
+    Events that don't fit their columns are logged and left out.
+    """
+    kept = []
+    for change in events:
+        if fits(change):
+            kept.append(change)
+        else:
+            logger.error(
+                'Dropping the event of %s %s (delta %s, value %s): it does not fit the event log',
+                FIELDS[change.code][0], change.target_id, change.delta, change.value,
+            )
+    events = kept
+    buffer = _buffer.get()
+    if buffer is None:
+        write(events)
+    else:
+        buffer.extend(events)
+
+
+def write(events):
+    """
+    Writes the events, all or none of them. A failure is logged rather than
+    raised: the changes they describe are already made.
+    """
+    if not events:
+        return
+    try:
+        with transaction.atomic():
+            CampaignEvent.objects.bulk_create(events, batch_size=BATCH_SIZE)
+    except DatabaseError:
+        logger.exception('Could not write %s events to the event log', len(events))
+
+
+@contextmanager
+def buffered():
+    """
+    Keeps the events recorded inside the block and writes them at the end.
+    The changes they describe are already committed, so they are written
+    even when the block raises.
+    """
+    token = _buffer.set([])
+    try:
+        yield
+    finally:
+        events = _buffer.get()
+        _buffer.reset(token)
+        write(events)
+
+
+def apply(state, code, target_id, value):
+    """
+    Sets the value of an event in state: {target type: {target id: {field: value}}}
+    (the ids are strings, like the JSON of a snapshot).
+    """
+    target_type, field = FIELDS[code]
+    state.setdefault(target_type, {}).setdefault(str(target_id), {})[field] = decode(field, value)
+
+
+def replay(character_id):
+    """
+    The character's counters as of its last event: the latest snapshot
+    with the events since then applied.
+    """
+    snapshot = CharacterSnapshot.objects.filter(character_id=character_id).order_by('-last_event_id').values(
+        'last_event_id', 'state',
+    ).first()
+    state = snapshot['state'] if snapshot else {}
+    events = CampaignEvent.objects.filter(character_id=character_id).order_by('id')
+    if snapshot:
+        events = events.filter(id__gt=snapshot['last_event_id'])
+    for code, target_id, value in events.values_list('code', 'target_id', 'value').iterator(chunk_size=BATCH_SIZE):
+        apply(state, code, target_id, value)
+    return state
+
+
+def export_events(campaign_id):
+    """
+    Yields the campaign's events in order, one JSON object per line.
+    """
+    events = CampaignEvent.objects.filter(campaign_id=campaign_id).order_by('id').values_list(
+        'id', 'created', 'character_id', 'user_id', 'code', 'target_id', 'delta', 'value',
+    )
+    for pk, created, character_id, user_id, code, target_id, delta, value in events.iterator(chunk_size=BATCH_SIZE):
+        target_type, field = FIELDS[code]
+        yield json.dumps({
+            'id': pk, 'created': created.isoformat(), 'character': character_id, 'user': user_id,
+            'target_type': target_type, 'target': target_id, 'field': field,
+            'delta': delta, 'value': decode(field, value),
+        }) + '\n'
+
+
+def compact(before):
+    """
+    Replays the events created before the datetime into a new snapshot
+    for each of their characters and deletes them.
+    Returns the number of events deleted and of snapshots taken.
+    """
+    with transaction.atomic():
+        last_event_id = CampaignEvent.objects.filter(created__lt=before).aggregate(last=Max('id'))['last']
+        if last_event_id is None:
+            return 0, 0
+        old_events = CampaignEvent.objects.filter(id__lte=last_event_id)
+        character_ids = set(old_events.filter(character__isnull=False).order_by().values_list(
+            'character_id', flat=True,
+        ).distinct())
+        states = {
+            snapshot.character_id: snapshot.state
+            for snapshot in CharacterSnapshot.objects.filter(character_id__in=character_ids).order_by(
+                'character_id', '-last_event_id',
+            ).distinct('character_id')
+        }
+        for character_id, code, target_id, value in old_events.filter(character__isnull=False).order_by(
+            'character_id', 'id',
+        ).values_list('character_id', 'code', 'target_id', 'value').iterator(chunk_size=BATCH_SIZE):
+            apply(states.setdefault(character_id, {}), code, target_id, value)
+        CharacterSnapshot.objects.bulk_create([
+            CharacterSnapshot(character_id=character_id, last_event_id=last_event_id, state=states[character_id])
+            for character_id in sorted(character_ids)
+        ], batch_size=BATCH_SIZE)
+        deleted, _ = old_events.delete()
+    return deleted, len(character_ids)
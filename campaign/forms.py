@@ -17,9 +17,9 @@ from dal import autocomplete
 
 from .models import (
     AnimalCompanion, AnimalCompanionAttributes, AnimalCompanionType, 
-    ArcanaConsequences, ArcanaMoveInstance, ArcanaMoves, BackgroundExtraAbilities, BackgroundInstance, DefaultNPC, FearAndAnger, InitiateOfDanuInstance, Invocation, MajorArcanaInstance, 
-    MajorArcanaTasks, MajorArcanum, MinorArcanaInstance, 
-    MinorArcanaTasks, MinorArcanum, MoveExtraAbilities, MoveInstance, SmallItem, SmallItemInstance, 
+    ArcanaMoveInstance, BackgroundExtraAbilities, BackgroundInstance, DefaultNPC, FearAndAnger, InitiateOfDanuInstance, Invocation, MajorArcanaInstance, 
+    MajorArcanum, MinorArcanaInstance, 
+    MinorArcanum, MoveExtraAbilities, MoveInstance, SmallItem, SmallItemInstance, 
     SpecialPossessionInstance, SpecialPossessionExtras, TallTales, TheWouldBeHero, 
     character_classes_dict,
     AppearanceAttribute, Campaign, 
@@ -30,18 +30,25 @@ from .models import (
     TheMarshal, TheRanger, TheSeeker,
     FollowerInstance, Crew
 )
+from campaign.registry import get_id, get_ids
+from campaign.eligibility import eligible_move_ids
+from campaign.creation_rules import STAT_FIELDS, validate_character
+from campaign.spawning import MAX_SPAWN
+from campaign.arcana import get_arcana_graph, taken_move_ids, unlock_moves
+from campaign.utils import CatalogChoiceMixin, VersionedFormMixin
 from campaign.constants import (
-    BLESSED_STARTING_MOVES, BLESSED_BACKGROUND_MOVES,
+    BLESSED_STARTING_MOVES,
     HEAVY_STARTING_MOVES, 
     JUDGE_STARTING_MOVES, JUDGE_STARTING_POSSESSIONS, 
     LIGHTBEARER_STARTING_MOVES,
-    MARSHAL_STARTING_MOVES, MARSHAL_BACKGROUND_MOVES,
-    RANGER_STARTING_MOVES, RANGER_BACKGROUND_MOVES, RANGER_STARTING_POSSESSIONS,
-    SEEKER_STARTING_MOVES, SEEKER_BACKGROUND_MOVES, SEEKER_STARTING_POSSESSIONS,
+    MARSHAL_STARTING_MOVES,
+    RANGER_STARTING_MOVES, RANGER_STARTING_POSSESSIONS,
+    SEEKER_STARTING_MOVES, SEEKER_STARTING_POSSESSIONS,
+    SEEKER_BACKGROUND_ARCANA,
     WOULD_BE_HERO_STARTING_MOVES,
     CREW_INSTINCTS, CREW_COSTS, MARSHAL_CREW_TAGS,
     DAMAGE_DIE, STONETOP_RESIDENCES,
-    ANIMAL_COMPANION_COSTS, ANIMAL_COMPANION_INSTINCTS, 
+    ANIMAL_COMPANION_COSTS, ANIMAL_COMPANION_INSTINCTS, ANIMAL_COMPANION_STARTING_TAGS,
     DANU_SHRINE, HELIORS_SHRINE, 
     LIGHTBEARER_POWER_ORIGINS, POUCH_AESTHETICS, 
     POUCH_MATERIAL, POUCH_ORIGINS, SHRINE_OF_ARATIS, SOMETHING_WICKED, TALE_ENDINGS, 
@@ -82,10 +89,12 @@ class CheckCampaignCodeForm(forms.Form):
         return super(CheckCampaignCodeForm, self).save(*args, **kwargs)    
 
 
-class BackgroundMCF(forms.ModelChoiceField):
+class BackgroundMCF(CatalogChoiceMixin, forms.ModelChoiceField):
     """
     Creates a custom label for the background field of the characters.
     """
+    catalog_section = 'backgrounds'
+
     def label_from_instance(self, background):
         background_string = f"""
         <span>
@@ -107,10 +116,12 @@ class BackgroundMCF(forms.ModelChoiceField):
         return mark_safe(background_string)
 
 
-class InstinctMMCF(forms.ModelChoiceField):
+class InstinctMMCF(CatalogChoiceMixin, forms.ModelChoiceField):
     """
     Creates a custom label for the instinct field of the characters.
     """
+    catalog_section = 'instincts'
+
     def label_from_instance(self, instinct):
         return mark_safe(f"""
         <span><strong>{ instinct.name }</strong><span>
@@ -118,7 +129,14 @@ class InstinctMMCF(forms.ModelChoiceField):
         """)
 
 
-class AttributeMMCF(forms.ModelChoiceField):
+class AppearanceMCF(CatalogChoiceMixin, forms.ModelChoiceField):
+    """
+    Appearance attribute choices built from the catalog.
+    """
+    catalog_section = 'appearance_attributes'
+
+
+class AttributeMMCF(AppearanceMCF):
     """
     Creates a custom label for the age field of the characters.
     """
@@ -142,10 +160,12 @@ class PlaceOfOriginMMCF(forms.ModelChoiceField):
         """)
 
 
-class SpecialPossessionsMMCF(forms.ModelMultipleChoiceField):
+class SpecialPossessionsMMCF(CatalogChoiceMixin, forms.ModelMultipleChoiceField):
     """
     Creates a custom label for the special possessions
     """
+    catalog_section = 'special_possessions'
+
     def label_from_instance(self, special_possession):
         label_string = f"""
             <span><strong>{ special_possession.possession_name }</strong>
@@ -159,10 +179,12 @@ class SpecialPossessionsMMCF(forms.ModelMultipleChoiceField):
         return mark_safe(label_string)
 
 
-class CharacterMovesMMCF(forms.ModelMultipleChoiceField):
+class CharacterMovesMMCF(CatalogChoiceMixin, forms.ModelMultipleChoiceField):
     """
     Creates a custom label for the special possessions
     """
+    catalog_section = 'moves'
+
     def label_from_instance(self, character_moves):
         field_label = f"""
         <span><strong>{ character_moves.name  }</strong>
@@ -198,22 +220,22 @@ class CreateCharacterForm(forms.ModelForm):
         widget=forms.RadioSelect,
     )
     
-    appearance1 = forms.ModelChoiceField(
+    appearance1 = AppearanceMCF(
         queryset=None,
         widget=forms.RadioSelect(attrs={}),
     )
     
-    appearance2 = forms.ModelChoiceField(
+    appearance2 = AppearanceMCF(
         queryset=None,
         widget=forms.RadioSelect,
     )
     
-    appearance3 = forms.ModelChoiceField(
+    appearance3 = AppearanceMCF(
         queryset=None,
         widget=forms.RadioSelect,
     )
     
-    appearance4 = forms.ModelChoiceField(
+    appearance4 = AppearanceMCF(
         queryset=None,
         widget=forms.RadioSelect,
     )
@@ -254,6 +276,7 @@ class CreateCharacterForm(forms.ModelForm):
 
     def __init__(self, character_class=None, *args, **kwargs):
         super(CreateCharacterForm, self).__init__(*args, **kwargs)
+        self.character_class = character_class
         self.fields['background'].label = ''
         self.fields['instinct'].label = ''
         self.fields['appearance1'].label = ''
@@ -348,114 +371,26 @@ class CreateCharacterForm(forms.ModelForm):
         data['move_instances'] = move_instances + new_instances
         return super(CreateCharacterForm, self).save(*args, **kwargs)
 
-    def clean(self, starting_moves=None, background_moves=None, starting_possessions=None, is_would_be_hero=False):
+    def clean(self):
+        """
+        Checks the playbook's rules (see campaign.creation_rules)
+        and reports every rule that is broken.
+        """
         cleaned_data = super(CreateCharacterForm, self).clean()
         move_instances = cleaned_data.get('move_instances')
-        special_possessions = cleaned_data.get('special_possessions')
-        background = cleaned_data.get('background')
-        error_list = []
-        # This gets only the moves with move requirements
-        if move_instances != None:
-            moves = [move for move in move_instances if move.move_requirements != None]
-            for move in moves:
-                reqs = move.move_requirements
-                # Check for required moves
-                if reqs.move_restricted: 
-                    # If the required move in not in the list
-                    # Raise an validation error
-                    if reqs.move_restricted not in move_instances:
-                        error_list.append(forms.ValidationError(
-                            f"{move} requires the {reqs.move_restricted} move."
-                        ))
-        else:
+        if move_instances is None:
             return cleaned_data
-
-        # Checks that the starting moves for the character are present.
-        if starting_moves != None:
-            move_instances = [move.name for move in move_instances]
-            for move in starting_moves:
-                if move not in move_instances:
-                    error_list.append(forms.ValidationError(
-                        f"{move} is a required starting move."
-                    ))
-        # Checks that the starting special possessions are present.
-        if starting_possessions != None:
-            special_possessions = [possession.possession_name for possession in special_possessions]
-            for possession in starting_possessions:
-                if possession not in special_possessions:
-                    error_list.append(forms.ValidationError(
-                        f"{possession} is a required starting special possession."
-                    ))
-        # Checks that the corresponding background move has been selected
-        # If the background has a corresponding background move
-        if background_moves:
-            for b, m in background_moves.items():
-                if str(background) == b:
-                    if m not in move_instances:
-                        if type(m) == list:
-                            for move in m:
-                                if move not in move_instances:
-                                    error_list.append(forms.ValidationError(
-                                        f"{move} move is required for {b} background."
-                                    ))
-                        else:
-                            error_list.append(forms.ValidationError(
-                                    f"{m} move is required for {b} background."
-                                ))
-
-        # TODO: Maybe add validation for stats
-        # I.e check that the following stat are present: 2, 1, 1, 0, 0, -1
-        # Except for The Would Be Hero which will have +1, 0, 0, 0, 0, -1
-        strength = cleaned_data.get('strength')
-        dexterity = cleaned_data.get('dexterity')
-        intelligence = cleaned_data.get('intelligence')
-        wisdom = cleaned_data.get('wisdom')
-        constitution = cleaned_data.get('constitution')
-        charisma = cleaned_data.get('charisma')
-        default_stat_dict = {
-            '2': 1,
-            '1': 2,
-            '0': 2,
-            '-1': 1,
-        }
-        would_be_hero_stat_dict = {
-            '1': 1,
-            '0': 4,
-            '-1': 1,
-        }
-        stats = {
-            'Strength': str(strength), 
-            'Dexterity': str(dexterity), 
-            'Intelligence': str(intelligence), 
-            'Wisdom': str(wisdom), 
-            'Constitution': str(constitution), 
-            'Charisma': str(charisma),
-        }
-        stat_string = ''
-        char_stat_dict = {}
-        for name, stat in stats.items():
-            if stat in char_stat_dict:
-                char_stat_dict[stat] += 1
-            else:
-                char_stat_dict[stat] = 1
-            if name == 'Charisma':
-                stat_string += f'{name}: {stat}.'
-                
-            else:    
-                stat_string += f'{name}: {stat}, '
-        if is_would_be_hero:
-            if char_stat_dict != would_be_hero_stat_dict:
-                error_list.append(forms.ValidationError(
-                    f"Stats should have the following scores (they can be in any order): +1, 0, 0, 0, 0, -1. Your stats are as follows: {stat_string}"
-                ))
-        else:
-            if char_stat_dict != default_stat_dict:
-                error_list.append(forms.ValidationError(
-                    f"Stats should have the following scores (they can be in any order): +2, +1, +1, 0, 0, -1. Your stats are as follows: {stat_string}"
-                ))
-
-        if error_list:
-            raise forms.ValidationError(error_list)
+        background = cleaned_data.get('background')
+        special_possessions = cleaned_data.get('special_possessions') or []
+        errors = validate_character(
+            str(self.character_class),
+            background.pk if background else None,
+            [move.pk for move in move_instances],
+            [possession.pk for possession in special_possessions],
+            {field: cleaned_data.get(field) for field in STAT_FIELDS},
+        )
+        if errors:
+            self.add_error(None, errors)
         return cleaned_data
 
     def get_moves_queryset(self, character_class, exclude_list=[]):
@@ -541,12 +476,6 @@ class CreateTheBlessedForm(CreateCharacterForm):
         self.fields['move_instances'].queryset = self.get_moves_queryset(
             character_class)
 
-    def clean(self):
-        starting_moves = BLESSED_STARTING_MOVES
-        cleaned_data = super(CreateTheBlessedForm, self).clean(
-            starting_moves=starting_moves, background_moves=BLESSED_BACKGROUND_MOVES)
-        return cleaned_data
-
 
 class InitiatesOfDanuMMCF(forms.ModelMultipleChoiceField):
     """
@@ -739,42 +668,7 @@ class CreateTheFoxForm(CreateCharacterForm):
     
     def __init__(self, character_class=None, *args, **kwargs):
         super(CreateTheFoxForm, self).__init__(character_class=character_class, *args, **kwargs)
-        
-    def clean(self):
-        cleaned_data = super(CreateTheFoxForm, self).clean()
-        # Create an error list to add errors to
-        error_list = []
-        move_instances = cleaned_data.get('move_instances', [])
-        background = cleaned_data.get('background', '')
-        if move_instances == [] or background == '': 
-            return cleaned_data
-        move_instances = [move.name for move in move_instances]
-        movesets = {
-            '1': ['AMBUSH', 'SKILL AT ARMS'],
-            '2': ['DANGER SENSE', 'PERCEPTIVE'],
-        }
-        checks = {
-            '1': 0,
-            '2': 0,
-        }
-        crime = ''
-        if str(background) == "A LIFE OF CRIME":
-            movesets['3'] = ['BURGLE', 'LIGHT FINGERS']
-            checks['3'] = 0
-            crime = f" with {background} background"
-        for move in move_instances:
-            for check in checks:
-                if move in movesets[check]:
-                    checks[check] += 1
-        for check, v in checks.items():
-            if v < 1:
-                error_list.append(forms.ValidationError(
-                    f"{movesets[check][0]} or {movesets[check][1]} move is required{crime}."
-                ))
-        if error_list: 
-            raise ValidationError(error_list)
-        return cleaned_data
-        
+
 
 class CreateTheHeavyForm(CreateCharacterForm):
     """
@@ -812,30 +706,6 @@ class CreateTheHeavyForm(CreateCharacterForm):
             move_list=starting_moves)
         self.fields['move_instances'].queryset = self.get_moves_queryset(
             character_class)
-    
-    def clean(self):
-        starting_moves = HEAVY_STARTING_MOVES
-        cleaned_data = super(CreateTheHeavyForm, self).clean(starting_moves=starting_moves)
-        move_instances = cleaned_data.get('move_instances', [])
-        # If there are no moves, this is not a valid form
-        if move_instances == []:
-            return cleaned_data
-        move_instances = [move.name for move in move_instances]
-        # Checks that SPIRIT TONGUE and CALL THE SPIRITS 
-        # are in the move_instances
-        initial_options = ['ARMORED', 'UNCANNY REFLEXES']
-        error_list = []
-        initial_move_in_moves = False
-        for move in move_instances:
-            if move in initial_options:
-                initial_move_in_moves = True
-        if initial_move_in_moves == False:
-            error_list.append(forms.ValidationError(
-                f"{initial_options[0]} or {initial_options[1]} move is required for The Heavy."
-            ))
-        if error_list:
-            raise ValidationError(error_list)
-        return cleaned_data
 
 
 class SymbolOfAuthorityMCF(forms.ModelChoiceField):
@@ -904,11 +774,6 @@ class CreateTheJudgeForm(CreateCharacterForm):
         self.fields['special_possessions'].initial = SpecialPossessions.objects.filter(
             possession_name__in=self.starting_possessions)
 
-    def clean(self):
-        cleaned_data = super(CreateTheJudgeForm, self).clean(
-            starting_moves=self.starting_moves, starting_possessions=self.starting_possessions)
-        return cleaned_data
-
 
 class CreateTheLightbearerForm(CreateCharacterForm):
     """
@@ -961,10 +826,6 @@ class CreateTheLightbearerForm(CreateCharacterForm):
         self.fields['move_instances'].queryset = self.get_moves_queryset(
             character_class=character_class
         )
-    
-    def clean(self):
-        cleaned_data = super(CreateTheLightbearerForm, self).clean(starting_moves=self.starting_moves)
-        return cleaned_data
 
 
 class InvocationMMCF(forms.ModelMultipleChoiceField):
@@ -1031,8 +892,7 @@ class CreateTheMarshalForm(CreateCharacterForm):
             character_class=character_class)
 
     def clean(self):
-        cleaned_data = super(CreateTheMarshalForm, self).clean(
-            starting_moves=self.starting_moves, background_moves=MARSHAL_BACKGROUND_MOVES)
+        cleaned_data = super(CreateTheMarshalForm, self).clean()
         error_list = []
         details = [cleaned_data[f'war_detail_{x}']for x in range(1,9)]
         submitted_details = [detail for detail in details if detail]
@@ -1041,7 +901,7 @@ class CreateTheMarshalForm(CreateCharacterForm):
                 f'You have answered {len(submitted_details)} questions. Please answer at least 3 questions about the war story.'
             ))
         if error_list:
-            raise forms.ValidationError(error_list)
+            self.add_error(None, error_list)
         return cleaned_data
 
 
@@ -1079,10 +939,7 @@ class CreateTheRangerForm(CreateCharacterForm):
             possession_name__in=self.starting_possessions)
 
     def clean(self):
-        cleaned_data = super(CreateTheRangerForm, self).clean(
-            starting_moves=self.starting_moves,
-            background_moves=RANGER_BACKGROUND_MOVES,
-            starting_possessions=self.starting_possessions)
+        cleaned_data = super(CreateTheRangerForm, self).clean()
         error_list = []
         details = [cleaned_data[f'wicked_detail_{x}']for x in range(1,8)]
         submitted_details = [detail for detail in details if detail]
@@ -1091,7 +948,7 @@ class CreateTheRangerForm(CreateCharacterForm):
                 f'You have answered {len(submitted_details)} question(s). Please answer at least 3 questions about something wicked.'
             ))
         if error_list:
-            raise forms.ValidationError(error_list)
+            self.add_error(None, error_list)
         return cleaned_data
 
 
@@ -1122,13 +979,6 @@ class CreateTheSeekerForm(CreateCharacterForm):
         )
         self.fields['special_possessions'].initial = SpecialPossessions.objects.filter(
             possession_name__in=self.starting_possessions)
-    
-    def clean(self):
-        cleaned_data = super(CreateTheSeekerForm, self).clean(
-            starting_moves=self.starting_moves, 
-            background_moves=SEEKER_BACKGROUND_MOVES,
-            starting_possessions=self.starting_possessions)
-        return cleaned_data
 
 
 class CreateTheWouldBeHeroForm(CreateCharacterForm):
@@ -1165,11 +1015,6 @@ class CreateTheWouldBeHeroForm(CreateCharacterForm):
             character_class=character_class, move_list=self.starting_moves)
         self.fields['move_instances'].queryset = self.get_moves_queryset(
             character_class=character_class)
-    
-    def clean(self):
-        cleaned_data = super(CreateTheWouldBeHeroForm, self).clean(
-            starting_moves=self.starting_moves, is_would_be_hero=True)
-        return cleaned_data
 
 
 # Crew Form:
@@ -1198,14 +1043,16 @@ class CreateCrewForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super(CreateCrewForm, self).__init__(*args, **kwargs)
         self.fields['crew_tags'].initial = Tags.objects.filter(name='group')
-        self.fields['crew_tags'].queryset = Tags.objects.filter(name__in=MARSHAL_CREW_TAGS)
+        self.fields['crew_tags'].queryset = Tags.objects.filter(id__in=get_ids(Tags, MARSHAL_CREW_TAGS))
     
 # Arcana Forms for The Seeker:
 
-class MajorArcanaMCF(forms.ModelChoiceField):
+class MajorArcanaMCF(CatalogChoiceMixin, forms.ModelChoiceField):
     """
     Creates a custom label for major arcana
     """
+    catalog_section = 'major_arcana'
+
     def label_from_instance(self, arcana):
         weight = ''
         for x in range(arcana.weight):
@@ -1214,7 +1061,7 @@ class MajorArcanaMCF(forms.ModelChoiceField):
         <span class="h4">{ arcana.name }</span>
         <div class="border rounded p-2">
         """
-        tags = arcana.tags.all()
+        tags = arcana.tags
         field_label += "<span>"
         if weight != 0:
             field_label += f"{weight}, "
@@ -1255,27 +1102,27 @@ class MajorArcanaMCF(forms.ModelChoiceField):
         if arcana.description3:
             field_label += f" { arcana.description3 } "
 
-        tasks = MajorArcanaTasks.objects.filter(arcana=arcana.id)
-        if tasks != None:
-            field_label += f'<ul>'
-            for task in tasks.all():
-                field_label += f'<li>{task.description}</li>'
-            field_label += f'</ul>'
+        field_label += f'<ul>'
+        for task in arcana.tasks:
+            field_label += f'<li>{task}</li>'
+        field_label += f'</ul>'
         field_label += '</div>'
         return mark_safe(field_label)
 
 
-class MinorArcanaMMCF(forms.ModelMultipleChoiceField):
+class MinorArcanaMMCF(CatalogChoiceMixin, forms.ModelMultipleChoiceField):
     """
-    Creates a custom label for major arcana
+    Creates a custom label for minor arcana
     """
+    catalog_section = 'minor_arcana'
+
     def label_from_instance(self, arcana):
         # Starts the border after the name of the arcana
         field_label = f"""
         <span class="h4">{ arcana.name }</span>
         <div class="border rounded p-2 mb-3">
         """
-        tags = arcana.tags.all()
+        tags = arcana.tags
         field_label += "<span>"
         
         if arcana.weight:
@@ -1306,12 +1153,10 @@ class MinorArcanaMMCF(forms.ModelMultipleChoiceField):
                 field_label += '⭘'
             field_label += "</div>"
 
-        tasks = MinorArcanaTasks.objects.filter(arcana=arcana.id)
-        if tasks != None:
-            field_label += f'<ul>'
-            for task in tasks.all():
-                field_label += f'<li>{task.description}</li>'
-            field_label += f'</ul>'
+        field_label += f'<ul>'
+        for task in arcana.tasks:
+            field_label += f'<li>{task}</li>'
+        field_label += f'</ul>'
         
 
         field_label += f"<div class='text-center m-2'><h5>{ arcana.back_name }</h5></div>"
@@ -1359,27 +1204,13 @@ class TheSeekerInititalArcanaForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super(TheSeekerInititalArcanaForm, self).__init__(*args, **kwargs)
         instance = kwargs.pop('instance', None)
-        background = str(instance.background)
+        background = instance.background.slug
         self.character_id = instance.id
         # self.fields['major_arcana'].label = ""
         # Filter the arcana options based on The Seeker background:
-        if background == 'PATRIOT':
-            self.fields['major_arcana'].queryset = MajorArcanum.objects.filter(
-                Q(name="Hec'tumel Codex") | 
-                Q(name="Red Scepter") |
-                Q(name="Staff of the Lidless Orb")
-            )
-        elif background == 'ANTIQUARIAN':
+        if background in SEEKER_BACKGROUND_ARCANA:
             self.fields['major_arcana'].queryset = MajorArcanum.objects.filter(
-                Q(name="Noruba's Ice Sphere") | 
-                Q(name="Azure Hand") |
-                Q(name="Mindgem")
-            )
-        elif background == 'WITCH HUNTER':
-            self.fields['major_arcana'].queryset = MajorArcanum.objects.filter(
-                Q(name="Demonhide Cloak") | 
-                Q(name="Redwood Effigy") |
-                Q(name="Twisted Spear")
+                id__in=get_ids(MajorArcanum, SEEKER_BACKGROUND_ARCANA[background])
             )
 
         # TODO: Set the queryset for the minor arcana (randomly select a number of minor arcanas
@@ -1401,29 +1232,21 @@ class TheSeekerInititalArcanaForm(forms.ModelForm):
             marks = 1
         if major_arcana.total_charges:
             charges=0
-        arcana_instance = MajorArcanaInstance.objects.create(
+        MajorArcanaInstance.objects.create(
             arcana=major_arcana,
             character=character,
             marks=marks,
             charges=charges       
         )
-        new_arcanum = MajorArcanaInstance.objects.filter(id=arcana_instance.id)
-        data['major_arcana'] = new_arcanum
         marks, charges = 0, 0
         # Create new minor arcana instances:
-        minor_arcana = list(data['minor_arcana'])
-        data['minor_arcana'] = []
-        new_arcana = []
-        # Create Instances for each item:
-        for arcana in minor_arcana:
-            new_arcanum = MinorArcanaInstance.objects.create(
+        for arcana in data['minor_arcana']:
+            MinorArcanaInstance.objects.create(
                 arcana=arcana,
                 character=character,
                 marks=marks,
                 charges=charges
             )
-            new_arcana.append(new_arcanum)
-        data['minor_arcana'] = new_arcana
 
         return super(TheSeekerInititalArcanaForm, self).save(*args, **kwargs)
         
@@ -1478,7 +1301,7 @@ class SpecialPossessionExtrasMMCF(forms.ModelMultipleChoiceField):
 
 # Update Special Possessions Forms:
 
-class UpdateSpecialPossessionInstanceForm(forms.ModelForm):
+class UpdateSpecialPossessionInstanceForm(VersionedFormMixin, forms.ModelForm):
     """
     Allows player to update their special possession instance.
     I.e. update the move throughout the campaign.
@@ -1503,7 +1326,6 @@ class UpdateSpecialPossessionInstanceForm(forms.ModelForm):
     def save(self, commit=True, *args, **kwargs):
         data = self.cleaned_data
         character = Character.objects.get(id=self.character_id)
-        new_items = []
         
         for extra in data['extras']:
             if extra.is_item == True:
@@ -1527,15 +1349,10 @@ class UpdateSpecialPossessionInstanceForm(forms.ModelForm):
                         created_by = character,
                     )
                     new_item.tags.set(extra.tags.all())
-                    item_instance = ItemInstance.objects.create(
-                        item = new_item,
-                        character = character,
-                        uses=extra.total_uses,
-                        outfitted=True,
-                    )
-                    new_items.append(item_instance)
-
-        character.items.set(new_items)
+                    # Creating the item already gave the character an instance of it
+                    ItemInstance.objects.filter(
+                        item=new_item, character=character,
+                    ).update(uses=extra.total_uses)
 
         return super(UpdateSpecialPossessionInstanceForm, self).save(commit=True, *args, **kwargs)
 
@@ -1544,7 +1361,7 @@ class UpdateSpecialPossessionInstanceForm(forms.ModelForm):
 
 # Update Move Instance form:
 
-class UpdateMoveInstanceForm(forms.ModelForm):
+class UpdateMoveInstanceForm(VersionedFormMixin, forms.ModelForm):
     """
     Allows player to update their move instance.
     I.e. update the move throughout the campaign.
@@ -1588,9 +1405,9 @@ class UpdateCharacterMovesForm(forms.ModelForm):
         self.character_id = instance.id
         self.character_class = instance.character_class
         self.fields['move_instances'].label = ""
-        move_instances = instance.move_instances.all()
+        owned_move_ids = instance.move_instances.values_list('move_id', flat=True)
         move_queryset = self.get_moves_queryset(
-            character_class=self.character_class, move_instances=move_instances)
+            character=instance, owned_move_ids=owned_move_ids)
         self.fields['move_instances'].queryset = move_queryset
         # This is to prevent any moves from "creeping" into the initial moves for the form
         # TODO: Figure out why this happens and come up with a better fix
@@ -1628,30 +1445,13 @@ class UpdateCharacterMovesForm(forms.ModelForm):
 
         return super(UpdateCharacterMovesForm, self).save(*args, **kwargs)
 
-    def get_moves_queryset(self, character_class, move_instances, exclude_list=[]):
+    def get_moves_queryset(self, character, owned_move_ids):
         """
-        Gets the moves for updating the moves for each character class.
+        Gets the moves the character can take when leveling up
+        (see campaign.eligibility for the rules).
         """
-        id_list = []
-        # The dict is for moves that can be taken more than once:
-        id_dict = {}
-        for move_instance in move_instances:
-            if move_instance.move.id not in id_list:
-                # This filters moves that can be taken more than once
-                if move_instance.move.take_move_limit > 1:
-                    if move_instance.move in id_dict:
-                        id_dict[move_instance.move] += 1
-                    else:
-                        id_dict[move_instance.move] = 1
-                    if id_dict[move_instance.move] >= move_instance.move.take_move_limit:
-                        id_list.append(move_instance.move.id)
-                else:
-                    id_list.append(move_instance.move.id)
-        # Make a query to exclude all the moves that have already been taken
         qs = Moves.objects.filter(
-            character_class__class_name=character_class,
-        ).exclude(
-            id__in=id_list
+            id__in=eligible_move_ids(character, owned_move_ids),
         ).order_by(
                 F('move_requirements__level_restricted').asc(nulls_first=True), 
                 F('move_requirements__move_restricted').asc(nulls_first=True), 
@@ -1661,7 +1461,7 @@ class UpdateCharacterMovesForm(forms.ModelForm):
 
 
 # Stats:
-class CharacterUpdateStatsForm(forms.ModelForm):
+class CharacterUpdateStatsForm(VersionedFormMixin, forms.ModelForm):
     """
     Allows players to update their inventory
     """
@@ -1844,32 +1644,14 @@ class UpdateCharacterInventoryForm(forms.ModelForm):
         self.fields['items'].label = ""
         self.fields['small_items'].label = ""
 
-        id_list = []
         # This will display only items that the character is not carrying
-        for item in instance.items.all():
-            if item.item.id not in id_list:
-                id_list.append(item.item.id)
-        # Make a query to exclude all the Items that have already been taken
-        item_queryset = InventoryItem.objects.filter(
-            Q(
-            Q(default_item=True) |
-            Q(created_by=instance) |
-            Q(can_view=instance))).exclude(
-                id__in=id_list
+        item_queryset = InventoryItem.objects.visible_to(instance).exclude(
+            id__in=instance.items.values('item')
         )
         self.fields['items'].queryset = item_queryset
 
-        id_list = []    
-        for small_item in instance.small_items.all():
-            if small_item.small_item.id not in id_list:
-                id_list.append(small_item.small_item.id)
-        # Make a query to exclude all the SmallItems that have already been taken
-        small_item_queryset = SmallItem.objects.filter(
-            Q(
-            Q(default_item=True) |
-            Q(created_by=instance) |
-            Q(can_view=instance))).exclude(
-                id__in=id_list
+        small_item_queryset = SmallItem.objects.visible_to(instance).exclude(
+            id__in=instance.small_items.values('small_item')
         ).order_by('name')
         self.fields['small_items'].queryset = small_item_queryset
 
@@ -1879,35 +1661,22 @@ class UpdateCharacterInventoryForm(forms.ModelForm):
         c_class = self.character_class
         character_class = character_classes_dict[c_class]
         character = character_class.objects.get(id=self.character_id)
-        # Create list of the current items and small items
-        current_items = list(character.items.all())
-        current_small_items = list(character.small_items.all())
-
         # Create new item instances:
-        items = list(data['items'])
-        new_items = []
-        # Create Instances for each item:
-        for item in items:
-            new_item = ItemInstance.objects.create(
+        # (the character field is what adds them to the inventory)
+        for item in data['items']:
+            ItemInstance.objects.create(
                 item=item,
                 outfitted=True,
                 character=character,
             )
-            new_items.append(new_item)
-        data['items'] = new_items + current_items
 
         # Create new small item instances:
-        small_items = list(data['small_items'])
-        new_items = []
-        # Create Instances for each item:
-        for small_item in small_items:
-            new_item = SmallItemInstance.objects.create(
+        for small_item in data['small_items']:
+            SmallItemInstance.objects.create(
                 small_item=small_item,
                 outfitted=True,
                 character=character,
             )
-            new_items.append(new_item)
-        data['small_items'] = new_items + current_small_items
 
         ############# IMPORTANT! ###################
         # This prevents a new instance being created
@@ -1948,7 +1717,7 @@ class CreateCustomSmallItemForm(forms.ModelForm):
         }
 
 
-class UpdateItemInstanceForm(forms.ModelForm):
+class UpdateItemInstanceForm(VersionedFormMixin, forms.ModelForm):
     """
     Form allows player in the front end to update their usage of their items.
     """
@@ -1962,7 +1731,7 @@ class UpdateItemInstanceForm(forms.ModelForm):
         self.fields['uses'].label = f"{instance.item.uses_name}"
 
 
-class UpdateSmallItemInstanceForm(forms.ModelForm):
+class UpdateSmallItemInstanceForm(VersionedFormMixin, forms.ModelForm):
     """
     Form allows player in the front end to update their usage of their small items.
     """
@@ -1998,6 +1767,16 @@ class GMCreateNPCInstanceForm(forms.ModelForm):
         exclude = ["campaign",]
 
 
+class SpawnNPCsForm(forms.Form):
+    """
+    Lets the GM create many NPCs from a default NPC at once.
+    """
+    default_npc = forms.ModelChoiceField(queryset=DefaultNPC.objects.order_by('name'), label='Default NPC')
+    count = forms.IntegerField(min_value=1, max_value=MAX_SPAWN, initial=10, label='How many?')
+    random_names = forms.BooleanField(required=False, help_text="Otherwise they are numbered after the default NPC.")
+    random_pronouns = forms.BooleanField(required=False)
+
+
 class PlayerCreateNPCInstanceForm(forms.ModelForm):
     """
     Allows the GM to create NPCs in the front end
@@ -2047,7 +1826,7 @@ class UpdateNPCinstanceForm(forms.ModelForm):
         }
     
 
-class UpdateFollowerForm(forms.ModelForm):
+class UpdateFollowerForm(VersionedFormMixin, forms.ModelForm):
     """
     Allows players to update their followers
     """
@@ -2094,6 +1873,14 @@ class UpdateFollowerForm(forms.ModelForm):
         max_length=1000,
         required=False,
     )
+    items = forms.ModelMultipleChoiceField(
+        queryset=None,
+        required=False,
+    )
+    small_items = forms.ModelMultipleChoiceField(
+        queryset=None,
+        required=False,
+    )
 
     class Meta:
         model = FollowerInstance
@@ -2120,77 +1907,44 @@ class UpdateFollowerForm(forms.ModelForm):
             self.fields['impressions'].initial = self.instance.npc_instance.impressions
             self.fields['additional_details'].initial = self.instance.npc_instance.additional_details
 
-            id_list = []
-            # This will display only items that the character is not carrying
-            if len(self.instance.items.all()) > 0:
-                for item in self.instance.items.all():
-                    if item.item.id not in id_list:
-                        id_list.append(item.item.id)
-
-            # Inventory:
-            items_queryset = InventoryItem.objects.filter(
-                Q(
-                    Q(default_item=True) |
-                    Q(created_by=self.instance.character) |
-                    Q(can_view=self.instance.character) 
-                )).exclude(
-                    id__in=id_list
+            # Inventory (only the items that the follower is not carrying):
+            items_queryset = InventoryItem.objects.visible_to(self.instance.character).exclude(
+                id__in=self.instance.items.values('item')
             )
             self.fields['items'].queryset = items_queryset
             self.fields['items'].label = ''
 
-            id_list = []
-            if len(self.instance.small_items.all()) > 0:
-                for small_item in self.instance.small_items.all():
-                    if small_item.small_item.id not in id_list:
-                        id_list.append(small_item.small_item.id)
-
-            small_items_queryset = SmallItem.objects.filter(
-                Q(
-                    Q(default_item=True) |
-                    Q(created_by=self.instance.character) |
-                    Q(can_view=self.instance.character) 
-                )).exclude(
-                    id__in=id_list
-                )
+            small_items_queryset = SmallItem.objects.visible_to(self.instance.character).exclude(
+                id__in=self.instance.small_items.values('small_item')
+            )
             self.fields['small_items'].queryset = small_items_queryset
             self.fields['small_items'].label = ''
 
+    def versioned_instances(self):
+        # The HP, armor, tags... are saved on the NPC instance
+        return [self.instance, self.instance.npc_instance]
+
     def save(self, commit=False):
         data = self.cleaned_data
 
         # TODO: Get the follower id to add it to the items
 
-        # Create the item and small item lists
-        items = list(data['items'])
-        small_items = list(data['small_items'])
-        # Get the items that the players currently have
-        current_items = list(self.instance.items.all())
-        current_small_items = list(self.instance.small_items.all())
-
         # Create new item instances:
-        new_items = []
-        # Create Instances for each item:
-        for item in items:
-            new_item = ItemInstance.objects.create(
+        # (the follower field is what adds them to the inventory)
+        for item in data['items']:
+            ItemInstance.objects.create(
                 item=item,
                 outfitted=True,
                 follower=self.instance,
             )
-            new_items.append(new_item)
-        data['items'] = new_items + current_items
 
         # Create new small item instances:
-        new_items = []
-        # Create Instances for each item:
-        for small_item in small_items:
-            new_item = SmallItemInstance.objects.create(
+        for small_item in data['small_items']:
+            SmallItemInstance.objects.create(
                 small_item=small_item,
                 outfitted=True,
                 follower=self.instance,
             )
-            new_items.append(new_item)
-        data['small_items'] = new_items + current_small_items
 
         instance = super(UpdateFollowerForm, self).save(commit=True)
         npc = instance.npc_instance
@@ -2273,20 +2027,8 @@ class CreateAnimalCompanionForm(forms.ModelForm):
         animal_type = data['animal_type']
         attributes = []
 
-        if animal_type.animal_type == 'Bird':
-            attribute = AnimalCompanionAttributes.objects.filter(tag__name="tiny")[0]
-        
-        elif animal_type.animal_type == 'Critter':
-            attribute = AnimalCompanionAttributes.objects.filter(tag__name="tiny")[0]
-        
-        elif animal_type.animal_type == 'Brute':
-            attribute = AnimalCompanionAttributes.objects.filter(tag__name="tough")[0]
-        
-        elif animal_type.animal_type == 'Predator':
-            attribute = AnimalCompanionAttributes.objects.filter(tag__name="fierce")[0]
-        
-        elif animal_type.animal_type == 'Steed':
-            attribute = AnimalCompanionAttributes.objects.filter(tag__name="large")[0]
+        tag_id = get_id(Tags, ANIMAL_COMPANION_STARTING_TAGS[animal_type.animal_type])
+        attribute = AnimalCompanionAttributes.objects.filter(tag_id=tag_id)[0]
 
         attributes.append(attribute)
         data['attributes'] = attributes
@@ -2341,43 +2083,40 @@ class UpdateAnimalCompanionForm(forms.ModelForm):
 
 # Update Arcana Instances forms:
 
-class ArcanaMovesMMCF(forms.ModelMultipleChoiceField):
+def arcana_move_label(move, required=None):
     """
-    Creates a custom label for major arcana
+    Creates a custom label for major arcana moves
     """
-    def label_from_instance(self, move):
-        # Starts the border after the name of the arcana
-        field_label = f"""
-        <span><div class="d-flex w-100 justify-content-between">
-        <h6>{ move.name }</h6>
-        """
-        if move.total_charges:
-            field_label += f"<p>Max { move.charge_name }: { move.total_charges }</p>"
-        field_label += f"</div></span>"
+    # Starts the border after the name of the arcana
+    field_label = f"""
+    <span><div class="d-flex w-100 justify-content-between">
+    <h6>{ move.name }</h6>
+    """
+    if move.total_charges:
+        field_label += f"<p>Max { move.charge_name }: { move.total_charges }</p>"
+    field_label += f"</div></span>"
 
-        if move.move_requirements:
-            field_label += f"({move.move_requirements})"
+    if required:
+        field_label += f"(Requires: {required.name})"
 
-        field_label += f"<p>{move.description}</p>"
+    field_label += f"<p>{move.description}</p>"
 
-        field_label += "<hr />"
+    field_label += "<hr />"
 
-        return mark_safe(field_label)
+    return mark_safe(field_label)
 
 
-class ArcanaConsequencesMMCF(forms.ModelMultipleChoiceField):
+def arcana_consequence_label(consequence, required=None):
     """
-    Creates a custom label for major arcana
+    Creates a custom label for major arcana consequences
     """
-    def label_from_instance(self, consequence):
-        # Starts the border after the name of the arcana
-        field_label = f"""
-        <p>{ consequence.description }</p>
-        """
-        if consequence.consequence_requirements:
-            field_label += f"({consequence.consequence_requirements})"
+    field_label = f"""
+    <p>{ consequence.description }</p>
+    """
+    if required:
+        field_label += f"(Requires: {required.description})"
 
-        return mark_safe(field_label)
+    return mark_safe(field_label)
 
 # TODO: Finish the arcana page
 
@@ -2385,6 +2124,10 @@ class CharacterUpdateMajorArcanaForm(forms.ModelForm):
     """
     Allows players to create a major arcana instance.
     """
+    major_arcana = forms.ModelMultipleChoiceField(
+        queryset=None,
+        required=False,
+    )
 
     class Meta:
         model = Character
@@ -2399,77 +2142,142 @@ class CharacterUpdateMajorArcanaForm(forms.ModelForm):
         major_arcana = list(data['major_arcana'])
 
 
-class UpdateMajorArcanaInstancesForm(forms.ModelForm):
+class ArcanaProgressFormMixin(object):
+    """
+    For the update forms of arcana instances: the tasks and moves (and
+    consequences) come from the compiled arcana rules (see campaign.arcana),
+    so showing the form doesn't query them, and saving checks that every
+    move and consequence can be taken.
+    """
+    progress_fields = ['tasks', 'moves']
+
+    def __init__(self, *args, **kwargs):
+        super(ArcanaProgressFormMixin, self).__init__(*args, **kwargs)
+        self.rules = self.get_rules(get_arcana_graph())
+        self.fields['tasks'].choices = self.rules.tasks
+        self.fields['charges'].label = f'{self.instance.arcana.charge_name}'
+        self.taken = self.taken_ids()
+        for name in self.progress_fields:
+            self.initial[name] = self.taken[name]
+        self.progress = self.rules.progress(self.instance.marks, self.taken['tasks'], self.taken['moves'])
+
+    def taken_ids(self):
+        return {
+            name: list(getattr(self.instance, name).values_list('id', flat=True))
+            for name in self.progress_fields
+        }
+
+    def clean(self):
+        cleaned_data = super(ArcanaProgressFormMixin, self).clean()
+        for error in self.rules.errors(
+            cleaned_data.get('marks'), cleaned_data.get('tasks', []),
+            cleaned_data.get('moves', []), cleaned_data.get('consequences', []),
+            self.taken['moves'],
+        ):
+            self.add_error(None, error)
+        return cleaned_data
+
+
+class UpdateMajorArcanaInstancesForm(ArcanaProgressFormMixin, VersionedFormMixin, forms.ModelForm):
     """
     Allows players to update their Major arcana instances. 
+    Moves get an ArcanaMoveInstance when they are unlocked.
     """
-    tasks = forms.ModelMultipleChoiceField(
-        queryset=None, 
+    tasks = forms.TypedMultipleChoiceField(
+        coerce=int,
         widget=forms.CheckboxSelectMultiple,
         required=False,
     )
-    moves = ArcanaMovesMMCF(
-        queryset=None, 
+    moves = forms.TypedMultipleChoiceField(
+        coerce=int,
         widget=forms.CheckboxSelectMultiple,
         required=False,
     )
-    consequences = ArcanaConsequencesMMCF(
-        queryset=None, 
+    consequences = forms.TypedMultipleChoiceField(
+        coerce=int,
         widget=forms.CheckboxSelectMultiple,
         required=False,
     )
+    progress_fields = ['tasks', 'moves', 'consequences']
 
     class Meta:
         model = MajorArcanaInstance
-        fields = ['outfitted', 'marks', 'charges', 'tasks', 'moves', 'consequences']
+        fields = ['outfitted', 'marks', 'charges']
 
 
     def __init__(self, *args, **kwargs):
         super(UpdateMajorArcanaInstancesForm, self).__init__(*args, **kwargs)
-        instance = kwargs.pop('instance', None)
-        self.fields['tasks'].queryset = MajorArcanaTasks.objects.filter(arcana=instance.arcana)
-        self.fields['charges'].label = f'{instance.arcana.charge_name}'
-        self.fields['moves'].queryset = ArcanaMoves.objects.filter(arcana=instance.arcana)
-        self.fields['consequences'].queryset = ArcanaConsequences.objects.filter(arcana=instance.arcana)
+        moves = self.rules.moves
+        self.fields['moves'].choices = [
+            (pk, arcana_move_label(move, moves.get(move.requires))) for pk, move in moves.items()
+        ]
+        consequences = self.rules.consequences
+        self.fields['consequences'].choices = [
+            (pk, arcana_consequence_label(consequence, consequences.get(consequence.requires)))
+            for pk, consequence in consequences.items()
+        ]
 
-    def save(self, *args, **kwargs):
-        data = self.cleaned_data
+    def get_rules(self, graph):
+        return graph.major[self.instance.arcana_id]
 
-        # Create new move instances:
-        moves = list(data['moves'])
-        data['items'] = []
-        new_moves = []
-        # Create Instances for each move:
-        for move in moves:
-            new_move = ArcanaMoveInstance.objects.create(
-                arcana_move=move,
-            )
-            new_moves.append(new_move)
-        data['moves'] = new_moves
+    def taken_ids(self):
+        return {
+            'tasks': list(self.instance.tasks.values_list('id', flat=True)),
+            # The moves are ArcanaMoveInstances, the choices their ArcanaMoves
+            'moves': taken_move_ids(self.instance),
+            'consequences': list(self.instance.consequences.values_list('id', flat=True)),
+        }
 
-        return super(UpdateMajorArcanaInstancesForm, self).save(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        data = self.cleaned_data
+        instance = super(UpdateMajorArcanaInstancesForm, self).save(*args, **kwargs)
+        instance.tasks.set(data['tasks'])
+        instance.consequences.set(data['consequences'])
+
+        # Read again, the moves may have been merged from someone else's save
+        taken = set(taken_move_ids(instance))
+        chosen = set(data['moves'])
+        if taken - chosen:
+            ArcanaMoveInstance.objects.filter(
+                majorarcanainstance=instance, arcana_move_id__in=taken - chosen,
+            ).delete()
+        unlock_moves([(instance, [pk for pk in self.rules.moves if pk in chosen - taken])])
+        return instance
 
 
-class UpdateMinorArcanaInstancesForm(forms.ModelForm):
+class UpdateMinorArcanaInstancesForm(ArcanaProgressFormMixin, VersionedFormMixin, forms.ModelForm):
     """
     Allows players to update their Minor arcana instances. 
     """
-    tasks = forms.ModelMultipleChoiceField(
-        queryset=None, 
+    tasks = forms.TypedMultipleChoiceField(
+        coerce=int,
+        widget=forms.CheckboxSelectMultiple,
+        required=False,
+    )
+    moves = forms.TypedMultipleChoiceField(
+        coerce=int,
         widget=forms.CheckboxSelectMultiple,
         required=False,
     )
 
     class Meta:
         model = MinorArcanaInstance
-        fields = ['outfitted', 'marks', 'charges', 'tasks', ]
+        fields = ['outfitted', 'marks', 'charges']
 
 
     def __init__(self, *args, **kwargs):
         super(UpdateMinorArcanaInstancesForm, self).__init__(*args, **kwargs)
-        instance = kwargs.pop('instance', None)
-        self.fields['tasks'].queryset = MinorArcanaTasks.objects.filter(arcana=instance.arcana)
-        self.fields['charges'].label = f'{instance.arcana.charge_name}'
+        self.fields['moves'].choices = [(pk, move.description) for pk, move in self.rules.moves.items()]
+
+    def get_rules(self, graph):
+        return graph.minor[self.instance.arcana_id]
+
+    def save(self, *args, **kwargs):
+        data = self.cleaned_data
+        instance = super(UpdateMinorArcanaInstancesForm, self).save(*args, **kwargs)
+        instance.tasks.set(data['tasks'])
+        instance.moves.set(data['moves'])
+        return instance
         
 
 class UpdateArcanaMovesForm(forms.ModelForm):
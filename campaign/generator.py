@@ -0,0 +1,424 @@
+"""
+Random, valid starting characters for every playbook (quick start, tests, demos).
+
+Everything a new character can choose is compiled once per catalog version
+from the snapshot (backgrounds, instincts, appearance, possessions, moves),
+the move graph (which moves can be taken at level 1 and what they require)
+and the creation rules. Planning a character then needs no queries:
+
+- the stat array of the playbook, shuffled,
+- a background, and one move or possession for each rule the playbook and
+  background have (a required move, one of a pair...),
+- the moves those need, and extra_moves more it can take (and
+  extra_possessions more possessions),
+- an instinct, a place of origin, one appearance attribute per slot,
+- the playbook's extras (Heavy histories, Judge chronicle, Lightbearer
+  worship and predecessors, Would-Be Hero fear and anger...).
+
+Every plan is checked with campaign.creation_rules (the same rules as the
+create forms) before it is used. create_characters() writes a list of
+plans with one insert per table:
+
+    plans = [plan_character('The Heavy', rng) for _ in range(1000)]
+    characters = create_characters(plans, campaign, player)
+"""
+import random
+from collections import namedtuple
+
+from django.db import transaction
+
+from campaign import registry
+from campaign.catalog import get_catalog
+from campaign.creation_rules import STAT_FIELDS, get_creation_rules
+from campaign.eligibility import get_move_graph
+from campaign.constants import (
+    NPC_NAMES,
+    POUCH_ORIGINS, POUCH_MATERIAL, POUCH_AESTHETICS, DANU_SHRINE,
+    SHRINE_OF_ARATIS,
+    WORSHIP_OF_HELIOR, HELIORS_SHRINE, LIGHTBEARER_POWER_ORIGINS,
+    WAR_STORIES, SOMETHING_WICKED,
+)
+from campaign.models import (
+    Character, character_classes_dict, Background, PlaceOfOrigin,
+    BackgroundInstance, MoveInstance, SpecialPossessionInstance,
+    MajorArcanum, MajorArcanaInstance,
+    RemarkableTraits, DanuOfferings, HistoryOfViolence,
+    SymbolOfAuthority, TheChronical, DemandsOfAratis,
+    HeliorWorship, LightbearerPredecessor, FearAndAnger,
+)
+
+
+MAX_ATTEMPTS = 20
+BATCH_SIZE = 500
+
+APPEARANCE_SLOTS = ['appearance1', 'appearance2', 'appearance3', 'appearance4']
+
+# Answer for the playbook questions that need some text
+QUICK_START_ANSWER = 'To be answered in play.'
+
+# Playbook: damage die and HP (the same as its post_save signal sets)
+PLAYBOOK_STARTS = {
+    'The Blessed': ('D6', 18),
+    'The Fox': ('D8', 16),
+    'The Heavy': ('D10', 20),
+    'The Judge': ('D6', 20),
+    'The Lightbearer': ('D4', 18),
+    'The Marshal': ('D8', 20),
+    'The Ranger': ('D8', 18),
+    'The Seeker': ('D6', 16),
+    'The Would-Be Hero': ('D6', 16),
+}
+
+# Playbook: its extra fields (missing keys have none):
+#   choices: field -> choices to pick one from
+#   picks: field -> (model, filter, how many rows to pick, one for a foreign key)
+#   answers: text fields to fill in
+PLAYBOOK_EXTRAS = {
+    'The Blessed': {
+        'choices': {
+            'pouch_origin': POUCH_ORIGINS, 'pouch_material': POUCH_MATERIAL,
+            'pouch_aesthetics': POUCH_AESTHETICS, 'danus_shrine': DANU_SHRINE,
+        },
+        'picks': {
+            'remarkable_traits': (RemarkableTraits, {}, 2),
+            'offerings': (DanuOfferings, {}, 2),
+        },
+    },
+    'The Heavy': {
+        'picks': {
+            'stories_of_glory': (HistoryOfViolence, {'history_theme__iexact': 'stories of glory'}, 2),
+            'terrible_stories': (HistoryOfViolence, {'history_theme__iexact': 'terrible stories'}, 1),
+            'fears': (HistoryOfViolence, {'history_theme__iexact': 'fears'}, 1),
+        },
+    },
+    'The Judge': {
+        'choices': {'shrine_of_aratis': SHRINE_OF_ARATIS},
+        'picks': {
+            'symbol_of_authority': (SymbolOfAuthority, {}, 1),
+            'chronical_positives': (TheChronical, {'attribute_type__iexact': 'positive'}, 2),
+            'chronical_negatives': (TheChronical, {'attribute_type__iexact': 'negative'}, 1),
+            'demands_of_aratis': (DemandsOfAratis, {}, 2),
+        },
+    },
+    'The Lightbearer': {
+        'choices': {
+            'worship_of_helior': WORSHIP_OF_HELIOR, 'heliors_shrine': HELIORS_SHRINE,
+            'origin_of_powers': LIGHTBEARER_POWER_ORIGINS,
+        },
+        'picks': {
+            'methods_of_worship': (HeliorWorship, {}, 2),
+            'predecessor': (LightbearerPredecessor, {}, 2),
+        },
+    },
+    'The Marshal': {
+        'choices': {'war_story': WAR_STORIES},
+        'answers': ['war_detail_1', 'war_detail_2', 'war_detail_3'],
+    },
+    'The Ranger': {
+        'choices': {'something_wicked': SOMETHING_WICKED},
+        'answers': ['wicked_detail_1', 'wicked_detail_2', 'wicked_detail_3'],
+    },
+    'The Would-Be Hero': {
+        'picks': {
+            'fear': (FearAndAnger, {'attribute_type': 'fear'}, 1),
+            'anger': (FearAndAnger, {'attribute_type': 'anger'}, 1),
+        },
+        'answers': ['trouble', 'response', 'result'],
+    },
+}
+
+# The Heavy's STORM-MARKED background starts with this major arcanum (see signals)
+STORM_MARKED = 'storm-marked'
+STORM_MARKINGS = 'storm-markings'
+
+Plan = namedtuple('Plan', ['playbook', 'values', 'move_ids', 'possession_ids', 'picks'])
+
+_generator = None
+
+
+class PlaybookOptions(object):
+    """
+    What a new character of one playbook can choose, as ids.
+    """
+    def __init__(self, class_name, catalog, graph, places):
+        self.class_name = class_name
+        self.backgrounds = [record.id for record in catalog.for_playbook('backgrounds', class_name)]
+        self.instincts = [record.id for record in catalog.for_playbook('instincts', class_name)]
+        self.appearances = {slot: [] for slot in APPEARANCE_SLOTS}
+        for record in catalog.for_playbook('appearance_attributes', class_name):
+            if record.attribute_type in self.appearances:
+                self.appearances[record.attribute_type].append(record.id)
+        self.places = places.get(class_name, [])
+        self.possessions = {record.id: record for record in catalog.for_playbook('special_possessions', class_name)}
+        # Moves that can be taken at level 1 (the create forms offer the same)
+        self.moves = {}
+        for record in catalog.for_playbook('moves', class_name):
+            rule = graph.rules.get(record.id)
+            if rule is None or rule.level is not None:
+                continue
+            if rule.playbook is not None and rule.playbook != class_name:
+                continue
+            self.moves[record.id] = record
+        self.requires = {pk: graph.rules[pk].requires for pk in self.moves}
+        self.picks = {}
+        self.foreign_keys = set()
+
+
+class CharacterGenerator(object):
+    """
+    The compiled options of every playbook.
+    """
+    def __init__(self, version=None):
+        self.version = version
+        catalog = get_catalog()
+        graph = get_move_graph()
+        places = {}
+        for pk, class_name in PlaceOfOrigin.objects.values_list('id', 'character_class__class_name').order_by('id'):
+            places.setdefault(class_name, []).append(pk)
+        self.storm_marked = set(Background.objects.filter(
+            character_class__class_name='The Heavy', slug=STORM_MARKED,
+        ).values_list('id', flat=True))
+        rows = {}
+        self.playbooks = {}
+        for class_name in character_classes_dict:
+            options = PlaybookOptions(class_name, catalog, graph, places)
+            for field, (model, filters, count) in PLAYBOOK_EXTRAS.get(class_name, {}).get('picks', {}).items():
+                key = (model, tuple(sorted(filters.items())))
+                if key not in rows:
+                    rows[key] = list(model.objects.filter(**filters).order_by('id').values_list('id', flat=True))
+                options.picks[field] = rows[key]
+                if not character_classes_dict[class_name]._meta.get_field(field).many_to_many:
+                    options.foreign_keys.add(field)
+            self.playbooks[class_name] = options
+
+    def plan(self, playbook, rng=random, extra_moves=1, extra_possessions=1, character_name=None):
+        """
+        Returns a Plan for a valid new character of the playbook.
+        Raises ValueError when the catalog has no way to make one.
+        """
+        options = self.playbooks[playbook]
+        rules = get_creation_rules()
+        errors = []
+        for _ in range(MAX_ATTEMPTS):
+            plan = self.draft(options, rules, rng, extra_moves, extra_possessions, character_name)
+            errors = rules.validate(
+                playbook, plan.values['background_id'], plan.move_ids, plan.possession_ids,
+                {field: plan.values[field] for field in STAT_FIELDS},
+            )
+            if not errors:
+                return plan
+        raise ValueError(f"No valid {playbook} could be made: {' '.join(errors)}")
+
+    def draft(self, options, rules, rng, extra_moves, extra_possessions, character_name):
+        playbook_rules = rules.playbooks.get(options.class_name, rules.default_playbook)
+        values = {
+            'character_name': character_name or rng.choice(NPC_NAMES),
+            'background_id': rng.choice(options.backgrounds) if options.backgrounds else None,
+            'instinct_id': rng.choice(options.instincts) if options.instincts else None,
+            'place_of_origin_id': rng.choice(options.places) if options.places else None,
+        }
+        for slot, ids in options.appearances.items():
+            values[f'{slot}_id'] = rng.choice(ids) if ids else None
+        stats = list(playbook_rules.stats.elements())
+        rng.shuffle(stats)
+        values.update(zip(STAT_FIELDS, stats))
+
+        # One move or possession for each rule that is not met yet
+        chosen = {'moves': set(), 'possessions': set()}
+        requirements = playbook_rules.requirements + playbook_rules.background_requirements.get(
+            values['background_id'], []
+        )
+        for requirement in requirements:
+            if requirement.met_by(chosen):
+                continue
+            available = options.moves if requirement.of == 'moves' else options.possessions
+            ids = sorted(requirement.ids.intersection(available)) or sorted(requirement.ids)
+            if ids:
+                chosen[requirement.of].add(rng.choice(ids))
+        move_ids = self.with_prerequisites(options, chosen['moves'])
+        for _ in range(extra_moves):
+            takeable = [
+                pk for pk in options.moves
+                if pk not in move_ids and options.requires[pk] in (None, *move_ids)
+            ]
+            if takeable:
+                move_ids.append(rng.choice(takeable))
+        possession_ids = sorted(chosen['possessions'])
+        untaken = [pk for pk in options.possessions if pk not in chosen['possessions']]
+        possession_ids += rng.sample(untaken, min(extra_possessions, len(untaken)))
+
+        extras = PLAYBOOK_EXTRAS.get(options.class_name, {})
+        for field, choices in extras.get('choices', {}).items():
+            values[field] = rng.choice(choices)[0]
+        for field in extras.get('answers', []):
+            values[field] = QUICK_START_ANSWER
+        picks = {}
+        for field, (model, filters, count) in extras.get('picks', {}).items():
+            ids = options.picks[field]
+            if field in options.foreign_keys:
+                values[f'{field}_id'] = rng.choice(ids) if ids else None
+            else:
+                picks[field] = rng.sample(ids, min(count, len(ids)))
+        return Plan(options.class_name, values, move_ids, possession_ids, picks)
+
+    def with_prerequisites(self, options, move_ids):
+        """
+        The moves in prerequisite order, with the moves they require added.
+        """
+        ordered = []
+
+        def add(pk):
+            if pk in ordered:
+                return
+            requires = options.requires.get(pk)
+            if requires is not None and requires != pk:
+                add(requires)
+            ordered.append(pk)
+
+        for pk in sorted(move_ids):
+            add(pk)
+        return ordered
+
+
+def get_generator():
+    """
+    Returns the compiled generator, compiling it again whenever the
+    catalog snapshot has been rebuilt.
+    """
+    global _generator
+    catalog = get_catalog()
+    version = (catalog.path, catalog.modified)
+    if _generator is None or _generator.version != version:
+        _generator = CharacterGenerator(version)
+    return _generator
+
+
+def plan_character(playbook, rng=random, extra_moves=1, extra_possessions=1, character_name=None):
+    return get_generator().plan(playbook, rng, extra_moves, extra_possessions, character_name)
+
+
+def as_form_data(plan):
+    """
+    The plan as the POST data of the playbook's create form.
+    """
+    data = {}
+    for field, value in plan.values.items():
+        data[field[:-3] if field.endswith('_id') else field] = value
+    data['move_instances'] = plan.move_ids
+    data['special_possessions'] = plan.possession_ids
+    data.update(plan.picks)
+    return {field: value for field, value in data.items() if value is not None}
+
+
+def batches(objs):
+    for start in range(0, len(objs), BATCH_SIZE):
+        yield objs[start:start + BATCH_SIZE]
+
+
+def through_rows(field, pairs):
+    """
+    The rows of an M2M field's table for (source id, target id) pairs.
+    """
+    through = field.through
+    source = f'{field.field.m2m_field_name()}_id'
+    target = f'{field.field.m2m_reverse_field_name()}_id'
+    return [through(**{source: source_id, target: target_id}) for source_id, target_id in pairs]
+
+
+def create_characters(plans, campaign, player):
+    """
+    Creates the characters of the plans in one transaction and returns them.
+
+    Django's bulk_create refuses multi-table inherited models, so the
+    Character rows are bulk created first and the playbook rows are then
+    inserted with the same QuerySet._insert that save() and bulk_create
+    use. The post_save signals of the playbooks don't run, so their
+    damage, HP, background instances (and the Heavy's storm markings) are
+    made here too.
+    """
+    catalog = get_catalog()
+    generator = get_generator()
+    characters = []
+    for plan in plans:
+        model = character_classes_dict[plan.playbook]
+        damage_die, hp = PLAYBOOK_STARTS[plan.playbook]
+        characters.append(model(
+            player=player, campaign=campaign, character_class=plan.playbook,
+            damage_die=damage_die, max_hp=hp, current_hp=hp, **plan.values,
+        ))
+
+    with transaction.atomic():
+        parent_fields = [field.attname for field in Character._meta.concrete_fields if not field.primary_key]
+        parents = Character.objects.bulk_create([
+            Character(**{name: getattr(character, name) for name in parent_fields}) for character in characters
+        ], batch_size=BATCH_SIZE)
+        for character, parent in zip(characters, parents):
+            character.pk = character.id = parent.pk
+            character._state.adding = False
+
+        by_playbook = {}
+        for character in characters:
+            by_playbook.setdefault(type(character), []).append(character)
+        for model, playbook_characters in by_playbook.items():
+            fields = model._meta.local_concrete_fields
+            for batch in batches(playbook_characters):
+                model._base_manager._insert(batch, fields=fields)
+
+        background_instances = BackgroundInstance.objects.bulk_create([
+            BackgroundInstance(background_id=character.background_id, character=character)
+            for character in characters if character.background_id is not None
+        ], batch_size=BATCH_SIZE)
+        for background_instance in background_instances:
+            background_instance.character.background_instance = background_instance
+        Character.objects.bulk_update([
+            Character(pk=instance.character.pk, background_instance_id=instance.pk)
+            for instance in background_instances
+        ], ['background_instance'], batch_size=BATCH_SIZE)
+
+        move_instances = []
+        possession_instances = []
+        for character, plan in zip(characters, plans):
+            options = generator.playbooks[plan.playbook]
+            for pk in plan.move_ids:
+                move = options.moves.get(pk) or catalog.get('moves', pk)
+                move_instances.append((character.pk, MoveInstance(
+                    move_id=pk, uses=move.total_uses or None, charges=0 if move.total_charges else None,
+                )))
+            for pk in plan.possession_ids:
+                possession = options.possessions.get(pk) or catalog.get('special_possessions', pk)
+                possession_instances.append((character.pk, SpecialPossessionInstance(
+                    special_possession_id=pk, character_id=character.pk, uses=possession.total_uses or None,
+                )))
+        MoveInstance.objects.bulk_create([instance for _, instance in move_instances], batch_size=BATCH_SIZE)
+        SpecialPossessionInstance.objects.bulk_create(
+            [instance for _, instance in possession_instances], batch_size=BATCH_SIZE,
+        )
+        Character.move_instances.through.objects.bulk_create(through_rows(
+            Character.move_instances, [(pk, instance.pk) for pk, instance in move_instances],
+        ), batch_size=BATCH_SIZE)
+        Character.special_possessions.through.objects.bulk_create(through_rows(
+            Character.special_possessions, [(pk, instance.pk) for pk, instance in possession_instances],
+        ), batch_size=BATCH_SIZE)
+
+        picks = {}
+        for character, plan in zip(characters, plans):
+            model = type(character)
+            for field, ids in plan.picks.items():
+                picks.setdefault((model, field), []).extend((character.pk, pk) for pk in ids)
+        for (model, field), pairs in picks.items():
+            m2m = getattr(model, field)
+            m2m.through.objects.bulk_create(through_rows(m2m, pairs), batch_size=BATCH_SIZE)
+
+        storm_marked = [character for character in characters if character.background_id in generator.storm_marked]
+        if storm_marked:
+            arcana_id = registry.get_id(MajorArcanum, STORM_MARKINGS)
+            MajorArcanaInstance.objects.bulk_create([
+                MajorArcanaInstance(arcana_id=arcana_id, character_id=character.pk, marks=1)
+                for character in storm_marked
+            ], batch_size=BATCH_SIZE)
+    return characters
+
+
+def clear():
+    global _generator
+    _generator = None
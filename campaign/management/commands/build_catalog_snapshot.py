@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from campaign.catalog import build_snapshot, snapshot_path
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the memory-mapped catalog snapshot.
+    Running workers pick up the new file on their next lookup.
+    """
+    help = 'Builds the read-only catalog snapshot file shared by the workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=None,
+            help='Where to write the snapshot file (defaults to the one for this database).',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output'] or snapshot_path()
+        count = build_snapshot(output)
+        self.stdout.write(f"Wrote {count} catalog records to {output}.")
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from campaign.events import compact
+
+
+class Command(BaseCommand):
+    """
+    Compacts the event log (see campaign/events.py). Meant to run
+    periodically, each run leaves a snapshot per character it compacted.
+    """
+    help = 'Replays the events older than the retention into character snapshots and deletes them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.EVENT_LOG_RETENTION_DAYS,
+            help='Keep the events of the last this many days.',
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must be 0 or more.')
+        deleted, snapshots = compact(timezone.now() - timedelta(days=options['days']))
+        self.stdout.write(f"Compacted {deleted} events into {snapshots} character snapshots.")
@@ -0,0 +1,56 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from campaign.generator import create_characters, get_generator
+from campaign.models import Campaign, character_classes_dict
+
+
+class Command(BaseCommand):
+    """
+    Fills a campaign with random, valid characters (see campaign/generator.py),
+    for demos and for load testing the character pages.
+    """
+    help = 'Creates random starting characters in a campaign for a player.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign', type=int, help='The campaign id.')
+        parser.add_argument('username', help='The player the characters belong to.')
+        parser.add_argument(
+            '--playbook', choices=list(character_classes_dict),
+            help='Only make characters of this playbook (a random playbook each otherwise).',
+        )
+        parser.add_argument('--count', type=int, default=1, help='Number of characters.')
+        parser.add_argument('--extra-moves', type=int, default=1, help='Moves to take past the required ones.')
+        parser.add_argument('--seed', type=int, help='Seed to repeat a batch.')
+
+    def handle(self, *args, **options):
+        campaign = Campaign.objects.filter(pk=options['campaign']).first()
+        if campaign is None:
+            raise CommandError(f"Campaign {options['campaign']} does not exist.")
+        player = get_user_model().objects.filter(username=options['username']).first()
+        if player is None:
+            raise CommandError(f"User {options['username']} does not exist.")
+        if options['count'] < 1:
+            raise CommandError('--count must be at least 1.')
+
+        rng = random.Random(options['seed'])
+        generator = get_generator()
+        playbooks = [options['playbook']] if options['playbook'] else list(character_classes_dict)
+        start = time.perf_counter()
+        try:
+            plans = [
+                generator.plan(rng.choice(playbooks), rng, options['extra_moves'])
+                for _ in range(options['count'])
+            ]
+        except ValueError as error:
+            raise CommandError(str(error))
+        characters = create_characters(plans, campaign, player)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"Created {len(characters)} characters in {elapsed:.2f}s "
+            f"({len(characters) / max(elapsed, 1e-6):.0f} per second)"
+        )
@@ -0,0 +1,56 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from campaign.encounters import load_encounter, simulate
+from campaign.models import Campaign
+
+
+class Command(BaseCommand):
+    """
+    Simulates a fight between a campaign's party and some of its NPCs
+    (see campaign/encounters.py). Large batches are split across a pool of
+    processes, so this is the place for runs the web endpoint's time budget
+    would cut short.
+    """
+    help = 'Plays out a fight between the party and the given NPC instances many times and prints the odds.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign', type=int, help='The campaign id.')
+        parser.add_argument('npcs', type=int, nargs='+', help='The NPC instance ids of the enemies.')
+        parser.add_argument(
+            '--characters', type=int, nargs='+',
+            help='Only these characters (and their followers and companions) fight.',
+        )
+        parser.add_argument('--runs', type=int, default=50000, help='Number of fights.')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Number of processes for large batches.',
+        )
+        parser.add_argument('--seed', type=int, help='Seed to repeat a simulation.')
+        parser.add_argument('--time-budget', type=float, help='Stop after this many seconds.')
+
+    def handle(self, *args, **options):
+        if not Campaign.objects.filter(pk=options['campaign']).exists():
+            raise CommandError(f"Campaign {options['campaign']} does not exist.")
+        if options['runs'] < 1:
+            raise CommandError('--runs must be at least 1.')
+        encounter = load_encounter(options['campaign'], options['npcs'], options['characters'])
+        if not encounter.enemies:
+            raise CommandError('None of the NPC instances are in the campaign.')
+
+        result = simulate(
+            encounter, options['runs'], seed=options['seed'],
+            workers=options['workers'], time_budget=options['time_budget'],
+        ).as_json()
+
+        self.stdout.write(f"{result['runs']} fights{' (stopped at the time budget)' if result['truncated'] else ''}")
+        self.stdout.write(
+            f"Win: {result['win_rate']:.1%}  Wipe: {result['wipe_rate']:.1%}  Draw: {result['draw_rate']:.1%}"
+        )
+        rounds = result['rounds']
+        self.stdout.write(
+            f"Rounds: mean {rounds['mean']:.1f}, median {rounds['median']}, min {rounds['min']}, max {rounds['max']}"
+        )
+        for member in result['hp_loss']:
+            self.stdout.write(f"{member['name']} ({member['kind']}): loses {member['expected']:.1f} of {member['hp']} HP")
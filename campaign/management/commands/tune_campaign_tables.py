@@ -0,0 +1,94 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from campaign.models import (
+    Character, NPCInstance, FollowerInstance,
+    ItemInstance, SmallItemInstance, MoveInstance,
+    MajorArcanaInstance, MinorArcanaInstance,
+)
+
+
+# Tables that grow with the number of campaigns
+CAMPAIGN_MODELS = [
+    Character, NPCInstance, FollowerInstance,
+    ItemInstance, SmallItemInstance, MoveInstance,
+    MajorArcanaInstance, MinorArcanaInstance,
+]
+
+STORAGE_PARAMETERS = ['autovacuum_vacuum_scale_factor', 'autovacuum_analyze_scale_factor', 'fillfactor']
+
+
+def campaign_tables():
+    """
+    The per-campaign instance tables (playbooks included) and their M2M tables.
+    """
+    tables = []
+    for model in apps.get_app_config('campaign').get_models():
+        if not issubclass(model, tuple(CAMPAIGN_MODELS)):
+            continue
+        tables.append(model._meta.db_table)
+        for field in model._meta.local_many_to_many:
+            tables.append(field.remote_field.through._meta.db_table)
+    return tables
+
+
+class Command(BaseCommand):
+    """
+    Tunes the storage of the tables that hold every campaign's rows.
+
+    By default autovacuum only runs once 20% of a table has changed, so on a
+    large install one busy campaign can bloat the tables for a long time and
+    each vacuum has to go through everyone's rows. A small scale factor keeps
+    vacuum and analyze proportional to the churn instead of the table size,
+    and a lower fillfactor leaves room for in-place (HOT) updates of hp, uses...
+    """
+    help = 'Sets the autovacuum and fillfactor storage parameters of the per-campaign tables (PostgreSQL only).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--vacuum-scale-factor', type=float, default=0.02,
+            help='Fraction of a table that has to change before it is vacuumed.',
+        )
+        parser.add_argument(
+            '--analyze-scale-factor', type=float, default=0.01,
+            help='Fraction of a table that has to change before it is analyzed.',
+        )
+        parser.add_argument(
+            '--fillfactor', type=int, default=90,
+            help='Percentage of each table page to fill on insert.',
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Go back to the server defaults.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only print the SQL.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Table storage parameters are only supported on PostgreSQL.')
+
+        if options['reset']:
+            parameters = ', '.join(STORAGE_PARAMETERS)
+            action = f'RESET ({parameters})'
+        else:
+            action = (
+                f"SET (autovacuum_vacuum_scale_factor = {options['vacuum_scale_factor']}, "
+                f"autovacuum_analyze_scale_factor = {options['analyze_scale_factor']}, "
+                f"fillfactor = {options['fillfactor']})"
+            )
+
+        tables = campaign_tables()
+        with connection.cursor() as cursor:
+            for table in tables:
+                sql = f'ALTER TABLE {connection.ops.quote_name(table)} {action};'
+                if options['dry_run']:
+                    self.stdout.write(sql)
+                else:
+                    cursor.execute(sql)
+
+        if not options['dry_run']:
+            self.stdout.write(f'Updated {len(tables)} tables.')
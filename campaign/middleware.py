@@ -0,0 +1,15 @@
+from campaign import events
+
+
+class EventLogMiddleware(object):
+    """
+    Writes the events a request records to the event log with one
+    INSERT once the view is done (see campaign/events.py). A failed
+    INSERT is logged, the response is sent all the same.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with events.buffered():
+            return self.get_response(request)
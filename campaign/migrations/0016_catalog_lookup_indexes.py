@@ -0,0 +1,44 @@
+# Generated by Django 4.0.6 on 2026-10-19 13:12
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaign', '0015_alter_characterclass_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appearanceattribute',
+            index=models.Index(fields=['attribute_type', 'id'], name='appearance_type_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fearandanger',
+            index=models.Index(fields=['attribute_type'], name='fearandanger_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historyofviolence',
+            index=models.Index(django.db.models.functions.text.Upper('history_theme'), name='history_upper_theme_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='majorarcanum',
+            index=models.Index(fields=['name'], name='majorarcanum_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moves',
+            index=models.Index(fields=['name'], name='moves_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='thechronical',
+            index=models.Index(django.db.models.functions.text.Upper('attribute_type'), name='chronical_upper_type_idx'),
+        ),
+        # Django 4.0 can't build an index on an expression with an operator
+        # class (OpClass), so the prefix index for name__istartswith is raw SQL.
+        migrations.RunSQL(
+            sql='CREATE INDEX "tags_upper_name_prefix_idx" ON "campaign_tags" ((UPPER("name"::text)) text_pattern_ops);',
+            reverse_sql='DROP INDEX IF EXISTS "tags_upper_name_prefix_idx";',
+        ),
+    ]
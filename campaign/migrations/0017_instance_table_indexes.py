@@ -0,0 +1,46 @@
+# Generated by Django 4.0.6 on 2026-10-19 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaign', '0016_catalog_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='animalcompanion',
+            index=models.Index(fields=['character', '-id'], name='animal_char_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(condition=models.Q(('default_item', True)), fields=['name'], name='item_default_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='iteminstance',
+            index=models.Index(fields=['character', 'outfitted'], name='iteminst_char_outfit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='iteminstance',
+            index=models.Index(condition=models.Q(('follower__isnull', False)), fields=['follower', 'outfitted'], name='iteminst_follower_outfit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='smallitem',
+            index=models.Index(condition=models.Q(('default_item', True)), fields=['name'], name='smallitem_default_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='smalliteminstance',
+            index=models.Index(fields=['character', 'outfitted'], name='smallinst_char_outfit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='smalliteminstance',
+            index=models.Index(condition=models.Q(('follower__isnull', False)), fields=['follower', 'outfitted'], name='smallinst_follower_outfit_idx'),
+        ),
+        # The NPC autocomplete filters by campaign and character_name__istartswith
+        migrations.RunSQL(
+            sql='CREATE INDEX "npcinstance_campaign_name_idx" ON "campaign_npcinstance" ("campaign_id", (UPPER("character_name"::text)) text_pattern_ops);',
+            reverse_sql='DROP INDEX IF EXISTS "npcinstance_campaign_name_idx";',
+        ),
+    ]
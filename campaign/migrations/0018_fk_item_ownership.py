@@ -0,0 +1,117 @@
+# Generated by Django 4.0.6 on 2026-10-19 13:21
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+# (owner model, M2M field, instance model, instance FK, through FK)
+OWNERSHIP = [
+    ('Character', 'items', 'ItemInstance', 'character', 'character'),
+    ('Character', 'small_items', 'SmallItemInstance', 'character', 'character'),
+    ('Character', 'major_arcana', 'MajorArcanaInstance', 'character', 'character'),
+    ('Character', 'minor_arcana', 'MinorArcanaInstance', 'character', 'character'),
+    ('FollowerInstance', 'items', 'ItemInstance', 'follower', 'followerinstance'),
+    ('FollowerInstance', 'small_items', 'SmallItemInstance', 'follower', 'followerinstance'),
+]
+
+
+def copy_m2m_to_fk(apps, schema_editor):
+    """
+    Instances that were only linked through the M2M get their owner FK set.
+    Where both are set the FK is kept.
+    """
+    for owner, field, instance, fk, through_fk in OWNERSHIP:
+        through = getattr(apps.get_model('campaign', owner), field).through
+        instance_model = apps.get_model('campaign', instance)
+        owners = through.objects.filter(
+            **{f'{instance.lower()}_id': OuterRef('pk')}
+        ).values(f'{through_fk}_id')[:1]
+        instance_model.objects.filter(**{f'{fk}__isnull': True}).update(**{f'{fk}_id': Subquery(owners)})
+
+
+def copy_fk_to_m2m(apps, schema_editor):
+    for owner, field, instance, fk, through_fk in OWNERSHIP:
+        through = getattr(apps.get_model('campaign', owner), field).through
+        instance_model = apps.get_model('campaign', instance)
+        through.objects.bulk_create([
+            through(**{f'{through_fk}_id': owner_id, f'{instance.lower()}_id': instance_id})
+            for instance_id, owner_id in instance_model.objects.filter(
+                **{f'{fk}__isnull': False}
+            ).values_list('id', f'{fk}_id')
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaign', '0017_instance_table_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_m2m_to_fk, copy_fk_to_m2m),
+        migrations.RemoveField(
+            model_name='character',
+            name='items',
+        ),
+        migrations.RemoveField(
+            model_name='character',
+            name='major_arcana',
+        ),
+        migrations.RemoveField(
+            model_name='character',
+            name='minor_arcana',
+        ),
+        migrations.RemoveField(
+            model_name='character',
+            name='small_items',
+        ),
+        migrations.RemoveField(
+            model_name='followerinstance',
+            name='items',
+        ),
+        migrations.RemoveField(
+            model_name='followerinstance',
+            name='small_items',
+        ),
+        migrations.AlterField(
+            model_name='iteminstance',
+            name='character',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='campaign.character'),
+        ),
+        migrations.AlterField(
+            model_name='iteminstance',
+            name='follower',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='campaign.followerinstance'),
+        ),
+        migrations.AlterField(
+            model_name='majorarcanainstance',
+            name='character',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='major_arcana', to='campaign.character'),
+        ),
+        migrations.AlterField(
+            model_name='majorarcanainstance',
+            name='follower',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='major_arcana', to='campaign.followerinstance'),
+        ),
+        migrations.AlterField(
+            model_name='minorarcanainstance',
+            name='character',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='minor_arcana', to='campaign.character'),
+        ),
+        migrations.AlterField(
+            model_name='minorarcanainstance',
+            name='follower',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='minor_arcana', to='campaign.followerinstance'),
+        ),
+        migrations.AlterField(
+            model_name='smalliteminstance',
+            name='character',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='small_items', to='campaign.character'),
+        ),
+        migrations.AlterField(
+            model_name='smalliteminstance',
+            name='follower',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='small_items', to='campaign.followerinstance'),
+        ),
+    ]
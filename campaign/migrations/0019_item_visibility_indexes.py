@@ -0,0 +1,23 @@
+# Generated by Django 4.0.6 on 2026-10-19 13:26
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaign', '0018_fk_item_ownership'),
+    ]
+
+    # The can_view through tables only have (item, character) indexes, so the
+    # visible_to() lookup by character gets a covering (character, item) index
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX "item_can_view_char_item_idx" ON "campaign_inventoryitem_can_view" ("character_id", "inventoryitem_id");',
+            reverse_sql='DROP INDEX IF EXISTS "item_can_view_char_item_idx";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX "smallitem_can_view_char_item_idx" ON "campaign_smallitem_can_view" ("character_id", "smallitem_id");',
+            reverse_sql='DROP INDEX IF EXISTS "smallitem_can_view_char_item_idx";',
+        ),
+    ]
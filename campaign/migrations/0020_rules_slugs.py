@@ -0,0 +1,78 @@
+# Generated by Django 4.0.6 on 2026-10-19 13:31
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+# (model, field the slug is made from, fields a slug is unique within)
+SLUG_SOURCES = [
+    ('Background', 'background', ['character_class_id']),
+    ('MajorArcanum', 'name', []),
+    ('Tags', 'name', []),
+]
+
+
+def fill_slugs(apps, schema_editor):
+    """
+    Gives every row its slug like campaign.registry.make_slug: the name
+    slugified, with -2, -3... for the names that slugify alike and the model
+    name for the names without letters or digits.
+    """
+    for model_name, source, scope in SLUG_SOURCES:
+        model = apps.get_model('campaign', model_name)
+        max_length = model._meta.get_field('slug').max_length
+        taken = {}
+        rows = list(model.objects.order_by('pk'))
+        for row in rows:
+            slugs = taken.setdefault(tuple(getattr(row, field) for field in scope), set())
+            base = slugify(getattr(row, source))[:max_length] or slugify(model_name)
+            slug = base
+            number = 2
+            while slug in slugs:
+                suffix = f'-{number}'
+                slug = base[:max_length - len(suffix)] + suffix
+                number += 1
+            slugs.add(slug)
+            row.slug = slug
+        model.objects.bulk_update(rows, ['slug'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaign', '0019_item_visibility_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='background',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='majorarcanum',
+            name='slug',
+            field=models.SlugField(blank=True, db_index=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='tags',
+            name='slug',
+            field=models.SlugField(blank=True, db_index=False, max_length=150),
+        ),
+        migrations.RunPython(fill_slugs, migrations.RunPython.noop),
+        # The unique indexes are added once every row has its own slug
+        migrations.AlterField(
+            model_name='majorarcanum',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=300, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='tags',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=150, unique=True),
+        ),
+        migrations.AddConstraint(
+            model_name='background',
+            constraint=models.UniqueConstraint(fields=('character_class', 'slug'), name='background_class_slug_unique'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.0.6 on 2026-10-19 14:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('campaign', '0021_row_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CharacterSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_event_id', models.BigIntegerField()),
+                ('taken', models.DateTimeField(auto_now_add=True)),
+                ('state', models.JSONField()),
+                ('character', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='campaign.character')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CampaignEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('code', models.PositiveSmallIntegerField(choices=[(1, 'character hp'), (2, 'character xp'), (3, 'character stock'), (4, 'follower hp'), (5, 'npc hp'), (6, 'move uses'), (7, 'move charges'), (8, 'item uses'), (9, 'item ammo'), (10, 'small-item uses'), (11, 'small-item ammo'), (12, 'special-possession uses'), (13, 'major-arcana marks'), (14, 'major-arcana charges'), (15, 'minor-arcana marks'), (16, 'minor-arcana charges')])),
+                ('target_id', models.BigIntegerField()),
+                ('delta', models.IntegerField()),
+                ('value', models.IntegerField(blank=True, null=True)),
+                ('campaign', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='campaign.campaign')),
+                ('character', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='campaign.character')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='charactersnapshot',
+            index=models.Index(fields=['character', '-last_event_id'], name='snapshot_character_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaignevent',
+            index=models.Index(fields=['campaign', 'id'], name='event_campaign_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaignevent',
+            index=models.Index(condition=models.Q(('character__isnull', False)), fields=['character', 'id'], name='event_character_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaignevent',
+            index=models.Index(fields=['created'], name='event_created_idx'),
+        ),
+    ]
@@ -1,16 +1,62 @@
+from django.db import transaction
 from django.urls import reverse_lazy
 
 from campaign.models import (
-    Campaign,
-    Background, Instinct,
+    Campaign, Character,
     FollowerInstance,
     AnimalCompanion,
+    VersionConflict,
     character_classes_dict
 )
+from campaign.odds import stat_odds
+from campaign.utils import ROW_VERSION_FIELD
+
+def update_session(session, **values):
+    """
+    Only writes the values that have changed to the session,
+    so that viewing a page does not save the session every time.
+    """
+    for key, value in values.items():
+        if session.get(key) != value:
+            session[key] = value
+
 
 # Mixin Views:
 
-class CharacterDataMixin(object):
+class CurrentContextMixin(object):
+    """
+    Resolves the current campaign, character, and follower
+    from the URL kwargs (pk, pk_char, pk_follower) and only
+    falls back to sessions for views that do not have them in the URL.
+    """
+    def get_current_campaign_id(self):
+        if 'pk' in self.kwargs:
+            return self.kwargs['pk']
+        return self.request.session['current_campaign_id']
+
+    def get_current_character_id(self):
+        if 'pk_char' in self.kwargs:
+            return self.kwargs['pk_char']
+        return self.request.session['current_character_id']
+
+    def get_current_character_class(self):
+        character_id = self.get_current_character_id()
+        session = self.request.session
+        if session.get('current_character_id') == character_id and 'current_character_class' in session:
+            return session['current_character_class']
+        return Character.objects.values_list('character_class', flat=True).get(id=character_id)
+
+    def get_current_character(self):
+        character_obj = character_classes_dict[self.get_current_character_class()]
+        return character_obj.objects.get(id=self.get_current_character_id())
+
+    def get_current_follower_id(self):
+        if 'pk_follower' in self.kwargs:
+            return self.kwargs['pk_follower']
+        return self.request.session['follower_id']
+
+
+class CharacterDataMixin(CurrentContextMixin):
     """
     Adds get_context_data as relates to characters
     """
@@ -20,18 +66,15 @@ class CharacterDataMixin(object):
         # if character is in the context
         if 'character' in context:
             character = context['character']
-            character_id = character.id
-            character_class = character.character_class
-        # If not try getting the character out of sessions
+        # If not get the character from the URL (or sessions)
         else:
-            character_id = self.request.session['current_character_id']
-            character_class = self.request.session['current_character_class']
-            character_obj = character_classes_dict[character_class]
-            character = character_obj.objects.get(id=character_id)
+            character = self.get_current_character()
             context['character'] = character
+        character_id = character.id
+        character_class = character.character_class
 
-        char_background = Background.objects.get(background=character.background)
-        char_instinct = Instinct.objects.get(name=character.instinct)
+        char_background = character.background
+        char_instinct = character.instinct
 
         # Create variables for the class name with underscores and slugified
         c_class = character_class.lower()
@@ -78,6 +121,8 @@ class CharacterDataMixin(object):
                 total_weight += arcana.arcana.weight
         # Add total weight to the context
         context['total_weight'] = total_weight
+        # The odds of a move with each stat (for the stats widget)
+        context['odds'] = stat_odds(character)
         context['equipped_items'] = equipped_items
         context['unequipped_items'] = unequipped_items
         context['equipped_small_items'] = equipped_small_items
@@ -88,13 +133,17 @@ class CharacterDataMixin(object):
         context['char_background'] = char_background
         context['char_instinct'] = char_instinct
         
-        self.request.session['current_character_id'] = character_id
-        self.request.session['current_character_class'] = character_class
+        # Keep sessions in sync for views without the character in the URL
+        update_session(
+            self.request.session,
+            current_character_id=character_id,
+            current_character_class=character_class,
+        )
         
         return context
 
 
-class FollowerDataMixin(object):
+class FollowerDataMixin(CurrentContextMixin):
     """
     Adds get_context_data for followers.
     """
@@ -104,23 +153,18 @@ class FollowerDataMixin(object):
         # if character is in the context
         if 'character' in context:
             character = context['character']
-            character_id = character.id
-            character_class = character.character_class
-        # If not try getting the character out of sessions
+        # If not get the character from the URL (or sessions)
         else:
-            character_id = self.request.session['current_character_id']
-            character_class = self.request.session['current_character_class']
-            character_obj = character_classes_dict[character_class]
-            character = character_obj.objects.get(id=character_id)
+            character = self.get_current_character()
             context['character'] = character
 
         # Get follower from context
         if 'follower' in context:
             follower = context['follower']
             follower_id = follower.id
-        # Get the follower from sessions
+        # If not get the follower from the URL (or sessions)
         else:
-            follower_id = self.request.session['follower_id']
+            follower_id = self.get_current_follower_id()
             follower = FollowerInstance.objects.get(id=follower_id)
             context['follower'] = follower
 
@@ -151,63 +195,120 @@ class FollowerDataMixin(object):
         context['equipped_small_items'] = equipped_small_items
         context['unequipped_small_items'] = unequipped_small_items
 
-        # Add follower id to sessions:
-        self.request.session['follower_id'] = follower_id
+        # Add follower id to sessions if it has changed:
+        update_session(self.request.session, follower_id=follower_id)
          
         return context
     
 
-class CharacterHomeURLMixin(object):
+class CharacterHomeURLMixin(CurrentContextMixin):
     """
     Defines a get_success url that returns the user
     back to the character home page after creating a new instance
     related to that character.
     """
     def get_success_url(self):
-        character_class = self.request.session['current_character_class']
-        campaign_id = self.request.session['current_campaign_id']
-        character_id = self.request.session['current_character_id']
+        character_class = self.get_current_character_class()
+        campaign_id = self.get_current_campaign_id()
+        character_id = self.get_current_character_id()
         character_string = '-'.join(character_class.lower().split())
         character_string += '-detail'
         return reverse_lazy(character_string, args=(campaign_id, character_id))
 
 
-class CharacterInventoryURLMixin(object):
+class CharacterInventoryURLMixin(CurrentContextMixin):
     """
     Defines a get_success url that returns the user
     back to the inventory page of the character.
     """
     def get_success_url(self):
-        campaign_id = self.request.session['current_campaign_id']
-        character_id = self.request.session['current_character_id']
+        campaign_id = self.get_current_campaign_id()
+        character_id = self.get_current_character_id()
         return reverse_lazy('character-inventory', args=(campaign_id, character_id))
 
 
-class CharacterFollowersURLMixin(object):
+class CharacterFollowersURLMixin(CurrentContextMixin):
     """
     Defines a get_success url that returns the user
     back to the home page of that follower.
     """
     def get_success_url(self):
-        campaign_id = self.request.session['current_campaign_id']
-        character_id = self.request.session['current_character_id']
-        follower_id = self.request.session['follower_id']
+        campaign_id = self.get_current_campaign_id()
+        character_id = self.get_current_character_id()
+        follower_id = self.get_current_follower_id()
         return reverse_lazy('follower-detail', args=(campaign_id, character_id, follower_id))
 
 
-class CampaignFormValidMixin(object):
+class CampaignFormValidMixin(CurrentContextMixin):
     """
     Defines the form_valid method where
-    the campaign id is retrieved from sessions and 
+    the campaign id is retrieved from the URL (or sessions) and 
     is added to the instance being created.
     """
     def form_valid(self, form):
-        campaign_id = self.request.session['current_campaign_id']
+        campaign_id = self.get_current_campaign_id()
         current_campaign = Campaign.objects.get(id=campaign_id)
         form.instance.campaign = current_campaign
         return super(CampaignFormValidMixin, self).form_valid(form)
 
 
+class VersionedUpdateMixin(object):
+    """
+    Saves update forms with VersionedFormMixin only if nobody saved their
+    rows since the form was shown. If someone did, their changes are merged
+    when they changed other fields, otherwise the form comes back with
+    a 409 status and the fields both changed.
+    """
+    merge_attempts = 3
+
+    def form_valid(self, form):
+        for attempt in range(self.merge_attempts):
+            try:
+                with transaction.atomic():
+                    form.claim_rows()
+                    return super(VersionedUpdateMixin, self).form_valid(form)
+            except VersionConflict:
+                current = self.get_current_form()
+                conflicts = form.merge(current)
+                if conflicts:
+                    break
+        return self.version_conflict(form, current, conflicts)
+
+    def get_current_form(self):
+        """
+        The form for the rows as they are now.
+        """
+        kwargs = self.get_form_kwargs()
+        kwargs.pop('data', None)
+        kwargs.pop('files', None)
+        kwargs['instance'] = self.get_object()
+        return self.get_form_class()(**kwargs)
+
+    def version_conflict(self, form, current, conflicts):
+        """
+        Shows the submitted values again, but against the current rows,
+        so saving once more keeps them.
+        """
+        data = form.data.copy()
+        data[ROW_VERSION_FIELD] = current.make_token()
+        self.object = current.instance
+        kwargs = self.get_form_kwargs()
+        kwargs.update(data=data, instance=self.object)
+        form = self.get_form_class()(**kwargs)
+        form.is_valid()
+        if conflicts:
+            changed = ', '.join(
+                f"{form.fields[name].label or name} (now {current[name].value()})" for name in conflicts
+            )
+        else:
+            changed = 'this page'
+        form.add_error(
+            None,
+            f'Someone else changed {changed} while you were editing. Save again to keep your values.',
+        )
+        return self.render_to_response(self.get_context_data(form=form), status=409)
+
+
 class CreateCharacterMixin(CampaignFormValidMixin):
     """
     Re-defines the form_valid method and 
@@ -220,10 +321,13 @@ class CreateCharacterMixin(CampaignFormValidMixin):
 
     def get_success_url(self):
         # Save the character id and character class to sessions:
-        self.request.session['current_character_id'] = self.object.pk
-        self.request.session['current_character_class'] = self.object.character_class
+        update_session(
+            self.request.session,
+            current_character_id=self.object.pk,
+            current_character_class=self.object.character_class,
+        )
 
-        campaign_id = self.request.session['current_campaign_id']
+        campaign_id = self.get_current_campaign_id()
         character_class = self.object.character_class
         character_string = '-'.join(character_class.lower().split())
         character_string += '-detail'
@@ -1,6 +1,7 @@
 from django.db import models
 from django.db.models.signals import post_save, m2m_changed, pre_delete
-from django.db.models import Q
+from django.db.models import F, Q
+from django.db.models.functions import Upper
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
 
@@ -24,11 +25,50 @@ from campaign.constants import (
     TERRIBLE_PURPOSE,
     NPC_TYPE, PRONOUNS, INITIATES_OF_DNAU, STONETOP_RESIDENCES, 
     ANIMAL_COMPANION_COSTS, ANIMAL_COMPANION_INSTINCTS,
-    AMMO_CHOICES,
+    AMMO_CHOICES, EVENT_CODES,
     CREW_COSTS, CREW_INSTINCTS
 )
 
 
+class VersionConflict(Exception):
+    """
+    The row was saved by someone else since the form was shown.
+    """
+    def __init__(self, row):
+        super().__init__(f'{row._meta.verbose_name} {row.pk} was changed by someone else.')
+        self.row = row
+
+
+class VersionedModel(models.Model):
+    """
+    Rows that the GM and players can edit at the same time.
+    Every save bumps the version, so update forms can check that
+    nobody saved the row since they were shown (see VersionedFormMixin).
+    """
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version = F('version') + 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version'}
+        super().save(*args, **kwargs)
+
+    def claim_version(self, version):
+        """
+        UPDATE ... SET version = version + 1 WHERE id = pk AND version = n.
+        Inside a transaction this also holds the row until the form is saved.
+        """
+        version_model = self._meta.get_field('version').model
+        claimed = version_model._base_manager.filter(pk=self.pk, version=version).update(version=F('version') + 1)
+        if not claimed:
+            raise VersionConflict(self)
+
+
 class Campaign(models.Model):
     """
     Overall campaign class which contains a number of players, monsters, threats, etc.
@@ -83,11 +123,14 @@ class Tags(models.Model):
     tags that apply some of the time, not all of the time!
     """
     name = models.CharField(max_length=150, unique=True)
+    # Stable key for lookups in the code, set once from the name (see campaign.registry)
+    slug = models.SlugField(max_length=150, unique=True, blank=True)
     
     # TODO: Potentially add a couple fields for boosts that might be given due to a tag.
 
     class Meta:
         ordering = ['name']
+        # name__istartswith uses tags_upper_name_prefix_idx (see migration 0016)
 
     def __str__(self):
         return f"{self.name}"
@@ -157,6 +200,8 @@ class Background(models.Model):
     """
     character_class = models.ForeignKey(CharacterClass, on_delete=models.CASCADE)
     background = models.CharField(max_length=100)
+    # Stable key for lookups in the code, set once from the background (see campaign.registry)
+    slug = models.SlugField(max_length=100, blank=True)
     description = models.TextField(max_length=10000)
     description2 = models.TextField(max_length=10000, null=True, blank=True)
     description3 = models.TextField(max_length=10000, null=True, blank=True)
@@ -164,6 +209,11 @@ class Background(models.Model):
     total_charges = models.IntegerField(blank=True, null=True)
     charge_name = models.CharField(max_length=120, null=True, blank=True)
     effect_name = models.CharField(max_length=120, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['character_class', 'slug'], name='background_class_slug_unique'),
+        ]
     
     def __str__(self):
         return f"{self.background}"
@@ -229,6 +279,12 @@ class AppearanceAttribute(models.Model):
     attribute_type = models.CharField(max_length=100, choices=PHYSICAL_CHARACTERISTIC)
     description = models.CharField(max_length=1000, unique=True)
 
+    class Meta:
+        indexes = [
+            # Filtered by attribute type and joined to the character class
+            models.Index(fields=['attribute_type', 'id'], name='appearance_type_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.description}"
 
@@ -309,7 +365,7 @@ class SpecialPossessionSingleChoice(models.Model):
         return f"{self.description}"
 
 
-class SpecialPossessionInstance(models.Model):
+class SpecialPossessionInstance(VersionedModel):
     """
     Instance of a special possession that can be editted.
     """
@@ -400,6 +456,9 @@ class Moves(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name'], name='moves_name_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name}"
@@ -417,7 +476,7 @@ class MoveExtraAbilities(models.Model):
         return f"{self.description}"
 
 
-class MoveInstance(models.Model):
+class MoveInstance(VersionedModel):
     """
     This is for moves that have checkboxes or uses that will change over the course of the game.
     Also it will allow for players to take moves more than once without having to create the same move
@@ -440,7 +499,7 @@ class MoveInstance(models.Model):
         return f"{self.move.name}"
 
 
-class Character(models.Model):
+class Character(VersionedModel):
     """
     Generic character class for the various characters in Stonetop 
     """
@@ -507,12 +566,10 @@ class Character(models.Model):
     move_instances = models.ManyToManyField(MoveInstance, blank=True)
 
     # Inventory attributes allows players to add items to their characters
+    # The items, small_items, major_arcana and minor_arcana are
+    # the reverse relations of the character field on the instances
     undefined_items = models.IntegerField(null=True, blank=True)
-    items = models.ManyToManyField('ItemInstance', related_name="character_to_item", blank=True)
     undefined_small_items = models.IntegerField(null=True, blank=True)
-    small_items = models.ManyToManyField('SmallItemInstance', related_name="character_to_smallitem", blank=True)
-    major_arcana = models.ManyToManyField('MajorArcanaInstance', related_name='character_to_major_arcana', blank=True)
-    minor_arcana = models.ManyToManyField('MinorArcanaInstance', related_name='character_to_minor_arcana', blank=True)
 
     # Crew attributes for The Marshal
 
@@ -636,6 +693,12 @@ class HistoryOfViolence(models.Model):
     """
     history_theme = models.CharField(choices=HISTORIES_OF_VIOLENCE, max_length=300)
     history_description = models.TextField(max_length=500)
+
+    class Meta:
+        indexes = [
+            # For history_theme__iexact
+            models.Index(Upper('history_theme'), name='history_upper_theme_idx'),
+        ]
     
     def __str__(self):
         return f"{self.history_description}"
@@ -661,6 +724,12 @@ class TheChronical(models.Model):
     attribute_type = models.CharField(choices=CHRONICAL, help_text="Is this aspect of the chronical positive or not?", max_length=100, default=CHRONICAL[0])
     chronical_description = models.CharField(max_length=250)
 
+    class Meta:
+        indexes = [
+            # For attribute_type__iexact
+            models.Index(Upper('attribute_type'), name='chronical_upper_type_idx'),
+        ]
+
     def __str__(self):
         return f"{self.chronical_description}"
 
@@ -940,6 +1009,11 @@ class FearAndAnger(models.Model):
     attribute_type = models.CharField(choices=FEAR_AND_ANGER, max_length=10)
     description = models.CharField(max_length=150)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['attribute_type'], name='fearandanger_type_idx'),
+        ]
+
     def __str__(self):
         return f"{self.description}"
 
@@ -1052,7 +1126,7 @@ class NonPlayerCharacter(models.Model):
         return f"{self.generic_name}"
 
 
-class NPCInstance(models.Model):
+class NPCInstance(VersionedModel):
     """
     Creates an instance of a Non Player Character.
     This is so that default NPCs can be created and reused, 
@@ -1094,12 +1168,13 @@ class NPCInstance(models.Model):
         help_text="Write any additional moves that the default NPC didn't have.",
         blank=True)
     additional_details = models.TextField(null=True, blank=True)
+    # (campaign, character_name__istartswith) uses npcinstance_campaign_name_idx (see migration 0017)
 
     def __str__(self):
         return f"{self.character_name}"
 
 
-class FollowerInstance(models.Model):
+class FollowerInstance(VersionedModel):
     """
     Creates an instance of a follower.
     This is so that default potential followers can be created and reused.
@@ -1116,11 +1191,9 @@ class FollowerInstance(models.Model):
             """,
         max_length=100,
     )
-    # Inventory:
+    # Inventory (items and small_items are the reverse relations of the follower field on the instances):
     undefined_items = models.IntegerField(null=True, blank=True)
-    items = models.ManyToManyField('ItemInstance', blank=True)
     undefined_small_items = models.IntegerField(null=True, blank=True)
-    small_items = models.ManyToManyField('SmallItemInstance', blank=True)
 
     def __str__(self):
         return f"{self.npc_instance.character_name}"
@@ -1270,6 +1343,12 @@ class AnimalCompanion(models.Model):
     beast_of_legend = models.ManyToManyField(BeastOfLegend, blank=True)
     additional_detail = models.TextField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # The newest animal companion of a character is shown
+            models.Index(fields=['character', '-id'], name='animal_char_newest_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name}"
 
@@ -1280,6 +1359,26 @@ class AnimalCompanion(models.Model):
 # to equip the items. Or, Create a view that updates only the can_view attribute, 
 # which could be used when giving an item to another character (and could also delete the associated instance?).
 
+class ItemQuerySet(models.QuerySet):
+    """
+    Shared by InventoryItem and SmallItem.
+    """
+    def visible_to(self, character):
+        """
+        Items the character can choose from: the default items, the ones they created
+        and the ones they were given access to (can_view).
+        The ids come from a UNION ALL of three index scans so there is no OR across
+        the can_view join, and no duplicate rows to remove.
+        """
+        can_view = self.model.can_view.through.objects.filter(character=character)
+        visible_ids = self.model.objects.filter(default_item=True).values('id').union(
+            self.model.objects.filter(created_by=character).values('id'),
+            can_view.values(f'{self.model._meta.model_name}_id'),
+            all=True,
+        )
+        return self.filter(id__in=visible_ids)
+
+
 class InventoryItem(models.Model):
     """
     This model will create Items that can then be outfitted by characters and followers.
@@ -1331,6 +1430,14 @@ class InventoryItem(models.Model):
     created_by = models.ForeignKey(Character, related_name="created_by_item", on_delete=models.CASCADE, null=True, blank=True)
     can_view = models.ManyToManyField(Character, related_name="can_view_item", blank=True)
 
+    objects = ItemQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Only the default items are listed for everyone
+            models.Index(fields=['name'], name='item_default_name_idx', condition=Q(default_item=True)),
+        ]
+
     def __str__(self):
         return f"{self.name}"
 
@@ -1382,18 +1489,26 @@ class SmallItem(models.Model):
     created_by = models.ForeignKey(Character, related_name="created_by_small_item", on_delete=models.CASCADE, null=True, blank=True)
     can_view = models.ManyToManyField(Character, related_name="can_view_small_item", blank=True)
 
+    objects = ItemQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Only the default items are listed for everyone
+            models.Index(fields=['name'], name='smallitem_default_name_idx', condition=Q(default_item=True)),
+        ]
+
     def __str__(self):
         return f"{self.name}"
 
 
-class ItemInstance(models.Model):
+class ItemInstance(VersionedModel):
     """
     Instance of the Item class.
     This class will allow characters and followers to outfit for their inventory.
     """
     item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE)
-    character = models.ForeignKey(Character, related_name="item_to_character", on_delete=models.CASCADE, null=True, blank=True)
-    follower = models.ForeignKey(FollowerInstance, on_delete=models.CASCADE, null=True, blank=True)
+    character = models.ForeignKey(Character, related_name="items", on_delete=models.CASCADE, null=True, blank=True)
+    follower = models.ForeignKey(FollowerInstance, related_name="items", on_delete=models.CASCADE, null=True, blank=True)
     outfitted = models.BooleanField(default=False)
     uses = models.IntegerField(null=True, blank=True)
     ammo = models.CharField(
@@ -1402,18 +1517,28 @@ class ItemInstance(models.Model):
         default=AMMO_CHOICES[0][0],
         null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Inventory pages split the items by outfitted
+            models.Index(fields=['character', 'outfitted'], name='iteminst_char_outfit_idx'),
+            models.Index(
+                fields=['follower', 'outfitted'], name='iteminst_follower_outfit_idx',
+                condition=Q(follower__isnull=False),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.item.name}"
 
 
-class SmallItemInstance(models.Model):
+class SmallItemInstance(VersionedModel):
     """
     Instance of the SmallItem class.
     This class will allow characters and followers to outfit for their inventory.
     """
     small_item = models.ForeignKey(SmallItem, on_delete=models.CASCADE)
-    character = models.ForeignKey(Character, related_name="smallitem_to_character", on_delete=models.CASCADE, null=True, blank=True)
-    follower = models.ForeignKey(FollowerInstance, on_delete=models.CASCADE, null=True, blank=True)
+    character = models.ForeignKey(Character, related_name="small_items", on_delete=models.CASCADE, null=True, blank=True)
+    follower = models.ForeignKey(FollowerInstance, related_name="small_items", on_delete=models.CASCADE, null=True, blank=True)
     outfitted = models.BooleanField(default=False)
     uses = models.IntegerField(null=True, blank=True)
     ammo = models.CharField(
@@ -1422,6 +1547,16 @@ class SmallItemInstance(models.Model):
         default=AMMO_CHOICES[0][0],
         null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Inventory pages split the items by outfitted
+            models.Index(fields=['character', 'outfitted'], name='smallinst_char_outfit_idx'),
+            models.Index(
+                fields=['follower', 'outfitted'], name='smallinst_follower_outfit_idx',
+                condition=Q(follower__isnull=False),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.small_item.name}"
         
@@ -1553,6 +1688,8 @@ class MajorArcanum(models.Model):
     The Seeker starts with one Major Arcanum.
     """
     name = models.CharField(max_length=300)
+    # Stable key for lookups in the code, set once from the name (see campaign.registry)
+    slug = models.SlugField(max_length=300, unique=True, blank=True)
     description1 = models.TextField()
     description2 = models.TextField(null=True, blank=True)
     description3 = models.TextField(null=True, blank=True)
@@ -1568,6 +1705,9 @@ class MajorArcanum(models.Model):
     
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name'], name='majorarcanum_name_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name}"
@@ -1603,14 +1743,14 @@ class MinorArcanum(models.Model):
         return f"{self.name}"
 
 
-class MajorArcanaInstance(models.Model):
+class MajorArcanaInstance(VersionedModel):
     """
     Instance of the InventoryItem class.
     This class will allow characters and followers to outfit for their inventory.
     """
     arcana = models.ForeignKey(MajorArcanum, on_delete=models.CASCADE)
-    character = models.ForeignKey(Character, related_name="major_arcana_to_character", on_delete=models.CASCADE, null=True, blank=True)
-    follower = models.ForeignKey(FollowerInstance, related_name="major_arcana_to_follower", on_delete=models.CASCADE, null=True, blank=True)
+    character = models.ForeignKey(Character, related_name="major_arcana", on_delete=models.CASCADE, null=True, blank=True)
+    follower = models.ForeignKey(FollowerInstance, related_name="major_arcana", on_delete=models.CASCADE, null=True, blank=True)
     outfitted = models.BooleanField(default=False)
     marks = models.IntegerField(null=True, blank=True)
     charges = models.IntegerField(null=True, blank=True)
@@ -1625,14 +1765,14 @@ class MajorArcanaInstance(models.Model):
         return f"{self.arcana.name}"
 
 
-class MinorArcanaInstance(models.Model):
+class MinorArcanaInstance(VersionedModel):
     """
     Instance of the InventoryItem class.
     This class will allow characters and followers to outfit for their inventory.
     """
     arcana = models.ForeignKey(MinorArcanum, on_delete=models.CASCADE)
-    character = models.ForeignKey(Character, related_name="minor_arcana_to_character", on_delete=models.CASCADE, null=True, blank=True)
-    follower = models.ForeignKey(FollowerInstance, related_name="minor_arcana_to_follower", on_delete=models.CASCADE, null=True, blank=True)
+    character = models.ForeignKey(Character, related_name="minor_arcana", on_delete=models.CASCADE, null=True, blank=True)
+    follower = models.ForeignKey(FollowerInstance, related_name="minor_arcana", on_delete=models.CASCADE, null=True, blank=True)
     outfitted = models.BooleanField(default=False)
     marks = models.IntegerField(null=True, blank=True)
     charges = models.IntegerField(null=True, blank=True)
@@ -1644,3 +1784,58 @@ class MinorArcanaInstance(models.Model):
     
     def __str__(self):
         return f"{self.arcana.name}"
+
+
+# Event log:
+
+class CampaignEvent(models.Model):
+    """
+    One change made at the table (damage, uses, XP, marks, ammo...).
+    Events are only ever appended (see campaign/events.py), and kept narrow:
+    the target type and field are one code, the value is the new value
+    (ammo as its level in AMMO_CHOICES) and the delta what was asked for.
+    """
+    # The indexes below start with these, no need for their own
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, db_index=False)
+    character = models.ForeignKey(Character, on_delete=models.CASCADE, null=True, blank=True, db_index=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    code = models.PositiveSmallIntegerField(choices=EVENT_CODES)
+    target_id = models.BigIntegerField()
+    delta = models.IntegerField()
+    value = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Exports read a campaign's events in order, replays a character's
+            models.Index(fields=['campaign', 'id'], name='event_campaign_idx'),
+            models.Index(
+                fields=['character', 'id'], name='event_character_idx',
+                condition=Q(character__isnull=False),
+            ),
+            # Compaction looks for the events past the retention
+            models.Index(fields=['created'], name='event_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_code_display()} {self.target_id}: {self.delta:+d}"
+
+
+class CharacterSnapshot(models.Model):
+    """
+    A character's counters replayed up to last_event_id. Compacting the
+    event log leaves one of these in place of the events it deletes.
+    """
+    character = models.ForeignKey(Character, related_name="snapshots", on_delete=models.CASCADE, db_index=False)
+    last_event_id = models.BigIntegerField()
+    taken = models.DateTimeField(auto_now_add=True)
+    state = models.JSONField()
+
+    class Meta:
+        indexes = [
+            # Replays start from the latest snapshot
+            models.Index(fields=['character', '-last_event_id'], name='snapshot_character_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.character} up to event {self.last_event_id}"
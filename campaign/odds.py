@@ -0,0 +1,116 @@
+"""
+The odds of a move's 10+ / 7-9 / 6- results for each of a character's stats.
+
+Moves are rolled with 2d6 plus a stat. With advantage three dice are rolled
+and the best two kept, with disadvantage the worst two. A debility gives
+disadvantage on its two stats (weakened: STR/DEX, dazed: INT/WIS,
+miserable: CON/CHA), and advantage and disadvantage cancel out.
+
+The dice distributions are exact counts, so the table of results for every
+roll and modifier is worked out once when the module is loaded; looking up
+a whole party is a handful of dictionary lookups:
+
+    stat_odds(character, roll='advantage', modifier=1)['dexterity'].hit
+"""
+from collections import namedtuple
+from itertools import product
+
+
+NORMAL, ADVANTAGE, DISADVANTAGE = 'normal', 'advantage', 'disadvantage'
+ROLLS = [NORMAL, ADVANTAGE, DISADVANTAGE]
+
+STAT_DEBILITIES = {
+    'strength': 'weakened',
+    'dexterity': 'weakened',
+    'intelligence': 'dazed',
+    'wisdom': 'dazed',
+    'constitution': 'miserable',
+    'charisma': 'miserable',
+}
+
+# The fields stat_odds reads
+ODDS_FIELDS = list(STAT_DEBILITIES) + ['weakened', 'dazed', 'miserable']
+
+# Stats go from -1 to +3, this leaves room for forward/ongoing bonuses
+MODIFIERS = range(-6, 10)
+
+DIE = [1] * 6  # counts of 1..6
+
+Odds = namedtuple('Odds', ['modifier', 'roll', 'hit', 'partial', 'miss'])
+
+
+def convolve(a, b):
+    """
+    The counts of the sums of two distributions (index 0 is the lowest sum).
+    """
+    counts = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        for j, y in enumerate(b):
+            counts[i + j] += x * y
+    return counts
+
+
+def keep_two(best):
+    """
+    The counts of 2..12 when rolling 3d6 and keeping the best (or worst) two.
+    """
+    counts = [0] * 11
+    for dice in product(range(1, 7), repeat=3):
+        dice = sorted(dice, reverse=best)
+        counts[dice[0] + dice[1] - 2] += 1
+    return counts
+
+
+# Counts of the dice totals 2..12 for each roll
+DICE = {
+    NORMAL: convolve(DIE, DIE),
+    ADVANTAGE: keep_two(best=True),
+    DISADVANTAGE: keep_two(best=False),
+}
+
+
+def results(roll, modifier):
+    """
+    The chances of 10+, 7-9 and 6- (in that order).
+    """
+    counts = DICE[roll]
+    total = sum(counts)
+    hit = partial = 0
+    for dice_total, count in enumerate(counts, start=2):
+        if dice_total + modifier >= 10:
+            hit += count
+        elif dice_total + modifier >= 7:
+            partial += count
+    return hit / total, partial / total, (total - hit - partial) / total
+
+
+TABLE = {(roll, modifier): results(roll, modifier) for roll in ROLLS for modifier in MODIFIERS}
+
+
+def get_odds(modifier, roll=NORMAL):
+    # Past the ends of the table every roll hits (or misses) anyway
+    in_table = min(max(modifier, MODIFIERS.start), MODIFIERS.stop - 1)
+    return Odds(modifier, roll, *TABLE[(roll, in_table)])
+
+
+def combine(advantage, disadvantage):
+    if advantage == disadvantage:
+        return NORMAL
+    return ADVANTAGE if advantage else DISADVANTAGE
+
+
+def stat_odds(character, roll=NORMAL, modifier=0):
+    """
+    Returns the odds for each stat of the character (a Character or a dict
+    of its stat and debility fields) for a roll with the extra modifier.
+    """
+    get = character.get if isinstance(character, dict) else lambda field: getattr(character, field)
+    odds = {}
+    for stat, debility in STAT_DEBILITIES.items():
+        stat_roll = combine(roll == ADVANTAGE, roll == DISADVANTAGE or bool(get(debility)))
+        odds[stat] = get_odds(get(stat) + modifier, stat_roll)
+    return odds
+
+
+def odds_as_json(odds):
+    return {stat: stat_odds._asdict() for stat, stat_odds in odds.items()}
@@ -0,0 +1,96 @@
+"""
+Registry of the stable slug keys of the rules rows.
+
+Code that needs a specific rules row (the Storm Markings arcanum,
+the tiny tag...) looks it up by slug instead of by its display text:
+
+    arcanum_id = get_id(MajorArcanum, 'storm-markings')
+
+The slug to id maps are loaded once per model and kept in memory.
+A miss reloads the map once, so rows added since are found too.
+Background slugs are only unique per playbook, so backgrounds
+are checked with character.background.slug instead.
+"""
+from django.utils.text import slugify
+
+
+# Field each slug is made from
+SLUG_SOURCES = {
+    'Tags': 'name',
+    'MajorArcanum': 'name',
+    'Background': 'background',
+}
+
+_registry = {}
+
+
+class UnknownSlug(KeyError):
+    pass
+
+
+# Fields the slug only has to be unique with (see the Background constraint)
+SLUG_SCOPES = {
+    'Background': ['character_class'],
+}
+
+# Room kept for a -n suffix when a slug is cut at the field's max_length
+SUFFIX_ROOM = 10
+
+
+def make_slug(instance):
+    """
+    The slug for a new row: its name slugified, with -2, -3... when another
+    row already has it (players create tags whose names only differ in case
+    or punctuation). Names without letters or digits use the model name.
+    """
+    model = instance.__class__
+    max_length = model._meta.get_field('slug').max_length
+    base = slugify(getattr(instance, SLUG_SOURCES[model.__name__]))[:max_length] or slugify(model.__name__)
+    scope = {field: getattr(instance, field) for field in SLUG_SCOPES.get(model.__name__, [])}
+    taken = set(model._base_manager.filter(
+        slug__startswith=base[:max_length - SUFFIX_ROOM], **scope,
+    ).exclude(pk=instance.pk).values_list('slug', flat=True))
+    slug = base
+    number = 2
+    while slug in taken:
+        suffix = f'-{number}'
+        slug = base[:max_length - len(suffix)] + suffix
+        number += 1
+    return slug
+
+
+def _load(model):
+    ids = dict(model.objects.values_list('slug', 'id'))
+    _registry[model] = ids
+    return ids
+
+
+def get_id(model, slug):
+    """
+    Returns the id of the row of the model with the slug.
+    """
+    ids = _registry.get(model)
+    if ids is None or slug not in ids:
+        ids = _load(model)
+    try:
+        return ids[slug]
+    except KeyError:
+        raise UnknownSlug(f'No {model.__name__} with the slug {slug!r}') from None
+
+
+def get_ids(model, slugs):
+    """
+    Returns the ids of the rows of the model with the slugs.
+    Slugs that are not in the database are left out.
+    """
+    ids = _registry.get(model)
+    if ids is None or any(slug not in ids for slug in slugs):
+        ids = _load(model)
+    return [ids[slug] for slug in slugs if slug in ids]
+
+
+def clear(model=None):
+    if model is None:
+        _registry.clear()
+    else:
+        _registry.pop(model, None)
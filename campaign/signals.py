@@ -1,4 +1,9 @@
-from django.db.models.signals import post_save, m2m_changed, pre_delete
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed, pre_delete
+
+from campaign import registry
+from campaign.catalog import CATALOG_MODELS, CATALOG_M2M_THROUGH, invalidate_snapshot
+from campaign import arcana, creation_rules, eligibility, generator
 
 from campaign.models import (
     BackgroundInstance, Character,
@@ -9,6 +14,7 @@ from campaign.models import (
     InventoryItem, SmallItem,
     ItemInstance, SmallItemInstance,
     MajorArcanum, MajorArcanaInstance,
+    Tags, Background,
 )
 from campaign.constants import (
     CHARACTERS, DAMAGE_DIE
@@ -94,15 +100,13 @@ def the_heavy_post_save(sender, instance, created, *args, **kwargs):
     if created:
         instance = save_character_data(instance=instance)
         # The STORM-MARKED background starts with the Storm Markings Major Arcanum
-        if instance.background.background == 'STORM-MARKED':
+        if instance.background.slug == 'storm-marked':
             # create an instance that the heavy starts with
-            storm_markings = MajorArcanum.objects.get(name="Storm Markings")
-            storm_marking_instance = MajorArcanaInstance.objects.create(
-                arcana=storm_markings,
+            MajorArcanaInstance.objects.create(
+                arcana_id=registry.get_id(MajorArcanum, 'storm-markings'),
                 character=instance,
                 marks=1
             )
-            instance.major_arcana.add(storm_marking_instance)
 
         instance.character_class = CHARACTERS[2][1]
         instance.damage_die = DAMAGE_DIE[3][1]
@@ -210,8 +214,7 @@ def npc_instance_post_save(sender, instance, created, *args, **kwargs):
         if instance.default_npc:
             if instance.character_name == None:
                 instance.character_name = instance.default_npc.name
-            
-            # TODO: Write out a method to automatically create an NPCinstance from a default NPC
+            # Many instances of a default NPC are made with campaign.spawning.spawn_npcs
         else:
             instance.current_hp = instance.max_hp
             instance.save()
@@ -239,13 +242,11 @@ def inventory_item_post_save(sender, instance, created, *args, **kwargs):
     if created:
         character = instance.created_by
         
-        new_item = ItemInstance.objects.create(
+        ItemInstance.objects.create(
             item=instance,
             outfitted=True,
             character=character,
         )
-        if character != None:
-            character.items.add(new_item)
 
         instance.save()
 
@@ -258,13 +259,11 @@ def small_item_post_save(sender, instance, created, *args, **kwargs):
     if created:
         character = instance.created_by
         
-        new_item = SmallItemInstance.objects.create(
+        SmallItemInstance.objects.create(
             small_item=instance,
             outfitted=True,
             character=character,
         )
-        if character != None:
-            character.small_items.add(new_item)
 
         instance.save()
 
@@ -290,3 +289,60 @@ def iteminstance_post_save(sender, instance, created, *args, **kwargs):
         instance.save()
 
 post_save.connect(iteminstance_post_save, sender=ItemInstance)
+
+
+def clear_catalog():
+    invalidate_snapshot()
+    # Other processes notice the rebuilt snapshot instead
+    eligibility.clear()
+    creation_rules.clear()
+    generator.clear()
+    arcana.clear()
+
+
+def catalog_changed(sender, instance=None, *args, **kwargs):
+    """
+    Removes the catalog snapshot whenever the rules it was built from change,
+    so that it gets rebuilt on the next lookup. Only once the change is
+    committed: a rebuild before then would read the old rules (or, after a
+    rollback, rules that never were).
+    """
+    # Items made by players are not part of the catalog
+    if getattr(instance, 'default_item', True):
+        transaction.on_commit(clear_catalog)
+
+for catalog_model in CATALOG_MODELS:
+    post_save.connect(catalog_changed, sender=catalog_model)
+    post_delete.connect(catalog_changed, sender=catalog_model)
+
+for through_model in CATALOG_M2M_THROUGH:
+    m2m_changed.connect(catalog_changed, sender=through_model)
+
+
+def tag_changed(sender, instance, created=False, *args, **kwargs):
+    """
+    Tags are only in the catalog through the arcana they are on, so new tags
+    (players add them from the autocomplete) never rebuild the snapshot.
+    """
+    if not created and (instance.majorarcanum_set.exists() or instance.minorarcanum_set.exists()):
+        catalog_changed(sender, instance)
+
+post_save.connect(tag_changed, sender=Tags)
+# Before the delete, while the tag is still on its arcana
+pre_delete.connect(tag_changed, sender=Tags)
+
+
+def fill_slug(sender, instance, *args, **kwargs):
+    """
+    Sets the slug of new rules rows (fixtures included) from their name.
+    The slug is never changed afterwards, so renaming a row keeps its key.
+    """
+    if not instance.slug:
+        instance.slug = registry.make_slug(instance)
+
+def slug_row_deleted(sender, *args, **kwargs):
+    registry.clear(sender)
+
+for slug_model in (Tags, MajorArcanum, Background):
+    pre_save.connect(fill_slug, sender=slug_model)
+    post_delete.connect(slug_row_deleted, sender=slug_model)
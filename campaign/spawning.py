@@ -0,0 +1,84 @@
+"""
+Creates many NPC instances from a default NPC at once (a village, a warband...).
+
+The instances get the template's HP, highest armor, first damage die,
+instinct and residence, and its tags and moves. Whatever the number of
+NPCs, spawning is a fixed number of queries in one transaction: the
+template, one bulk insert of the instances and one bulk insert per M2M
+table.
+
+    npcs = spawn_npcs(bandit, campaign, request.user, 12, random_names=True)
+
+Without random names the NPCs are numbered after the template (Bandit 1,
+Bandit 2...), carrying on from the ones spawned before in the campaign.
+bulk_create skips the post_save signals, so current_hp is set here.
+"""
+import random
+
+from django.db import transaction
+
+from campaign.constants import DAMAGE_DIE, NPC_NAMES, PRONOUNS
+from campaign.models import DefaultNPC, NPCInstance
+
+
+MAX_SPAWN = 100
+
+
+def template_values(default_npc):
+    """
+    The NPCInstance fields copied from the default NPC (with its armor and
+    damage prefetched), without the name and pronouns.
+    """
+    armor = [armor.armor for armor in default_npc.default_armor.all()]
+    damage = [damage.damage_die for damage in default_npc.default_damage.all() if damage.damage_die]
+    return {
+        'default_npc': default_npc,
+        'armor': max(armor, default=0),
+        'max_hp': default_npc.default_max_hp,
+        'current_hp': default_npc.default_max_hp,
+        'damage': damage[0] if damage else DAMAGE_DIE[1][0],
+        'instinct': default_npc.default_instinct or '',
+        'residence': default_npc.default_residence,
+    }
+
+
+def spawn_names(default_npc, campaign, count, random_names=False, rng=random):
+    if random_names:
+        return [rng.choice(NPC_NAMES) for _ in range(count)]
+    spawned = NPCInstance.objects.filter(campaign=campaign, default_npc=default_npc).count()
+    return [f'{default_npc.name} {number}' for number in range(spawned + 1, spawned + count + 1)]
+
+
+def spawn_npcs(default_npc, campaign, player, count, random_names=False, random_pronouns=False, rng=random):
+    """
+    Creates count NPC instances of default_npc (a DefaultNPC or its id) in
+    the campaign, and returns them.
+    """
+    if not 0 < count <= MAX_SPAWN:
+        raise ValueError(f'Between 1 and {MAX_SPAWN} NPCs can be spawned at once.')
+    default_npc = DefaultNPC.objects.prefetch_related(
+        'default_tags', 'default_armor', 'default_damage', 'default_moves',
+    ).get(pk=getattr(default_npc, 'pk', default_npc))
+    values = template_values(default_npc)
+    tag_ids = [tag.pk for tag in default_npc.default_tags.all()]
+    move_ids = [move.pk for move in default_npc.default_moves.all()]
+
+    with transaction.atomic():
+        names = spawn_names(default_npc, campaign, count, random_names, rng)
+        npcs = NPCInstance.objects.bulk_create([
+            NPCInstance(
+                player=player, campaign=campaign, character_name=name,
+                pronouns=rng.choice(PRONOUNS)[0] if random_pronouns else None,
+                **values,
+            )
+            for name in names
+        ])
+        NPCInstance.tags.through.objects.bulk_create([
+            NPCInstance.tags.through(npcinstance_id=npc.pk, tags_id=tag_id)
+            for npc in npcs for tag_id in tag_ids
+        ])
+        NPCInstance.gm_moves.through.objects.bulk_create([
+            NPCInstance.gm_moves.through(npcinstance_id=npc.pk, gamemastermoves_id=move_id)
+            for npc in npcs for move_id in move_ids
+        ])
+    return npcs
@@ -6,6 +6,7 @@ from campaign.models import (
     Background, Instinct, AppearanceAttribute, 
     PlaceOfOrigin, SpecialPossessions, Moves,
 )
+from campaign.signals import clear_catalog
 
 TEST_USERNAME = 'testuser'
 TEST_EMAIL = 'testing@example.com'
@@ -14,6 +15,13 @@ TEST_CAMPAIGN = 'Open campaign for functional tests'
 
 class BaseTestClass(TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The fixtures changed the rules in a transaction that is never
+        # committed, so the catalog isn't cleared on its own
+        clear_catalog()
+
     def generate_create_character_form_data(self, 
         character_class=None, background=0, 
         STR=2, DEX=1, INT=1, WIS=0, CON=0, CHA=-1, stats=[],
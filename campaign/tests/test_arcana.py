@@ -0,0 +1,158 @@
+from django.test import TestCase
+
+from campaign import arcana
+from campaign.arcana import get_arcana_graph, taken_move_ids, unlock_moves
+from campaign.forms import UpdateMajorArcanaInstancesForm, UpdateMinorArcanaInstancesForm
+from campaign.models import (
+    ArcanaMoves, ArcanaMoveInstance, MajorArcanaInstance, MinorArcanaInstance, MinorArcanaMoves,
+)
+
+# From campaign_data.json
+ICE_SPHERE = 1  # 3 marks, no tasks
+MINDWALKING = 1
+A_MIGHTY_WILL = 2  # requires MINDWALKING
+MINDGEM = 7  # 4 tasks
+STORM_MARKINGS = 11
+
+
+class ArcanaGraphTests(TestCase):
+    fixtures = ['campaign_data.json']
+
+    def setUp(self):
+        arcana.clear()
+        self.move_instances = ArcanaMoveInstance.objects.count()
+
+    def instance(self, arcana_id=ICE_SPHERE, marks=3):
+        return MajorArcanaInstance.objects.create(arcana_id=arcana_id, marks=marks)
+
+    def form_data(self, form, **values):
+        data = {name: form[name].value() for name in ('marks', 'tasks', 'moves', 'consequences')}
+        data['row_version'] = form['row_version'].value()
+        data.update(values)
+        return data
+
+    def test_moves_are_compiled_in_prerequisite_order(self):
+        rules = get_arcana_graph().major[ICE_SPHERE]
+
+        self.assertEqual(list(rules.moves), [MINDWALKING, A_MIGHTY_WILL])
+        self.assertEqual(rules.moves[A_MIGHTY_WILL].requires, MINDWALKING)
+        self.assertEqual(rules.consequences[5].requires, 4)
+        self.assertEqual([pk for pk, _ in get_arcana_graph().major[MINDGEM].tasks], [1, 2, 3, 4])
+
+    def test_progress_does_not_query_the_database(self):
+        rules = get_arcana_graph().major[ICE_SPHERE]
+
+        with self.assertNumQueries(0):
+            progress = rules.progress(3, [], [MINDWALKING], [4])
+
+        self.assertEqual(progress.moves, [A_MIGHTY_WILL])
+        self.assertEqual(progress.consequences, [1, 2, 3, 6, 7, 5])
+
+    def test_moves_need_a_full_track_and_every_task(self):
+        ice_sphere = get_arcana_graph().major[ICE_SPHERE]
+        mindgem = get_arcana_graph().major[MINDGEM]
+
+        self.assertEqual(ice_sphere.progress(2, []).moves, [])
+        self.assertEqual(ice_sphere.progress(3, []).moves, [MINDWALKING])
+        self.assertFalse(mindgem.progress(None, [1, 2, 3]).tasks_done)
+        self.assertTrue(mindgem.progress(None, [1, 2, 3, 4]).tasks_done)
+
+    def test_requirements_are_enforced(self):
+        rules = get_arcana_graph().major[ICE_SPHERE]
+
+        self.assertEqual(rules.errors(3, [], [MINDWALKING, A_MIGHTY_WILL], [4, 5]), [])
+        self.assertEqual(rules.errors(3, [], [A_MIGHTY_WILL], []), ['A MIGHTY WILL requires MINDWALKING.'])
+        self.assertEqual(len(rules.errors(3, [], [], [5])), 1)
+        self.assertEqual(
+            rules.errors(1, [], [MINDWALKING], []), ['All 3 marks are needed before a move can be unlocked.'],
+        )
+        # Moves taken before stay, even if the marks were spent since
+        self.assertEqual(rules.errors(1, [], [MINDWALKING], [], [MINDWALKING]), [])
+
+    def test_unlocking_is_two_inserts_for_any_number_of_instances(self):
+        instances = [self.instance() for _ in range(5)]
+
+        # The inserts and their savepoint
+        with self.assertNumQueries(4):
+            unlock_moves([(instance, [MINDWALKING, A_MIGHTY_WILL]) for instance in instances])
+
+        self.assertEqual(ArcanaMoveInstance.objects.count(), self.move_instances + 10)
+        for instance in instances:
+            self.assertEqual(sorted(taken_move_ids(instance)), [MINDWALKING, A_MIGHTY_WILL])
+
+    def test_the_graph_is_rebuilt_when_the_rules_change(self):
+        get_arcana_graph()
+        with self.captureOnCommitCallbacks(execute=True):
+            move = ArcanaMoves.objects.create(arcana_id=ICE_SPHERE, name='COLD SNAP', description='...')
+
+        self.assertIn(move.pk, get_arcana_graph().major[ICE_SPHERE].moves)
+
+    def test_form_offers_the_rules_without_querying_them(self):
+        instance = self.instance()
+        get_arcana_graph()
+
+        # Taken tasks, moves and consequences, and the arcanum for the charges label
+        with self.assertNumQueries(4):
+            form = UpdateMajorArcanaInstancesForm(instance=instance)
+
+        self.assertEqual([pk for pk, _ in form.fields['moves'].choices], [MINDWALKING, A_MIGHTY_WILL])
+        self.assertEqual(form.progress.moves, [MINDWALKING])
+
+    def test_form_unlocks_moves_once(self):
+        instance = self.instance()
+        form = UpdateMajorArcanaInstancesForm(instance=instance)
+        form = UpdateMajorArcanaInstancesForm(
+            instance=instance, data=self.form_data(form, moves=[MINDWALKING, A_MIGHTY_WILL]),
+        )
+
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        instance = MajorArcanaInstance.objects.get(pk=instance.pk)
+        form = UpdateMajorArcanaInstancesForm(instance=instance)
+        form = UpdateMajorArcanaInstancesForm(
+            instance=instance, data=self.form_data(form, marks=0, consequences=[4]),
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        self.assertEqual(sorted(taken_move_ids(instance)), [MINDWALKING, A_MIGHTY_WILL])
+        self.assertEqual(ArcanaMoveInstance.objects.count(), self.move_instances + 2)
+        self.assertEqual(list(instance.consequences.values_list('id', flat=True)), [4])
+
+    def test_form_rejects_moves_that_are_not_unlocked_yet(self):
+        instance = self.instance(marks=2)
+        form = UpdateMajorArcanaInstancesForm(instance=instance)
+        form = UpdateMajorArcanaInstancesForm(
+            instance=instance, data=self.form_data(form, moves=[MINDWALKING], consequences=[5]),
+        )
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(len(form.non_field_errors()), 2)
+        self.assertEqual(ArcanaMoveInstance.objects.count(), self.move_instances)
+
+    def test_form_removes_unticked_moves(self):
+        instance = self.instance()
+        unlock_moves([(instance, [MINDWALKING, A_MIGHTY_WILL])])
+        form = UpdateMajorArcanaInstancesForm(instance=instance)
+        form = UpdateMajorArcanaInstancesForm(instance=instance, data=self.form_data(form, moves=[MINDWALKING]))
+
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        self.assertEqual(taken_move_ids(instance), [MINDWALKING])
+        self.assertEqual(ArcanaMoveInstance.objects.count(), self.move_instances + 1)
+
+    def test_minor_arcana_moves_need_every_task(self):
+        instance = MinorArcanaInstance.objects.create(arcana_id=1)
+        move = MinorArcanaMoves.objects.create(arcana_id=1, description='Call the wind')
+        tasks = [pk for pk, _ in get_arcana_graph().minor[1].tasks]
+        form = UpdateMinorArcanaInstancesForm(instance=instance)
+        data = {'row_version': form['row_version'].value(), 'moves': [move.pk]}
+
+        form = UpdateMinorArcanaInstancesForm(instance=instance, data=data)
+        self.assertEqual(form.is_valid(), not tasks)
+
+        form = UpdateMinorArcanaInstancesForm(instance=instance, data=dict(data, tasks=tasks))
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(list(instance.moves.values_list('id', flat=True)), [move.pk])
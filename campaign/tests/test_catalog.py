@@ -0,0 +1,200 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from campaign import catalog as catalog_module
+from campaign.catalog import (
+    CatalogSnapshot, CatalogSnapshotError,
+    build_snapshot, get_catalog, snapshot_path,
+)
+from campaign.forms import CreateTheHeavyForm
+from campaign.models import (
+    Background, Moves, MoveRequirements,
+    MajorArcanum, MajorArcanaTasks, InventoryItem, Tags,
+)
+from campaign.values import MoveValue, MajorArcanumValue
+
+
+class CatalogSnapshotTests(TestCase):
+    fixtures = ['campaign_data.json']
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'catalog.snapshot')
+        build_snapshot(self.path)
+        self.catalog = CatalogSnapshot(self.path)
+
+    def tearDown(self):
+        self.catalog.close()
+        self.tmp_dir.cleanup()
+
+    def test_get_move_by_id(self):
+        move = Moves.objects.get(name='DANGEROUS')
+
+        record = self.catalog.get('moves', move.pk)
+
+        self.assertIsInstance(record, MoveValue)
+        self.assertEqual(record.name, move.name)
+        self.assertEqual(record.description, move.description)
+        self.assertEqual(record.take_move_limit, move.take_move_limit)
+        self.assertEqual(record.total_uses, move.total_uses)
+
+    def test_move_requirements_are_stored_as_text(self):
+        move = Moves.objects.filter(move_requirements__isnull=False)[0]
+
+        record = self.catalog.get('moves', move.pk)
+
+        self.assertEqual(record.move_requirements, str(move.move_requirements))
+
+    def test_get_missing_id_returns_none(self):
+        self.assertIsNone(self.catalog.get('moves', 0))
+
+    def test_get_major_arcanum_by_name(self):
+        arcanum = MajorArcanum.objects.get(name='Storm Markings')
+
+        record = self.catalog.get_by_name('major_arcana', 'Storm Markings')
+
+        self.assertIsInstance(record, MajorArcanumValue)
+        self.assertEqual(record.pk, arcanum.pk)
+        self.assertEqual(record.weight, arcanum.weight)
+        self.assertEqual(record.tags, tuple(tag.name for tag in arcanum.tags.all()))
+        self.assertEqual(record.tasks, tuple(
+            MajorArcanaTasks.objects.filter(arcana=arcanum).order_by('id').values_list('description', flat=True)
+        ))
+
+    def test_moves_for_playbook_match_database(self):
+        moves = list(Moves.objects.filter(
+            character_class__class_name='The Heavy'
+        ).order_by('name', 'id').values_list('id', flat=True))
+
+        records = self.catalog.for_playbook('moves', 'The Heavy')
+
+        self.assertEqual([record.id for record in records], moves)
+
+    def test_backgrounds_for_playbook_match_database(self):
+        backgrounds = set(Background.objects.filter(
+            character_class__class_name='The Blessed'
+        ).values_list('background', flat=True))
+
+        records = self.catalog.for_playbook('backgrounds', 'The Blessed')
+
+        self.assertEqual({record.background for record in records}, backgrounds)
+
+    def test_only_default_items_in_catalog(self):
+        self.assertEqual(
+            self.catalog.count('items'),
+            InventoryItem.objects.filter(default_item=True).count(),
+        )
+
+    def test_all_is_ordered_by_name(self):
+        names = [record.name for record in self.catalog.all('major_arcana')]
+        self.assertEqual(names, sorted(names))
+
+    def test_out_of_date_snapshot_raises_error(self):
+        with open(self.path, 'r+b') as f:
+            f.seek(8)
+            f.write(b'\xff\xff\xff\xff')
+
+        with self.assertRaises(CatalogSnapshotError):
+            CatalogSnapshot(self.path)
+
+    def test_get_catalog_builds_missing_snapshot(self):
+        with override_settings(CATALOG_SNAPSHOT_PATH=os.path.join(self.tmp_dir.name, 'missing')):
+            catalog = get_catalog()
+            path = snapshot_path()
+
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(catalog.count('moves'), Moves.objects.count())
+
+    def test_saving_catalog_model_removes_snapshot(self):
+        with override_settings(CATALOG_SNAPSHOT_PATH=os.path.join(self.tmp_dir.name, 'changed')):
+            get_catalog()
+            self.assertTrue(os.path.exists(snapshot_path()))
+
+            move = Moves.objects.get(name='DANGEROUS')
+            move.description = 'Changed'
+            with self.captureOnCommitCallbacks(execute=True):
+                move.save()
+
+            self.assertFalse(os.path.exists(snapshot_path()))
+            self.assertEqual(get_catalog().get('moves', move.pk).description, 'Changed')
+
+    def test_the_snapshot_is_kept_until_the_change_is_committed(self):
+        with override_settings(CATALOG_SNAPSHOT_PATH=os.path.join(self.tmp_dir.name, 'uncommitted')):
+            get_catalog()
+
+            with self.captureOnCommitCallbacks() as callbacks:
+                Moves.objects.get(name='DANGEROUS').save()
+            self.assertTrue(os.path.exists(snapshot_path()))
+
+            for callback in callbacks:
+                callback()
+            self.assertFalse(os.path.exists(snapshot_path()))
+
+    def test_new_tags_keep_the_snapshot(self):
+        with override_settings(CATALOG_SNAPSHOT_PATH=os.path.join(self.tmp_dir.name, 'tags')):
+            get_catalog()
+
+            Tags.objects.create(name='Made by a player')
+
+            self.assertTrue(os.path.exists(snapshot_path()))
+
+    def test_renaming_a_tag_of_an_arcanum_removes_snapshot(self):
+        arcanum = MajorArcanum.objects.get(name='Storm Markings')
+        tag = Tags.objects.create(name='Stormy')
+        arcanum.tags.add(tag)
+        with override_settings(CATALOG_SNAPSHOT_PATH=os.path.join(self.tmp_dir.name, 'renamed')):
+            get_catalog()
+
+            tag.name = 'Thundering'
+            with self.captureOnCommitCallbacks(execute=True):
+                tag.save()
+
+            self.assertFalse(os.path.exists(snapshot_path()))
+            self.assertIn('Thundering', get_catalog().get('major_arcana', arcanum.pk).tags)
+
+    def test_the_file_is_checked_at_most_once_per_interval(self):
+        with override_settings(CATALOG_SNAPSHOT_PATH=os.path.join(self.tmp_dir.name, 'checked')):
+            get_catalog()
+
+            with mock.patch.object(catalog_module.os, 'stat', wraps=os.stat) as stat:
+                for _ in range(10):
+                    get_catalog()
+
+            self.assertEqual(stat.call_count, 0)
+
+    def test_the_old_snapshot_stays_readable_after_a_rebuild(self):
+        with override_settings(CATALOG_SNAPSHOT_PATH=os.path.join(self.tmp_dir.name, 'rebuilt')):
+            old = get_catalog()
+            move = Moves.objects.get(name='DANGEROUS')
+            with self.captureOnCommitCallbacks(execute=True):
+                move.save()
+
+            new = get_catalog()
+
+            self.assertIsNot(old, new)
+            self.assertEqual(old.get('moves', move.pk).name, 'DANGEROUS')
+
+
+class CatalogChoiceFieldTests(TestCase):
+    fixtures = ['campaign_data.json']
+
+    def test_move_choices_are_catalog_values(self):
+        form = CreateTheHeavyForm(character_class='The Heavy')
+        field = form.fields['move_instances']
+
+        choices = list(field.choices)
+
+        self.assertEqual([str(value) for value, _ in choices], [str(move.pk) for move in field.queryset])
+        self.assertIsInstance(choices[0][0].instance, MoveValue)
+
+    def test_move_labels_include_requirements(self):
+        form = CreateTheHeavyForm(character_class='The Heavy')
+        field = form.fields['move_instances']
+        move = field.queryset.filter(move_requirements__isnull=False)[0]
+
+        labels = dict((str(value), label) for value, label in field.choices)
+
+        self.assertIn(f"({ MoveRequirements.objects.get(moves=move) })", labels[str(move.pk)])
@@ -0,0 +1,127 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from campaign.combat import apply_round, parse_changes
+from campaign.counters import MAX_DELTA
+from campaign.models import (
+    Campaign, Character, CharacterClass, Background, TheFox,
+    NPCInstance, FollowerInstance, Moves, MoveInstance, InventoryItem, ItemInstance,
+)
+
+User = get_user_model()
+
+
+def change(target_type, pk, field, delta):
+    return {'target_type': target_type, 'id': pk, 'field': field, 'delta': delta}
+
+
+class CombatRoundTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        background = Background.objects.create(
+            character_class=CharacterClass.objects.create(class_name='The Fox'),
+            background='A LIFE OF CRIME', description='...',
+        )
+        cls.bram = TheFox.objects.create(
+            player=cls.player, campaign=cls.campaign, character_name='Bram', background=background,
+        )
+        cls.cedric = TheFox.objects.create(
+            player=cls.gm, campaign=cls.campaign, character_name='Cedric', background=background,
+        )
+        cls.wolves = [
+            NPCInstance.objects.create(
+                player=cls.gm, campaign=cls.campaign, character_name=f'Wolf {i}', max_hp=6, damage='D6', instinct='...',
+            )
+            for i in range(3)
+        ]
+        hound = NPCInstance.objects.create(
+            player=cls.player, campaign=cls.campaign, character_name='Hound', max_hp=8, damage='D6', instinct='...',
+        )
+        cls.follower = FollowerInstance.objects.create(
+            npc_instance=hound, character=cls.bram, campaign=cls.campaign, cost='food',
+        )
+        cls.move = MoveInstance.objects.create(
+            move=Moves.objects.create(name='DEADLY', description='...', total_uses=3), uses=3,
+        )
+        cls.bram.move_instances.add(cls.move)
+        cls.bow = ItemInstance.objects.create(
+            item=InventoryItem.objects.create(name='Bow', weight=2, has_ammo=True), character=cls.bram,
+        )
+
+    def test_a_round(self):
+        values = apply_round(self.gm, self.campaign.pk, [
+            change('npc', self.wolves[0].pk, 'hp', -4),
+            change('npc', self.wolves[1].pk, 'hp', -10),
+            change('character', self.bram.pk, 'hp', -3),
+            change('follower', self.follower.pk, 'hp', -2),
+            change('move', self.move.pk, 'uses', -1),
+            change('item', self.bow.pk, 'ammo', -1),
+        ])
+
+        self.assertEqual([value['value'] for value in values], [2, 0, 13, 6, 2, 'plenty left'])
+        self.assertEqual(NPCInstance.objects.get(pk=self.wolves[0].pk).current_hp, 2)
+        self.assertEqual(Character.objects.get(pk=self.bram.pk).current_hp, 13)
+        self.assertEqual(ItemInstance.objects.get(pk=self.bow.pk).ammo, 'plenty left')
+
+    def test_deltas_of_a_row_add_up_and_stay_in_bounds(self):
+        values = apply_round(self.gm, self.campaign.pk, [
+            change('character', self.bram.pk, 'hp', -3),
+            change('character', self.bram.pk, 'hp', 10),
+            change('item', self.bow.pk, 'ammo', -2),
+            change('item', self.bow.pk, 'ammo', -5),
+        ])
+
+        self.assertEqual(values, [
+            {'target_type': 'character', 'id': self.bram.pk, 'field': 'hp', 'value': 16},
+            {'target_type': 'item', 'id': self.bow.pk, 'field': 'ammo', 'value': 'all out'},
+        ])
+
+    def test_one_update_per_target_and_field(self):
+        changes = [change('npc', wolf.pk, 'hp', -i - 1) for i, wolf in enumerate(self.wolves)]
+        changes += [change('character', self.bram.pk, 'hp', -1), change('character', self.cedric.pk, 'hp', -2)]
+        version = NPCInstance.objects.get(pk=self.wolves[0].pk).version
+
+        # SAVEPOINT, a SELECT and an UPDATE per target, reading back per target, RELEASE
+        # and the event log INSERT in its own savepoint
+        with self.assertNumQueries(11):
+            values = apply_round(self.gm, self.campaign.pk, changes)
+
+        self.assertEqual([value['value'] for value in values], [5, 4, 3, 15, 14])
+        # The versions are bumped so open update forms merge
+        self.assertEqual(NPCInstance.objects.get(pk=self.wolves[0].pk).version, version + 1)
+
+    def test_players_only_change_their_characters(self):
+        with self.assertRaisesMessage(ValueError, f'There is no npc {self.wolves[0].pk} you can change'):
+            apply_round(self.player, self.campaign.pk, [
+                change('character', self.bram.pk, 'hp', -1),
+                change('npc', self.wolves[0].pk, 'hp', -1),
+            ])
+        with self.assertRaises(ValueError):
+            apply_round(self.player, self.campaign.pk, [change('character', self.cedric.pk, 'hp', -1)])
+
+        self.assertEqual(Character.objects.get(pk=self.bram.pk).current_hp, 16)
+        self.assertEqual(
+            apply_round(self.player, self.campaign.pk, [change('follower', self.follower.pk, 'hp', -1)])[0]['value'], 7,
+        )
+
+    def test_invalid_changes(self):
+        for changes in [
+            [],
+            [change('dragon', 1, 'hp', -1)],
+            [change('npc', 1, 'uses', -1)],
+            [change('npc', '1', 'hp', -1)],
+            [change('npc', 1, 'hp', True)],
+            [change('npc', 0, 'hp', -1)],
+            [change('npc', 2 ** 63, 'hp', -1)],
+            [change('npc', 1, 'hp', 3_000_000_000)],
+            [change('npc', 1, 'hp', -MAX_DELTA - 1)],
+            # Each is fine, their total is not
+            [change('npc', 1, 'hp', MAX_DELTA), change('npc', 1, 'hp', 1)],
+            ['hp'],
+        ]:
+            with self.assertRaises(ValueError):
+                parse_changes(changes)
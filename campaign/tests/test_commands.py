@@ -0,0 +1,119 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from campaign.management.commands.tune_campaign_tables import campaign_tables
+from campaign.models import Campaign, Character, CharacterClass, Background, TheBlessed, NPCInstance
+
+User = get_user_model()
+
+
+class TuneCampaignTablesCommandTests(TestCase):
+
+    def reloptions(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reloptions FROM pg_class WHERE relname = %s', [table])
+            return cursor.fetchone()[0] or []
+
+    def test_tables_include_playbooks_and_m2m_tables(self):
+        tables = campaign_tables()
+
+        self.assertIn('campaign_character', tables)
+        self.assertIn('campaign_theheavy', tables)
+        self.assertIn('campaign_character_move_instances', tables)
+        self.assertIn('campaign_iteminstance', tables)
+
+    def test_storage_parameters_are_set(self):
+        call_command('tune_campaign_tables', '--vacuum-scale-factor=0.05', stdout=StringIO())
+
+        self.assertIn('autovacuum_vacuum_scale_factor=0.05', self.reloptions('campaign_iteminstance'))
+        self.assertIn('fillfactor=90', self.reloptions('campaign_character'))
+
+    def test_reset_removes_storage_parameters(self):
+        call_command('tune_campaign_tables', stdout=StringIO())
+
+        call_command('tune_campaign_tables', '--reset', stdout=StringIO())
+
+        self.assertEqual(self.reloptions('campaign_npcinstance'), [])
+
+    def test_dry_run_only_prints_sql(self):
+        out = StringIO()
+
+        call_command('tune_campaign_tables', '--dry-run', stdout=out)
+
+        self.assertIn('ALTER TABLE "campaign_character" SET', out.getvalue())
+        self.assertEqual(self.reloptions('campaign_character'), [])
+
+
+class SimulateEncounterCommandTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=gm, name='Stonetop', code='1234', status='Open')
+        the_blessed = CharacterClass.objects.create(class_name='The Blessed')
+        background = Background.objects.create(character_class=the_blessed, background='INITIATE', description='...')
+        TheBlessed.objects.create(player=gm, campaign=cls.campaign, character_name='Aeda', background=background)
+        cls.wolf = NPCInstance.objects.create(
+            player=gm, campaign=cls.campaign, character_name='Wolf', max_hp=6, damage='D6', instinct='...',
+        )
+
+    def test_prints_the_odds(self):
+        out = StringIO()
+
+        call_command(
+            'simulate_encounter', str(self.campaign.pk), str(self.wolf.pk), '--runs=600', '--seed=1', stdout=out,
+        )
+
+        self.assertIn('600 fights', out.getvalue())
+        self.assertIn('Win: ', out.getvalue())
+        self.assertIn('Aeda (character): loses ', out.getvalue())
+
+    def test_unknown_npcs(self):
+        with self.assertRaises(CommandError):
+            call_command('simulate_encounter', str(self.campaign.pk), '0', stdout=StringIO())
+
+
+class GenerateCharactersCommandTests(TestCase):
+    fixtures = ['campaign_data.json']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.player, name='Stonetop', code='1234', status='Open')
+
+    def test_creates_the_characters(self):
+        out = StringIO()
+
+        call_command(
+            'generate_characters', str(self.campaign.pk), 'player', '--count=30', '--seed=1', stdout=out,
+        )
+
+        self.assertIn('Created 30 characters', out.getvalue())
+        self.assertEqual(Character.objects.filter(campaign=self.campaign, player=self.player).count(), 30)
+
+    def test_one_playbook(self):
+        call_command(
+            'generate_characters', str(self.campaign.pk), 'player', '--playbook=The Judge', '--count=3',
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(set(Character.objects.values_list('character_class', flat=True)), {'The Judge'})
+
+    def test_unknown_player(self):
+        with self.assertRaises(CommandError):
+            call_command('generate_characters', str(self.campaign.pk), 'nobody', stdout=StringIO())
+
+
+class CompactEventsCommandTests(TestCase):
+
+    def test_nothing_to_compact(self):
+        out = StringIO()
+
+        call_command('compact_events', '--days=30', stdout=out)
+
+        self.assertIn('Compacted 0 events into 0 character snapshots.', out.getvalue())
@@ -0,0 +1,66 @@
+from django.test import TestCase
+
+from campaign import creation_rules
+from campaign.creation_rules import get_creation_rules, validate_character
+from campaign.models import Background, Moves, SpecialPossessions
+
+STATS = {'strength': 2, 'dexterity': 1, 'intelligence': 1, 'wisdom': 0, 'constitution': 0, 'charisma': -1}
+
+
+class CreationRulesTests(TestCase):
+    fixtures = ['campaign_data.json']
+
+    def setUp(self):
+        creation_rules.clear()
+
+    def move_ids(self, *names):
+        return [Moves.objects.filter(name=name).values_list('id', flat=True)[0] for name in names]
+
+    def background_id(self, playbook, name):
+        return Background.objects.get(character_class__class_name=playbook, background=name).pk
+
+    def test_valid_character_has_no_errors(self):
+        errors = validate_character(
+            'The Blessed', self.background_id('The Blessed', 'RAISED BY WOLVES'),
+            self.move_ids('SPIRIT TONGUE', 'CALL THE SPIRITS', 'TRACKLESS STEP'), [], STATS,
+        )
+
+        self.assertEqual(errors, [])
+
+    def test_every_broken_rule_is_reported(self):
+        errors = validate_character(
+            'The Blessed', self.background_id('The Blessed', 'RAISED BY WOLVES'),
+            self.move_ids('SPIRIT TONGUE'), [], dict(STATS, strength=3),
+        )
+
+        self.assertEqual(errors, [
+            'CALL THE SPIRITS is a required starting move.',
+            'TRACKLESS STEP move is required for RAISED BY WOLVES background.',
+            'Stats should have the following scores (they can be in any order): +2, +1, +1, 0, 0, -1. '
+            'Your stats are as follows: Strength: 3, Dexterity: 1, Intelligence: 1, Wisdom: 0, Constitution: 0, Charisma: -1.',
+        ])
+
+    def test_one_move_of_a_pair(self):
+        background = self.background_id('The Fox', 'A LIFE OF CRIME')
+
+        errors = validate_character('The Fox', background, self.move_ids('SKILL AT ARMS', 'PERCEPTIVE'), [], STATS)
+
+        self.assertEqual(errors, ['BURGLE or LIGHT FINGERS move is required with A LIFE OF CRIME background.'])
+
+    def test_possessions_are_not_matched_by_move_ids(self):
+        scribes_tools = SpecialPossessions.objects.filter(possession_name="Scribe's tools")[0]
+        moves = self.move_ids('CENSURE', 'CHRONICLER OF STONETOP')
+
+        errors = validate_character('The Judge', None, moves + [scribes_tools.pk], [], STATS)
+
+        self.assertEqual(errors, ["Scribe's tools is a required starting special possession."])
+        self.assertEqual(validate_character('The Judge', None, moves, [scribes_tools.pk], STATS), [])
+
+    def test_validating_does_not_query_the_database(self):
+        moves = self.move_ids('DANGEROUS', 'HARD TO KILL', 'ARMORED')
+        get_creation_rules()
+
+        with self.assertNumQueries(0):
+            errors = validate_character('The Heavy', None, moves, [], STATS)
+
+        self.assertEqual(errors, [])
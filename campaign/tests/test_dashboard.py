@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from campaign.dashboard import party_dashboard, load_name
+from campaign.models import (
+    Campaign, CharacterClass, Background, TheBlessed, TheFox,
+    InventoryItem, ItemInstance, SmallItem, SmallItemInstance,
+    Moves, MoveInstance, SpecialPossessions, SpecialPossessionInstance,
+    MajorArcanum, MajorArcanaInstance, NPCInstance, FollowerInstance,
+)
+
+User = get_user_model()
+
+
+class PartyDashboardTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        the_blessed = CharacterClass.objects.create(class_name='The Blessed')
+        the_fox = CharacterClass.objects.create(class_name='The Fox')
+        cls.blessed_background = Background.objects.create(
+            character_class=the_blessed, background='RAISED BY WOLVES', description='...',
+        )
+        cls.fox_background = Background.objects.create(
+            character_class=the_fox, background='A LIFE OF CRIME', description='...',
+        )
+        cls.aeda = TheBlessed.objects.create(
+            player=cls.player, campaign=cls.campaign, character_name='Aeda', background=cls.blessed_background,
+        )
+        TheBlessed.objects.filter(pk=cls.aeda.pk).update(current_hp=11, dazed=True, current_stock=2)
+        cls.bow = InventoryItem.objects.create(weight=2, name='Bow', has_ammo=True)
+        cls.rope = SmallItem.objects.create(name='Rope', total_uses=3)
+        cls.heal = Moves.objects.create(name='HEALING TOUCH', description='...', total_uses=3)
+        cls.cloak = SpecialPossessions.objects.create(possession_name='Cloak', total_uses=2)
+        cls.arcanum = MajorArcanum.objects.create(name='Crown', slug='crown', description1='...', weight=1)
+
+    def add_fox(self, name, outfitted=True):
+        fox = TheFox.objects.create(
+            player=self.player, campaign=self.campaign, character_name=name, background=self.fox_background,
+        )
+        ItemInstance.objects.create(item=self.bow, character=fox, outfitted=outfitted, ammo='low ammo')
+        SmallItemInstance.objects.create(small_item=self.rope, character=fox)
+        fox.move_instances.add(MoveInstance.objects.create(move=self.heal, uses=2))
+        SpecialPossessionInstance.objects.create(special_possession=self.cloak, character=fox, uses=1)
+        MajorArcanaInstance.objects.create(arcana=self.arcanum, character=fox, outfitted=outfitted)
+        npc = NPCInstance.objects.create(
+            player=self.player, campaign=self.campaign, character_name=f'{name} hound', max_hp=6, damage='D6',
+            instinct='...',
+        )
+        FollowerInstance.objects.create(npc_instance=npc, character=fox, campaign=self.campaign, cost='food')
+        return fox
+
+    def test_rows(self):
+        self.add_fox('Bram')
+
+        aeda, bram = party_dashboard(self.campaign.pk)
+
+        self.assertEqual((aeda['character_name'], aeda['current_hp'], aeda['max_hp']), ('Aeda', 11, 18))
+        self.assertEqual(aeda['debilities'], ['dazed'])
+        self.assertEqual((aeda['stock'], aeda['stock_max']), (2, 3))
+        self.assertEqual((aeda['load'], aeda['resources'], aeda['followers']), (0, [], []))
+        self.assertEqual((bram['load'], bram['load_name'], bram['capacity']), (3, 'Light', 9))
+        self.assertIsNone(bram['stock'])
+        self.assertEqual(bram['resources'], [
+            {'name': 'HEALING TOUCH', 'value': 2, 'maximum': 3, 'kind': 'uses'},
+            {'name': 'Rope', 'value': 3, 'maximum': 3, 'kind': 'uses'},
+            {'name': 'Cloak', 'value': 1, 'maximum': 2, 'kind': 'uses'},
+        ])
+        self.assertEqual(bram['ammo'], [{'name': 'Bow', 'ammo': 'low ammo'}])
+        self.assertEqual(bram['followers'], [{'name': 'Bram hound', 'current_hp': 6, 'max_hp': 6}])
+
+    def test_unequipped_items_have_no_weight(self):
+        self.add_fox('Bram', outfitted=False)
+
+        self.assertEqual(party_dashboard(self.campaign.pk)[1]['load'], 0)
+
+    def test_query_count_does_not_grow_with_the_party(self):
+        self.add_fox('Bram')
+        with self.assertNumQueries(6):
+            party_dashboard(self.campaign.pk)
+
+        for name in ['Cedric', 'Dunstan', 'Edda', 'Freya']:
+            self.add_fox(name)
+        with self.assertNumQueries(6):
+            self.assertEqual(len(party_dashboard(self.campaign.pk)), 6)
+
+    def test_load_names(self):
+        self.assertEqual([load_name(weight) for weight in (0, 3, 4, 7, 9, 10)], [
+            'Light', 'Light', 'Normal', 'Heavy', 'Heavy', 'Overloaded',
+        ])
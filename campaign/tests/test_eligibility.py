@@ -0,0 +1,140 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from campaign import eligibility
+from campaign.forms import UpdateCharacterMovesForm
+from campaign.models import (
+    Campaign, CharacterClass, Background, TheBlessed,
+    Moves, MoveInstance, MoveRequirements, StatRequirement,
+)
+
+User = get_user_model()
+
+
+class MoveEligibilityTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        campaign = Campaign.objects.create(gm=player, name='Stonetop', code='1234', status='Open')
+        cls.the_blessed = CharacterClass.objects.create(class_name='The Blessed')
+        cls.the_fox = CharacterClass.objects.create(class_name='The Fox')
+        background = Background.objects.create(character_class=cls.the_blessed, background='INITIATE', description='...')
+        cls.character = TheBlessed.objects.create(
+            player=player, campaign=campaign, character_name='Aeda', background=background,
+        )
+
+    def setUp(self):
+        eligibility.clear()
+        self.character.level = 1
+        self.character.strength = 0
+
+    def move(self, name, playbook=None, limit=1, **requirements):
+        # The rules change once committed, which tests never do
+        with self.captureOnCommitCallbacks(execute=True):
+            if requirements:
+                requirements = MoveRequirements.objects.create(**requirements)
+            move = Moves.objects.create(
+                name=name, description='...', take_move_limit=limit, move_requirements=requirements or None,
+            )
+            move.character_class.add(playbook or self.the_blessed)
+        return move
+
+    def take(self, *moves):
+        for move in moves:
+            self.character.move_instances.add(MoveInstance.objects.create(move=move))
+
+    def eligible(self):
+        owned = self.character.move_instances.values_list('move_id', flat=True)
+        return set(Moves.objects.filter(
+            id__in=eligibility.eligible_move_ids(self.character, owned)
+        ).values_list('name', flat=True))
+
+    def test_moves_of_the_playbook_are_eligible(self):
+        self.move('SPIRIT TONGUE')
+        self.move('TRACKLESS STEP', playbook=self.the_fox)
+
+        self.assertEqual(self.eligible(), {'SPIRIT TONGUE'})
+
+    def test_taken_moves_are_left_out_up_to_their_limit(self):
+        spirit_tongue = self.move('SPIRIT TONGUE')
+        wild_soul = self.move('WILD SOUL', limit=2)
+        self.take(spirit_tongue, wild_soul)
+
+        self.assertEqual(self.eligible(), {'WILD SOUL'})
+
+        self.take(wild_soul)
+        self.assertEqual(self.eligible(), set())
+
+    def test_level_requirement(self):
+        self.move('WILD SOUL', level_restricted=2)
+
+        self.assertEqual(self.eligible(), set())
+        self.character.level = 2
+        self.assertEqual(self.eligible(), {'WILD SOUL'})
+
+    def test_stat_requirement(self):
+        self.move('MIGHTY', stat_restricted=StatRequirement.objects.create(stat='Strength', value=2))
+
+        self.character.strength = 1
+        self.assertEqual(self.eligible(), set())
+        self.character.strength = 2
+        self.assertEqual(self.eligible(), {'MIGHTY'})
+
+    def test_prerequisite_move(self):
+        wild_speech = self.move('WILD SPEECH')
+        self.move('ALPHA', move_restricted=wild_speech)
+
+        self.assertEqual(self.eligible(), {'WILD SPEECH'})
+        self.take(wild_speech)
+        self.assertEqual(self.eligible(), {'ALPHA'})
+
+    def test_prerequisites_come_first(self):
+        wild_speech = self.move('WILD SPEECH')
+        alpha = self.move('ALPHA', move_restricted=wild_speech)
+
+        graph = eligibility.get_move_graph()
+
+        self.assertEqual(graph.playbooks['The Blessed'], [wild_speech.pk, alpha.pk])
+
+    def test_moves_that_require_each_other_are_left_out(self):
+        first = self.move('FIRST')
+        second = self.move('SECOND', move_restricted=first)
+        first.move_requirements = MoveRequirements.objects.create(move_restricted=second)
+        first.save()
+
+        with self.assertLogs('campaign.eligibility', 'WARNING'):
+            self.assertEqual(eligibility.get_move_graph().playbooks['The Blessed'], [])
+
+    def test_playbook_access_opens_another_playbook(self):
+        dabbler = self.move('DABBLER')
+        dabbler.playbook_access.add(self.the_fox)
+        self.move('TRACKLESS STEP', playbook=self.the_fox)
+        self.move('ALONE IN THE WILDS', playbook=self.the_fox, restricted_by_character='The Fox')
+
+        self.assertEqual(self.eligible(), {'DABBLER'})
+        self.take(dabbler)
+        self.assertEqual(self.eligible(), {'TRACKLESS STEP'})
+
+    def test_graph_is_compiled_once_per_catalog_version(self):
+        self.move('SPIRIT TONGUE')
+        graph = eligibility.get_move_graph()
+
+        self.assertIs(eligibility.get_move_graph(), graph)
+
+        self.move('WILD SOUL')
+        self.assertIsNot(eligibility.get_move_graph(), graph)
+        self.assertEqual(self.eligible(), {'SPIRIT TONGUE', 'WILD SOUL'})
+
+    def test_update_moves_form_offers_the_eligible_moves(self):
+        spirit_tongue = self.move('SPIRIT TONGUE')
+        self.move('WILD SOUL', level_restricted=2)
+        self.move('CALL THE SPIRITS')
+        self.take(spirit_tongue)
+
+        form = UpdateCharacterMovesForm(instance=self.character)
+
+        self.assertEqual(
+            list(form.fields['move_instances'].queryset.values_list('name', flat=True)),
+            ['CALL THE SPIRITS'],
+        )
@@ -0,0 +1,134 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from campaign import encounters
+from campaign.encounters import Combatant, Encounter, load_encounter, simulate
+from campaign.models import (
+    Campaign, CharacterClass, Background, TheBlessed, NPCInstance, FollowerInstance,
+    AnimalCompanion, AnimalCompanionType, Armor, Damage,
+)
+from campaign.odds import NORMAL, DISADVANTAGE
+
+User = get_user_model()
+
+
+def combatant(name, hp, armor=0, damage=6, stat=0, kind='character'):
+    return Combatant(name, kind, hp, armor, damage, stat, NORMAL)
+
+
+class SimulationTests(SimpleTestCase):
+
+    def setUp(self):
+        self.encounter = Encounter(
+            [combatant('Aeda', 18, armor=1, damage=8, stat=2), combatant('Bram', 16, damage=6, stat=1)],
+            [combatant('Wolf', 6, damage=6, kind='npc'), combatant('Wolf', 6, damage=6, kind='npc')],
+        )
+
+    def test_same_seed_same_results(self):
+        first = simulate(self.encounter, 1200, seed=7).as_json()
+
+        self.assertEqual(simulate(self.encounter, 1200, seed=7).as_json(), first)
+        self.assertEqual(first['runs'], 1200)
+        self.assertAlmostEqual(first['win_rate'] + first['wipe_rate'] + first['draw_rate'], 1)
+
+    def test_process_pool_gives_the_same_results(self):
+        runs = encounters.POOL_THRESHOLD + 1
+
+        self.assertEqual(
+            simulate(self.encounter, runs, seed=3, workers=2).as_json(),
+            simulate(self.encounter, runs, seed=3).as_json(),
+        )
+
+    def test_hp_loss_per_party_member(self):
+        result = simulate(self.encounter, 1000, seed=1).as_json()
+
+        self.assertEqual([member['name'] for member in result['hp_loss']], ['Aeda', 'Bram'])
+        for member in result['hp_loss']:
+            self.assertTrue(0 < member['expected'] < member['hp'])
+
+    def test_armor_that_stops_every_blow(self):
+        encounter = Encounter([combatant('Aeda', 18, armor=6)], [combatant('Wolf', 4, damage=6, kind='npc')])
+
+        result = simulate(encounter, 200, seed=1).as_json()
+
+        self.assertEqual(result['win_rate'], 1)
+        self.assertEqual(result['hp_loss'][0]['expected'], 0)
+        self.assertGreaterEqual(result['rounds']['min'], 1)
+
+    def test_overwhelming_enemies_wipe_the_party(self):
+        encounter = Encounter([combatant('Aeda', 4, stat=-1)], [combatant('Dragon', 40, armor=6, damage=20, kind='npc')])
+
+        result = simulate(encounter, 200, seed=1).as_json()
+
+        self.assertEqual(result['wipe_rate'], 1)
+        self.assertEqual(result['hp_loss'][0]['expected'], 4)
+
+    def test_time_budget_stops_early(self):
+        result = simulate(self.encounter, 5000, seed=1, time_budget=0).as_json()
+
+        self.assertTrue(result['truncated'])
+        self.assertEqual(result['runs'], 0)
+
+    def test_time_budget_stops_waiting_for_the_process_pool(self):
+        start = time.monotonic()
+
+        result = simulate(self.encounter, 200000, seed=1, workers=2, time_budget=0.2).as_json()
+
+        self.assertTrue(result['truncated'])
+        self.assertLess(result['runs'], 200000)
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_default_runs_fit_the_time_budget(self):
+        party = [combatant(name, 16, armor=1, stat=1) for name in ('Aeda', 'Bram', 'Cwen', 'Dunn')]
+        encounter = Encounter(party, [combatant('Wolf', 6, damage=6, kind='npc')] * 12)
+
+        result = simulate(
+            encounter, settings.ENCOUNTER_DEFAULT_RUNS, seed=1, time_budget=settings.ENCOUNTER_TIME_BUDGET,
+        ).as_json()
+
+        self.assertFalse(result['truncated'])
+        self.assertEqual(result['runs'], settings.ENCOUNTER_DEFAULT_RUNS)
+
+
+class LoadEncounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        the_blessed = CharacterClass.objects.create(class_name='The Blessed')
+        background = Background.objects.create(character_class=the_blessed, background='INITIATE', description='...')
+        cls.character = TheBlessed.objects.create(
+            player=cls.gm, campaign=cls.campaign, character_name='Aeda', background=background,
+            armor=1, strength=1, dexterity=2, weakened=True,
+        )
+        # The playbook's HP and damage are set when it is created
+        TheBlessed.objects.filter(pk=cls.character.pk).update(current_hp=12, damage_die='D8')
+        npc = {'player': cls.gm, 'campaign': cls.campaign, 'instinct': '...'}
+        follower = NPCInstance.objects.create(character_name='Lida', max_hp=6, damage='D4', **npc)
+        FollowerInstance.objects.create(npc_instance=follower, character=cls.character, campaign=cls.campaign)
+        animal_type = AnimalCompanionType.objects.create(
+            animal_type='Hunter', animals_list='wolf', base_hp=8,
+            base_armor=Armor.objects.create(armor=1), base_damage=Damage.objects.create(damage_die='D6'),
+        )
+        AnimalCompanion.objects.create(name='Fang', character=cls.character, animal_type=animal_type)
+        cls.bandit = NPCInstance.objects.create(character_name='Bandit', max_hp=6, armor=1, damage='D6', **npc)
+        NPCInstance.objects.filter(pk=cls.bandit.pk).update(current_hp=3)
+
+    def test_party_and_enemies(self):
+        party, enemies = load_encounter(self.campaign.pk, [self.bandit.pk])
+
+        self.assertEqual(party, [
+            Combatant('Aeda', 'character', 12, 1, 8, 2, DISADVANTAGE),
+            Combatant('Lida', 'follower', 6, 0, 4, 0, NORMAL),
+            Combatant('Fang', 'companion', 8, 1, 6, 0, NORMAL),
+        ])
+        self.assertEqual(enemies, [Combatant('Bandit', 'npc', 3, 1, 6, 0, NORMAL)])
+
+    def test_only_some_characters(self):
+        party, enemies = load_encounter(self.campaign.pk, [self.bandit.pk], character_ids=[])
+
+        self.assertEqual(party, [])
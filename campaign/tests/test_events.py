@@ -0,0 +1,140 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TestCase
+from django.utils import timezone
+
+from campaign import events
+from campaign.combat import apply_round
+from campaign.counters import adjust
+from campaign.events import compact, event, export_events, record, replay
+from campaign.models import (
+    Campaign, CharacterClass, Background, TheFox, NPCInstance,
+    Moves, MoveInstance, InventoryItem, ItemInstance,
+    CampaignEvent, CharacterSnapshot,
+)
+
+User = get_user_model()
+
+
+class EventLogTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        background = Background.objects.create(
+            character_class=CharacterClass.objects.create(class_name='The Fox'),
+            background='A LIFE OF CRIME', description='...',
+        )
+        cls.bram = TheFox.objects.create(
+            player=cls.player, campaign=cls.campaign, character_name='Bram', background=background,
+        )
+        cls.wolf = NPCInstance.objects.create(
+            player=cls.gm, campaign=cls.campaign, character_name='Wolf', max_hp=6, damage='D6', instinct='...',
+        )
+        cls.move = MoveInstance.objects.create(
+            move=Moves.objects.create(name='DEADLY', description='...', total_uses=3), uses=3,
+        )
+        cls.bram.move_instances.add(cls.move)
+        cls.bow = ItemInstance.objects.create(
+            item=InventoryItem.objects.create(name='Bow', weight=2, has_ammo=True), character=cls.bram,
+        )
+
+    def hp(self, value, delta=-1):
+        return event(self.campaign.pk, self.bram.pk, 'character', self.bram.pk, 'hp', delta, value, self.player)
+
+    def test_rounds_and_counters_are_logged(self):
+        apply_round(self.gm, self.campaign.pk, [
+            {'target_type': 'character', 'id': self.bram.pk, 'field': 'hp', 'delta': -3},
+            {'target_type': 'character', 'id': self.bram.pk, 'field': 'hp', 'delta': -1},
+            {'target_type': 'npc', 'id': self.wolf.pk, 'field': 'hp', 'delta': -2},
+            {'target_type': 'item', 'id': self.bow.pk, 'field': 'ammo', 'delta': -1},
+        ])
+        adjust('move-uses', self.player, self.campaign.pk, self.bram.pk, -1, pk=self.move.pk)
+
+        self.assertEqual(list(CampaignEvent.objects.order_by('id').values_list(
+            'character_id', 'target_id', 'delta', 'value', 'user_id',
+        )), [
+            (self.bram.pk, self.bram.pk, -4, 12, self.gm.pk),
+            (None, self.wolf.pk, -2, 4, self.gm.pk),
+            (self.bram.pk, self.bow.pk, -1, 1, self.gm.pk),
+            (self.bram.pk, self.move.pk, -1, 2, self.player.pk),
+        ])
+
+    def test_a_buffer_is_one_insert(self):
+        # The insert and its savepoint
+        with self.assertNumQueries(3):
+            with events.buffered():
+                record([self.hp(15)])
+                record([self.hp(14), self.hp(13)])
+
+        self.assertEqual(CampaignEvent.objects.count(), 3)
+
+    def test_events_that_do_not_fit_are_left_out(self):
+        with self.assertLogs('campaign.events', 'ERROR'):
+            record([self.hp(15), self.hp(15, delta=3_000_000_000)])
+
+        self.assertEqual(list(CampaignEvent.objects.values_list('delta', flat=True)), [-1])
+
+    def test_a_failed_write_does_not_fail_the_request(self):
+        with mock.patch.object(CampaignEvent.objects, 'bulk_create', side_effect=DatabaseError('disk full')):
+            with self.assertLogs('campaign.events', 'ERROR'):
+                with events.buffered():
+                    adjust('move-uses', self.player, self.campaign.pk, self.bram.pk, -1, pk=self.move.pk)
+
+        self.assertEqual(MoveInstance.objects.get(pk=self.move.pk).uses, 2)
+        self.assertEqual(CampaignEvent.objects.count(), 0)
+
+    def test_a_failed_write_is_rolled_back_on_its_own(self):
+        with self.assertLogs('campaign.events', 'ERROR'):
+            events.write([self.hp(15), self.hp(15, delta=3_000_000_000)])
+
+        self.assertEqual(CampaignEvent.objects.count(), 0)
+
+    def test_replay(self):
+        record([self.hp(15), self.hp(12, delta=-3)])
+        apply_round(self.gm, self.campaign.pk, [
+            {'target_type': 'item', 'id': self.bow.pk, 'field': 'ammo', 'delta': -2},
+            {'target_type': 'move', 'id': self.move.pk, 'field': 'uses', 'delta': -1},
+        ])
+
+        self.assertEqual(replay(self.bram.pk), {
+            'character': {str(self.bram.pk): {'hp': 12}},
+            'item': {str(self.bow.pk): {'ammo': 'low ammo'}},
+            'move': {str(self.move.pk): {'uses': 2}},
+        })
+
+    def test_compaction_keeps_the_state(self):
+        record([self.hp(15), self.hp(14)])
+        CampaignEvent.objects.update(created=timezone.now() - timedelta(days=100))
+        record([self.hp(13)])
+        before = replay(self.bram.pk)
+
+        self.assertEqual(compact(timezone.now() - timedelta(days=90)), (2, 1))
+
+        self.assertEqual(CampaignEvent.objects.count(), 1)
+        self.assertEqual(CharacterSnapshot.objects.get().state, {'character': {str(self.bram.pk): {'hp': 14}}})
+        with self.assertNumQueries(2):
+            self.assertEqual(replay(self.bram.pk), before)
+
+        # A second compaction carries on from the snapshot
+        CampaignEvent.objects.update(created=timezone.now() - timedelta(days=100))
+        self.assertEqual(compact(timezone.now() - timedelta(days=90)), (1, 1))
+        self.assertEqual(replay(self.bram.pk), before)
+        self.assertEqual(compact(timezone.now() - timedelta(days=90)), (0, 0))
+
+    def test_export(self):
+        record([self.hp(15)])
+
+        lines = [json.loads(line) for line in export_events(self.campaign.pk)]
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(
+            {key: lines[0][key] for key in ('character', 'target_type', 'field', 'delta', 'value')},
+            {'character': self.bram.pk, 'target_type': 'character', 'field': 'hp', 'delta': -1, 'value': 15},
+        )
@@ -1,12 +1,15 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
 from unittest import skip
 
 from campaign.forms import (
-    CreateCharacterForm,  CreateTheBlessedForm
+    CreateCharacterForm,  CreateTheBlessedForm,
+    UpdateCharacterInventoryForm,
 )
 from campaign.models import (
-    CharacterClass,
+    CharacterClass, Campaign, Character,
+    InventoryItem, ItemInstance, SmallItem,
     Background, Instinct, AppearanceAttribute, 
     PlaceOfOrigin, SpecialPossessions, Moves,
     RemarkableTraits, DanuOfferings
@@ -161,3 +164,43 @@ class CreateTheBlessedTest(BaseFormsTestClass):
         form_data = self.generate_create_character_form_data(character_class=self.the_blessed,background=1, moves=moves_qs, kwargs=blessed_kwargs)
         form = CreateTheBlessedForm(self.the_blessed, data=form_data)
         self.assertTrue(form.is_valid())
+
+
+class UpdateCharacterInventoryFormTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username='inventory', email='inventory@example.com', password='password')
+        campaign = Campaign.objects.create(gm=user, name='Inventory campaign', code='inventory', status='Open')
+        cls.character = Character.objects.create(
+            player=user, campaign=campaign, character_name='Carrier', character_class='The Heavy',
+        )
+        other = Character.objects.create(player=user, campaign=campaign, character_name='Other')
+
+        cls.default_item = InventoryItem.objects.create(name='Rope', weight=1, default_item=True)
+        cls.carried_item = InventoryItem.objects.create(name='Torch', weight=1, default_item=True)
+        ItemInstance.objects.create(item=cls.carried_item, character=cls.character)
+        cls.shared_item = InventoryItem.objects.create(name='Map', weight=0)
+        cls.shared_item.can_view.add(cls.character, other)
+        cls.default_shared_item = InventoryItem.objects.create(name='Lantern', weight=1, default_item=True)
+        cls.default_shared_item.can_view.add(cls.character)
+        # Creating an item gives its creator an instance, so take it away again
+        cls.created_item = InventoryItem.objects.create(name='Trophy', weight=1, created_by=cls.character)
+        cls.created_item.iteminstance_set.all().delete()
+        cls.others_item = InventoryItem.objects.create(name='Secret', weight=1, created_by=other)
+
+        SmallItem.objects.create(name='Chalk', default_item=True)
+
+    def test_items_are_visible_and_not_carried(self):
+        form = UpdateCharacterInventoryForm(instance=self.character)
+
+        items = list(form.fields['items'].queryset)
+
+        self.assertCountEqual(items, [
+            self.default_item, self.shared_item, self.default_shared_item, self.created_item,
+        ])
+
+    def test_small_items_are_visible(self):
+        form = UpdateCharacterInventoryForm(instance=self.character)
+
+        self.assertEqual([item.name for item in form.fields['small_items'].queryset], ['Chalk'])
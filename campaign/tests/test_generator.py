@@ -0,0 +1,83 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from campaign import forms, generator
+from campaign.generator import as_form_data, create_characters, plan_character
+from campaign.models import (
+    Campaign, Character, TheHeavy, TheBlessed, MajorArcanaInstance, character_classes_dict,
+)
+
+User = get_user_model()
+
+CREATE_FORMS = {
+    'The Blessed': forms.CreateTheBlessedForm,
+    'The Fox': forms.CreateTheFoxForm,
+    'The Heavy': forms.CreateTheHeavyForm,
+    'The Judge': forms.CreateTheJudgeForm,
+    'The Lightbearer': forms.CreateTheLightbearerForm,
+    'The Marshal': forms.CreateTheMarshalForm,
+    'The Ranger': forms.CreateTheRangerForm,
+    'The Seeker': forms.CreateTheSeekerForm,
+    'The Would-Be Hero': forms.CreateTheWouldBeHeroForm,
+}
+
+
+class CharacterGeneratorTests(TestCase):
+    fixtures = ['campaign_data.json']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.player, name='Stonetop', code='1234', status='Open')
+
+    def setUp(self):
+        generator.clear()
+
+    def test_plans_pass_the_create_forms(self):
+        rng = random.Random(1)
+        for playbook in character_classes_dict:
+            for _ in range(5):
+                plan = plan_character(playbook, rng)
+                form = CREATE_FORMS[playbook](character_class=playbook, data=as_form_data(plan))
+
+                self.assertTrue(form.is_valid(), (playbook, form.errors))
+
+    def test_planning_does_not_query_the_database(self):
+        generator.get_generator()
+
+        with self.assertNumQueries(0):
+            plan_character('The Judge', random.Random(2))
+
+    def test_characters_are_made_like_the_create_views(self):
+        plan = plan_character('The Heavy', random.Random(3), character_name='Bram')
+
+        character = create_characters([plan], self.campaign, self.player)[0]
+
+        heavy = TheHeavy.objects.get(pk=character.pk)
+        self.assertEqual((heavy.character_name, heavy.character_class), ('Bram', 'The Heavy'))
+        self.assertEqual((heavy.damage_die, heavy.max_hp, heavy.current_hp), ('D10', 20, 20))
+        self.assertEqual(heavy.background_instance.background_id, plan.values['background_id'])
+        self.assertEqual(
+            sorted(heavy.move_instances.values_list('move_id', flat=True)), sorted(plan.move_ids),
+        )
+        self.assertEqual(heavy.stories_of_glory.count(), 2)
+        self.assertEqual(
+            MajorArcanaInstance.objects.filter(character=heavy).exists(),
+            heavy.background.slug == generator.STORM_MARKED,
+        )
+
+    def test_a_batch_takes_a_fixed_number_of_queries(self):
+        rng = random.Random(4)
+        generator.get_generator()
+        small = [plan_character('The Blessed', rng) for _ in range(2)]
+        large = [plan_character('The Blessed', rng) for _ in range(20)]
+
+        with self.assertNumQueries(12):
+            create_characters(small, self.campaign, self.player)
+        with self.assertNumQueries(12):
+            create_characters(large, self.campaign, self.player)
+
+        self.assertEqual(TheBlessed.objects.count(), 22)
+        self.assertEqual(Character.objects.filter(background_instance__isnull=True).count(), 0)
@@ -0,0 +1,266 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from campaign.models import (
+    CharacterClass, AppearanceAttribute,
+    HistoryOfViolence, TheChronical, FearAndAnger,
+    Moves, Tags, MajorArcanum,
+    Campaign, Character, NPCInstance, FollowerInstance,
+    Armor, Damage, AnimalCompanionType, AnimalCompanion,
+    InventoryItem, SmallItem, ItemInstance, SmallItemInstance,
+)
+
+
+class CatalogLookupIndexTests(TestCase):
+    """
+    Fills the catalog tables to a realistic size and checks with EXPLAIN
+    that the lookups used by the forms and autocomplete views use an index.
+    """
+    rows = 5000
+    groups = 50
+
+    @classmethod
+    def setUpTestData(cls):
+        CharacterClass.objects.bulk_create([
+            CharacterClass(class_name=f'Class {i}') for i in range(cls.groups)
+        ])
+        classes = list(CharacterClass.objects.all())
+
+        Tags.objects.bulk_create([Tags(name=f'tag {i:05d}', slug=f'tag-{i:05d}') for i in range(cls.rows)])
+        HistoryOfViolence.objects.bulk_create([
+            HistoryOfViolence(history_theme=f'theme {i % cls.groups}', history_description=f'History {i}')
+            for i in range(cls.rows)
+        ])
+        TheChronical.objects.bulk_create([
+            TheChronical(attribute_type=f'type {i % cls.groups}', chronical_description=f'Chronical {i}')
+            for i in range(cls.rows)
+        ])
+        FearAndAnger.objects.bulk_create([
+            FearAndAnger(attribute_type=f'type {i % cls.groups}', description=f'Fear {i}')
+            for i in range(cls.rows)
+        ])
+        MajorArcanum.objects.bulk_create([
+            MajorArcanum(name=f'Arcanum {i}', slug=f'arcanum-{i}', description1='...', weight=1)
+            for i in range(cls.rows)
+        ])
+
+        moves = Moves.objects.bulk_create([
+            Moves(name=f'MOVE {i}', description='...') for i in range(cls.rows)
+        ])
+        Moves.character_class.through.objects.bulk_create([
+            Moves.character_class.through(moves_id=move.pk, characterclass_id=classes[i % cls.groups].pk)
+            for i, move in enumerate(moves)
+        ])
+        attributes = AppearanceAttribute.objects.bulk_create([
+            AppearanceAttribute(attribute_type=f'appearance{i // cls.groups % cls.groups}', description=f'Attribute {i}')
+            for i in range(cls.rows)
+        ])
+        AppearanceAttribute.character_class.through.objects.bulk_create([
+            AppearanceAttribute.character_class.through(
+                appearanceattribute_id=attribute.pk, characterclass_id=classes[i % cls.groups].pk
+            )
+            for i, attribute in enumerate(attributes)
+        ])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, msg=plan)
+
+    def assertNoSeqScan(self, queryset, *tables):
+        plan = queryset.explain()
+        self.assertIn('Index', plan, msg=plan)
+        for table in tables:
+            self.assertNotIn(f'Seq Scan on {table} ', plan, msg=plan)
+
+    def test_tags_name_istartswith_uses_index(self):
+        self.assertUsesIndex(
+            Tags.objects.filter(name__istartswith='TAG 0001'),
+            'tags_upper_name_prefix_idx',
+        )
+
+    def test_history_of_violence_theme_iexact_uses_index(self):
+        self.assertUsesIndex(
+            HistoryOfViolence.objects.filter(history_theme__iexact='THEME 7'),
+            'history_upper_theme_idx',
+        )
+
+    def test_chronical_attribute_type_iexact_uses_index(self):
+        self.assertUsesIndex(
+            TheChronical.objects.filter(attribute_type__iexact='TYPE 7'),
+            'chronical_upper_type_idx',
+        )
+
+    def test_fear_and_anger_attribute_type_uses_index(self):
+        self.assertUsesIndex(
+            FearAndAnger.objects.filter(attribute_type='type 7'),
+            'fearandanger_type_idx',
+        )
+
+    def test_major_arcanum_name_uses_index(self):
+        self.assertUsesIndex(
+            MajorArcanum.objects.filter(name='Arcanum 42'),
+            'majorarcanum_name_idx',
+        )
+
+    def test_moves_name_in_for_character_class_uses_index(self):
+        self.assertUsesIndex(
+            Moves.objects.filter(
+                character_class__class_name='Class 3',
+                name__in=['MOVE 3', 'MOVE 53', 'MOVE 103'],
+            ),
+            'moves_name_idx',
+        )
+
+    def test_appearance_attribute_by_class_and_type_uses_index(self):
+        self.assertNoSeqScan(
+            AppearanceAttribute.objects.filter(
+                character_class__class_name='Class 3',
+                attribute_type='appearance3',
+            ),
+            'campaign_appearanceattribute',
+            'campaign_appearanceattribute_character_class',
+        )
+
+
+class InstanceTableIndexTests(TestCase):
+    """
+    Fills the player owned instance tables and checks with EXPLAIN
+    that the per character and per campaign lookups use an index.
+    """
+    campaigns = 20
+    characters = 400
+    rows = 8000
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username='indexes', email='indexes@example.com', password='password')
+        Campaign.objects.bulk_create([
+            Campaign(gm=user, name=f'Campaign {i}', code=f'{i}', status='Open') for i in range(cls.campaigns)
+        ])
+        campaigns = list(Campaign.objects.all())
+        characters = Character.objects.bulk_create([
+            Character(player=user, campaign=campaigns[i % cls.campaigns], character_name=f'Character {i}')
+            for i in range(cls.characters)
+        ])
+        npcs = NPCInstance.objects.bulk_create([
+            NPCInstance(
+                player=user, campaign=campaigns[i % cls.campaigns], character_name=f'npc {i:05d}',
+                max_hp=6, damage='d6', instinct='To protect',
+            )
+            for i in range(cls.rows)
+        ])
+        followers = FollowerInstance.objects.bulk_create([
+            FollowerInstance(npc_instance=npc, character=characters[i % cls.characters], campaign=npc.campaign)
+            for i, npc in enumerate(npcs[:cls.rows // 2])
+        ])
+
+        items = InventoryItem.objects.bulk_create([
+            InventoryItem(name=f'Item {i}', weight=1, default_item=i % 10 == 0) for i in range(cls.rows)
+        ])
+        InventoryItem.can_view.through.objects.bulk_create([
+            InventoryItem.can_view.through(inventoryitem_id=item.pk, character_id=characters[i % cls.characters].pk)
+            for i, item in enumerate(items)
+        ])
+        small_items = SmallItem.objects.bulk_create([
+            SmallItem(name=f'Small item {i}', default_item=i % 10 == 0) for i in range(cls.rows)
+        ])
+        # Most instances belong to a character, a few to a follower
+        ItemInstance.objects.bulk_create([
+            ItemInstance(
+                item=items[i],
+                character=None if i % 20 == 0 else characters[i % cls.characters],
+                follower=followers[i % len(followers)] if i % 20 == 0 else None,
+                outfitted=i % 4 == 0,
+            )
+            for i in range(cls.rows)
+        ])
+        SmallItemInstance.objects.bulk_create([
+            SmallItemInstance(
+                small_item=small_items[i],
+                character=None if i % 20 == 0 else characters[i % cls.characters],
+                follower=followers[i % len(followers)] if i % 20 == 0 else None,
+                outfitted=i % 4 == 0,
+            )
+            for i in range(cls.rows)
+        ])
+
+        animal_type = AnimalCompanionType.objects.create(
+            animal_type='Hound', animals_list='dog', base_hp=6,
+            base_armor=Armor.objects.create(armor=0), base_damage=Damage.objects.create(damage_die='d6'),
+        )
+        AnimalCompanion.objects.bulk_create([
+            AnimalCompanion(
+                name=f'Animal {i}', character=characters[i % cls.characters], animal_type=animal_type,
+                instinct='To hunt', cost='Food',
+            )
+            for i in range(cls.rows)
+        ])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        cls.character = characters[7]
+        cls.follower = ItemInstance.objects.filter(follower__isnull=False)[0].follower
+        cls.campaign = campaigns[3]
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, msg=plan)
+
+    def test_character_outfitted_items_use_index(self):
+        self.assertUsesIndex(
+            ItemInstance.objects.filter(character=self.character, outfitted=True),
+            'iteminst_char_outfit_idx',
+        )
+
+    def test_character_outfitted_small_items_use_index(self):
+        self.assertUsesIndex(
+            SmallItemInstance.objects.filter(character=self.character, outfitted=False),
+            'smallinst_char_outfit_idx',
+        )
+
+    def test_follower_outfitted_items_use_partial_index(self):
+        self.assertUsesIndex(
+            ItemInstance.objects.filter(follower=self.follower, outfitted=True),
+            'iteminst_follower_outfit_idx',
+        )
+
+    def test_follower_outfitted_small_items_use_partial_index(self):
+        self.assertUsesIndex(
+            SmallItemInstance.objects.filter(follower=self.follower, outfitted=True),
+            'smallinst_follower_outfit_idx',
+        )
+
+    def test_newest_animal_companion_uses_index(self):
+        self.assertUsesIndex(
+            AnimalCompanion.objects.filter(character=self.character).order_by('-id')[:1],
+            'animal_char_newest_idx',
+        )
+
+    def test_campaign_npc_name_istartswith_uses_index(self):
+        self.assertUsesIndex(
+            NPCInstance.objects.filter(campaign=self.campaign, character_name__istartswith='NPC 0010'),
+            'npcinstance_campaign_name_idx',
+        )
+
+    def test_default_items_by_name_use_partial_index(self):
+        self.assertUsesIndex(
+            InventoryItem.objects.filter(default_item=True, name='Item 40'),
+            'item_default_name_idx',
+        )
+        self.assertUsesIndex(
+            SmallItem.objects.filter(default_item=True, name='Small item 40'),
+            'smallitem_default_name_idx',
+        )
+
+    def test_visible_items_use_indexes(self):
+        plan = InventoryItem.objects.visible_to(self.character).explain()
+
+        self.assertIn('item_can_view_char_item_idx', plan, msg=plan)
+        self.assertIn('campaign_inventoryitem_created_by_id', plan, msg=plan)
+        self.assertNotIn('Seq Scan on campaign_inventoryitem_can_view', plan, msg=plan)
+        self.assertNotIn('Unique', plan, msg=plan)
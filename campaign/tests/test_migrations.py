@@ -0,0 +1,64 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MigrationTestCase(TransactionTestCase):
+    """
+    Migrates campaign back to migrate_from, lets setUpBeforeMigration add rows
+    with the models of then and migrates forward to migrate_to.
+    """
+    migrate_from = None
+    migrate_to = None
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        self.latest = executor.loader.graph.leaf_nodes('campaign')
+        executor.migrate([('campaign', self.migrate_from)])
+        executor.loader.build_graph()
+        self.setUpBeforeMigration(executor.loader.project_state([('campaign', self.migrate_from)]).apps)
+        executor.migrate([('campaign', self.migrate_to)])
+        self.apps = executor.loader.project_state([('campaign', self.migrate_to)]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.latest)
+
+    def setUpBeforeMigration(self, apps):
+        pass
+
+
+class RulesSlugsMigrationTests(MigrationTestCase):
+    migrate_from = '0019_item_visibility_indexes'
+    migrate_to = '0020_rules_slugs'
+
+    def setUpBeforeMigration(self, apps):
+        Tags = apps.get_model('campaign', 'Tags')
+        CharacterClass = apps.get_model('campaign', 'CharacterClass')
+        Background = apps.get_model('campaign', 'Background')
+        MajorArcanum = apps.get_model('campaign', 'MajorArcanum')
+        self.tags = [Tags.objects.create(name=name).pk for name in ('Tiny X', 'tiny x', 'Tiny-X!', '???', '!!!')]
+        fox, blessed = (
+            CharacterClass.objects.create(class_name=name, complexity='Simple', description='...')
+            for name in ('The Fox', 'The Blessed')
+        )
+        self.backgrounds = [
+            Background.objects.create(character_class=character_class, background=name, description='...').pk
+            for character_class, name in ((fox, 'Outsider'), (fox, 'OUTSIDER'), (blessed, 'Outsider'))
+        ]
+        self.arcana = [
+            MajorArcanum.objects.create(name=name, description1='...', weight=1).pk
+            for name in ('The Mindgem', 'The mindgem')
+        ]
+
+    def slugs(self, model_name, pks):
+        model = self.apps.get_model('campaign', model_name)
+        slugs = dict(model.objects.values_list('pk', 'slug'))
+        return [slugs[pk] for pk in pks]
+
+    def test_colliding_names_get_their_own_slugs(self):
+        self.assertEqual(self.slugs('Tags', self.tags), ['tiny-x', 'tiny-x-2', 'tiny-x-3', 'tags', 'tags-2'])
+        self.assertEqual(self.slugs('MajorArcanum', self.arcana), ['the-mindgem', 'the-mindgem-2'])
+
+    def test_background_slugs_are_unique_per_class(self):
+        self.assertEqual(self.slugs('Background', self.backgrounds), ['outsider', 'outsider-2', 'outsider'])
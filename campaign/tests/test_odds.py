@@ -0,0 +1,57 @@
+from django.test import SimpleTestCase
+
+from campaign.odds import (
+    ADVANTAGE, DISADVANTAGE, NORMAL, DICE,
+    get_odds, stat_odds,
+)
+
+CHARACTER = {
+    'strength': 2, 'dexterity': 1, 'intelligence': 1, 'wisdom': 0, 'constitution': 0, 'charisma': -1,
+    'weakened': False, 'dazed': False, 'miserable': False,
+}
+
+
+class OddsTests(SimpleTestCase):
+
+    def test_dice_distributions(self):
+        self.assertEqual(DICE[NORMAL], [1, 2, 3, 4, 5, 6, 5, 4, 3, 2, 1])
+        self.assertEqual(sum(DICE[ADVANTAGE]), 216)
+        self.assertEqual(DICE[ADVANTAGE], DICE[DISADVANTAGE][::-1])
+
+    def test_exact_results(self):
+        odds = get_odds(0)
+
+        self.assertAlmostEqual(odds.hit, 6 / 36)
+        self.assertAlmostEqual(odds.partial, 15 / 36)
+        self.assertAlmostEqual(odds.miss, 15 / 36)
+
+    def test_advantage_keeps_the_best_two_dice(self):
+        # 34 + 27 + 16 of the 216 rolls keep 10, 11 or 12
+        self.assertAlmostEqual(get_odds(0, ADVANTAGE).hit, 77 / 216)
+        self.assertGreater(get_odds(1, ADVANTAGE).hit, get_odds(1).hit)
+        self.assertLess(get_odds(1, DISADVANTAGE).hit, get_odds(1).hit)
+
+    def test_large_modifiers_always_hit_or_miss(self):
+        self.assertEqual(get_odds(20).hit, 1)
+        self.assertEqual(get_odds(-20).miss, 1)
+        self.assertEqual(get_odds(20).modifier, 20)
+
+    def test_every_stat_at_once(self):
+        odds = stat_odds(CHARACTER, modifier=1)
+
+        self.assertEqual(list(odds), ['strength', 'dexterity', 'intelligence', 'wisdom', 'constitution', 'charisma'])
+        self.assertEqual(odds['strength'].modifier, 3)
+        self.assertEqual(odds['charisma'], get_odds(0))
+
+    def test_debilities_give_disadvantage_on_their_stats(self):
+        odds = stat_odds(dict(CHARACTER, dazed=True))
+
+        self.assertEqual(odds['intelligence'].roll, DISADVANTAGE)
+        self.assertEqual(odds['wisdom'].roll, DISADVANTAGE)
+        self.assertEqual(odds['strength'].roll, NORMAL)
+
+    def test_advantage_and_disadvantage_cancel_out(self):
+        odds = stat_odds(dict(CHARACTER, weakened=True), roll=ADVANTAGE)
+
+        self.assertEqual(odds['strength'].roll, NORMAL)
+        self.assertEqual(odds['wisdom'].roll, ADVANTAGE)
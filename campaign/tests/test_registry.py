@@ -0,0 +1,78 @@
+from django.test import TestCase
+
+from campaign import registry
+from campaign.models import CharacterClass, Background, MajorArcanum, Tags
+
+
+class RegistryTests(TestCase):
+
+    def setUp(self):
+        registry.clear()
+
+    def test_slug_is_set_from_the_name(self):
+        tag = Tags.objects.create(name='Very Large')
+
+        self.assertEqual(tag.slug, 'very-large')
+
+    def test_names_with_the_same_slug_get_a_number(self):
+        Tags.objects.create(name='tiny-x')
+        tag = Tags.objects.create(name='Tiny X')
+        other = Tags.objects.create(name='TINY x')
+
+        self.assertEqual((tag.slug, other.slug), ('tiny-x-2', 'tiny-x-3'))
+
+    def test_names_without_a_slug_use_the_model_name(self):
+        tag = Tags.objects.create(name='!!!')
+        other = Tags.objects.create(name='???')
+
+        self.assertEqual((tag.slug, other.slug), ('tags', 'tags-2'))
+
+    def test_renaming_keeps_the_slug(self):
+        arcanum = MajorArcanum.objects.create(name='Storm Markings', description1='...', weight=0)
+        arcanum.name = 'The Storm Markings'
+        arcanum.save()
+
+        self.assertEqual(registry.get_id(MajorArcanum, 'storm-markings'), arcanum.pk)
+
+    def test_background_slugs_are_unique_per_playbook(self):
+        heavy = CharacterClass.objects.create(class_name='The Heavy')
+        ranger = CharacterClass.objects.create(class_name='The Ranger')
+
+        Background.objects.create(character_class=heavy, background='DRIVEN', description='...')
+        background = Background.objects.create(character_class=ranger, background='DRIVEN', description='...')
+
+        self.assertEqual(background.slug, 'driven')
+
+    def test_get_id_finds_rows_added_after_loading(self):
+        Tags.objects.create(name='tiny')
+        registry.get_id(Tags, 'tiny')
+
+        tag = Tags.objects.create(name='tough')
+
+        self.assertEqual(registry.get_id(Tags, 'tough'), tag.pk)
+
+    def test_get_id_does_not_query_once_loaded(self):
+        tag = Tags.objects.create(name='tiny')
+        registry.get_id(Tags, 'tiny')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(registry.get_id(Tags, 'tiny'), tag.pk)
+
+    def test_get_id_unknown_slug_raises_error(self):
+        with self.assertRaises(registry.UnknownSlug):
+            registry.get_id(Tags, 'missing')
+
+    def test_get_ids_leaves_out_unknown_slugs(self):
+        brave = Tags.objects.create(name='brave')
+        group = Tags.objects.create(name='group')
+
+        self.assertEqual(registry.get_ids(Tags, ['group', 'missing', 'brave']), [group.pk, brave.pk])
+
+    def test_deleting_a_row_clears_the_model(self):
+        tag = Tags.objects.create(name='tiny')
+        registry.get_id(Tags, 'tiny')
+
+        tag.delete()
+
+        with self.assertRaises(registry.UnknownSlug):
+            registry.get_id(Tags, 'tiny')
@@ -0,0 +1,65 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from campaign.constants import NPC_NAMES
+from campaign.models import Campaign, DefaultNPC, NPCInstance, Tags, Armor, Damage, GameMasterMoves
+from campaign.spawning import spawn_npcs
+
+User = get_user_model()
+
+
+class SpawnNPCsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        cls.bandit = DefaultNPC.objects.create(
+            name='Bandit', default_max_hp=6, default_instinct='To take what is not theirs', default_residence='The Steplands',
+        )
+        cls.bandit.default_tags.set([Tags.objects.create(name='thieving'), Tags.objects.create(name='cunning')])
+        cls.bandit.default_armor.set([Armor.objects.create(armor=1), Armor.objects.create(armor=2)])
+        cls.bandit.default_damage.set([Damage.objects.create(damage_die='D8')])
+        cls.bandit.default_moves.set([GameMasterMoves.objects.create(description='Ambush')])
+
+    def test_instances_copy_the_template(self):
+        npcs = spawn_npcs(self.bandit, self.campaign, self.gm, 3)
+
+        self.assertEqual([npc.character_name for npc in npcs], ['Bandit 1', 'Bandit 2', 'Bandit 3'])
+        npc = NPCInstance.objects.get(pk=npcs[0].pk)
+        self.assertEqual(npc.default_npc, self.bandit)
+        self.assertEqual((npc.max_hp, npc.current_hp, npc.armor, npc.damage), (6, 6, 2, 'D8'))
+        self.assertEqual(npc.instinct, 'To take what is not theirs')
+        self.assertEqual(npc.residence, 'The Steplands')
+        self.assertEqual(set(npc.tags.values_list('name', flat=True)), {'thieving', 'cunning'})
+        self.assertEqual(list(npc.gm_moves.values_list('description', flat=True)), ['Ambush'])
+
+    def test_numbering_carries_on(self):
+        spawn_npcs(self.bandit, self.campaign, self.gm, 2)
+
+        npcs = spawn_npcs(self.bandit.pk, self.campaign, self.gm, 2)
+
+        self.assertEqual([npc.character_name for npc in npcs], ['Bandit 3', 'Bandit 4'])
+
+    def test_random_names_and_pronouns(self):
+        npcs = spawn_npcs(
+            self.bandit, self.campaign, self.gm, 10, random_names=True, random_pronouns=True, rng=random.Random(1),
+        )
+
+        for npc in NPCInstance.objects.filter(pk__in=[npc.pk for npc in npcs]):
+            self.assertIn(npc.character_name, NPC_NAMES)
+            self.assertIn(npc.pronouns, ['he/him', 'she/her', 'they/them'])
+
+    def test_fixed_number_of_queries(self):
+        # The template and its 4 M2Ms, the numbering, the instances, 2 M2M inserts and the savepoints
+        with self.assertNumQueries(11):
+            spawn_npcs(self.bandit, self.campaign, self.gm, 40)
+
+        self.assertEqual(NPCInstance.objects.filter(campaign=self.campaign).count(), 40)
+        self.assertEqual(NPCInstance.tags.through.objects.count(), 80)
+
+    def test_spawn_limit(self):
+        with self.assertRaises(ValueError):
+            spawn_npcs(self.bandit, self.campaign, self.gm, 0)
@@ -117,6 +117,16 @@ class CampaignCreationAndPlayerAdditionTests(BaseViewsTestClass):
         self.assertContains(response, f'Campaign Status: {self.campaign1.status}')
 
     
+    def test_campaign_detail_page_does_not_save_session_on_repeat_views(self):
+        self.login_user(self.gm)
+        response = self.client.get(reverse('campaign-detail', kwargs={'pk': self.campaign1.pk}))
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+        response = self.client.get(reverse('campaign-detail', kwargs={'pk': self.campaign1.pk}))
+
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertEqual(self.client.session['current_campaign_id'], self.campaign1.pk)
+
     def test_player2_cannot_see_campaign_information(self):
         # This is a user that has not been given permission to view any of the 
         # campaign information
@@ -0,0 +1,49 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from campaign.models import Campaign, NPCInstance
+from campaign.tests.test_views.base_views import BaseViewsTestClass
+
+User = get_user_model()
+
+
+class CombatRoundViewTests(BaseViewsTestClass):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.other = User.objects.create_user(username='other', email='other@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        cls.wolf = NPCInstance.objects.create(
+            player=cls.gm, campaign=cls.campaign, character_name='Wolf', max_hp=6, damage='D6', instinct='...',
+        )
+        cls.url = reverse('combat-round', args=[cls.campaign.pk])
+
+    def post(self, body):
+        return self.client.post(self.url, data=json.dumps(body), content_type='application/json')
+
+    def test_gm_applies_a_round(self):
+        self.login_user(self.gm)
+
+        response = self.post({'changes': [{'target_type': 'npc', 'id': self.wolf.pk, 'field': 'hp', 'delta': -4}]})
+
+        self.assertEqual(response.json(), {
+            'values': [{'target_type': 'npc', 'id': self.wolf.pk, 'field': 'hp', 'value': 2}],
+        })
+
+    def test_bad_rounds(self):
+        self.login_user(self.gm)
+
+        self.assertEqual(self.client.post(self.url, data='[', content_type='application/json').status_code, 400)
+        self.assertEqual(self.post({'changes': [{'target_type': 'npc', 'id': 0, 'field': 'hp', 'delta': -4}]}).status_code, 400)
+        self.assertEqual(
+            self.post({'changes': [{'target_type': 'npc', 'id': self.wolf.pk, 'field': 'hp', 'delta': 3_000_000_000}]})
+            .status_code, 400,
+        )
+
+    def test_only_members_of_the_campaign(self):
+        self.login_user(self.other)
+
+        self.assertEqual(self.post({'changes': []}).status_code, 404)
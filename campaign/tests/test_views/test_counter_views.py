@@ -0,0 +1,141 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from campaign.counters import MAX_DELTA
+from campaign.models import (
+    Campaign, Character, CharacterClass, Background, TheBlessed,
+    Moves, MoveInstance,
+    InventoryItem, ItemInstance,
+)
+from campaign.tests.test_views.base_views import BaseViewsTestClass
+
+User = get_user_model()
+
+
+class AdjustCounterViewTests(BaseViewsTestClass):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.other = User.objects.create_user(username='other', email='other@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        the_blessed = CharacterClass.objects.create(class_name='The Blessed')
+        background = Background.objects.create(character_class=the_blessed, background='INITIATE', description='...')
+        cls.character = TheBlessed.objects.create(
+            player=cls.player, campaign=cls.campaign, character_name='Aeda', background=background,
+        )
+        # The post_save signal sets the starting HP
+        TheBlessed.objects.filter(pk=cls.character.pk).update(max_hp=16, current_hp=10, stock_max=3, current_stock=1)
+        cls.move = Moves.objects.create(name='Spirit Tongue', description='...', total_uses=3)
+        cls.move_instance = MoveInstance.objects.create(move=cls.move, uses=3)
+        cls.character.move_instances.add(cls.move_instance)
+        cls.item = InventoryItem.objects.create(name='Bandages', weight=0, total_uses=3, default_item=True)
+        cls.item_instance = ItemInstance.objects.create(item=cls.item, character=cls.character)
+
+    def adjust(self, counter, delta, pk_obj=None, **data):
+        args = [self.campaign.pk, self.character.pk, counter]
+        if pk_obj is not None:
+            args.append(pk_obj)
+        return self.client.post(reverse('adjust-counter', args=args), data={'delta': delta, **data})
+
+    def test_damage_updates_hp_in_one_update(self):
+        self.login_user(self.player)
+
+        with self.assertNumQueries(7):
+            # The session, the user, the UPDATE, reading back the new value
+            # and the event log INSERT in its own savepoint
+            response = self.client.post(
+                reverse('adjust-counter', args=[self.campaign.pk, self.character.pk, 'hp']),
+                data={'delta': -3},
+            )
+
+        self.assertEqual(response.json(), {'counter': 'hp', 'value': 7})
+        self.assertEqual(Character.objects.get(pk=self.character.pk).current_hp, 7)
+
+    def test_hp_stays_between_zero_and_max_hp(self):
+        self.login_user(self.player)
+
+        self.assertEqual(self.adjust('hp', 10).json()['value'], 16)
+        self.assertEqual(self.adjust('hp', -20).json()['value'], 0)
+
+    def test_xp_has_no_maximum(self):
+        self.login_user(self.player)
+
+        self.assertEqual(self.adjust('xp', 12).json()['value'], 12)
+
+    def test_stock_is_capped_at_the_pouch_size(self):
+        self.login_user(self.player)
+
+        self.assertEqual(self.adjust('stock', 5).json()['value'], 3)
+
+    def test_spending_a_move_use(self):
+        self.login_user(self.player)
+
+        self.adjust('move-uses', -1, self.move_instance.pk)
+        self.adjust('move-uses', -1, self.move_instance.pk)
+
+        self.move_instance.refresh_from_db()
+        self.assertEqual(self.move_instance.uses, 1)
+
+    def test_move_uses_are_capped_at_total_uses(self):
+        self.login_user(self.player)
+
+        self.assertEqual(self.adjust('move-uses', 2, self.move_instance.pk).json()['value'], 3)
+
+    def test_empty_item_uses_start_from_zero(self):
+        ItemInstance.objects.filter(pk=self.item_instance.pk).update(uses=None)
+        self.login_user(self.player)
+
+        self.assertEqual(self.adjust('item-uses', 1, self.item_instance.pk).json()['value'], 1)
+
+    def test_gm_can_adjust_the_counters(self):
+        self.login_user(self.gm)
+
+        self.assertEqual(self.adjust('hp', -1).status_code, 200)
+
+    def test_other_users_cannot_adjust_the_counters(self):
+        self.login_user(self.other)
+
+        response = self.adjust('hp', -10)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Character.objects.get(pk=self.character.pk).current_hp, 10)
+
+    def test_instances_of_other_characters_are_not_found(self):
+        other_instance = MoveInstance.objects.create(move=self.move, uses=3)
+        self.login_user(self.player)
+
+        self.assertEqual(self.adjust('move-uses', -1, other_instance.pk).status_code, 404)
+
+    def test_unknown_counter_is_not_found(self):
+        self.login_user(self.player)
+
+        self.assertEqual(self.adjust('gold', 1).status_code, 404)
+
+    def test_delta_must_be_a_number(self):
+        self.login_user(self.player)
+
+        self.assertEqual(self.adjust('hp', 'lots').status_code, 400)
+
+    def test_delta_must_be_within_the_limit(self):
+        self.login_user(self.player)
+
+        self.assertEqual(self.adjust('xp', 3_000_000_000).status_code, 400)
+        self.assertEqual(self.adjust('hp', -(MAX_DELTA + 1)).status_code, 400)
+        self.assertEqual(Character.objects.get(pk=self.character.pk).experience_points, 0)
+
+    def test_redirects_to_next(self):
+        self.login_user(self.player)
+        next_url = reverse('character-moves', args=[self.campaign.pk, self.character.pk])
+
+        response = self.adjust('move-uses', -1, self.move_instance.pk, next=next_url)
+
+        self.assertRedirects(response, next_url, fetch_redirect_response=False)
+
+    def test_only_post_is_allowed(self):
+        self.login_user(self.player)
+
+        response = self.client.get(reverse('adjust-counter', args=[self.campaign.pk, self.character.pk, 'hp']))
+
+        self.assertEqual(response.status_code, 405)
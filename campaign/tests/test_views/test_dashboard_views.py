@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from campaign.models import Campaign, CharacterClass, Background, TheFox
+from campaign.tests.test_views.base_views import BaseViewsTestClass
+
+User = get_user_model()
+
+
+class PartyDashboardViewTests(BaseViewsTestClass):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        background = Background.objects.create(
+            character_class=CharacterClass.objects.create(class_name='The Fox'),
+            background='A LIFE OF CRIME', description='...',
+        )
+        TheFox.objects.create(player=cls.player, campaign=cls.campaign, character_name='Bram', background=background)
+        cls.url = reverse('party-dashboard', args=[cls.campaign.pk])
+
+    def test_gm_sees_the_party(self):
+        self.login_user(self.gm)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'campaign/party_dashboard.html')
+        self.assertContains(response, 'Bram')
+        self.assertContains(response, 'HP: 16/16')
+
+    def test_only_the_gm(self):
+        self.login_user(self.player)
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+
+from campaign.models import Campaign, CharacterClass, Background, TheBlessed, NPCInstance
+from campaign.tests.test_views.base_views import BaseViewsTestClass
+
+User = get_user_model()
+
+
+class EncounterSimulationViewTests(BaseViewsTestClass):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        the_blessed = CharacterClass.objects.create(class_name='The Blessed')
+        background = Background.objects.create(character_class=the_blessed, background='INITIATE', description='...')
+        TheBlessed.objects.create(
+            player=cls.player, campaign=cls.campaign, character_name='Aeda', background=background, strength=2,
+        )
+        cls.wolf = NPCInstance.objects.create(
+            player=cls.gm, campaign=cls.campaign, character_name='Wolf', max_hp=6, damage='D6', instinct='...',
+        )
+        cls.url = reverse('simulate-encounter', args=[cls.campaign.pk])
+
+    def test_gm_simulates_a_fight(self):
+        self.login_user(self.gm)
+
+        result = self.client.get(self.url, data={'npcs': self.wolf.pk, 'runs': 500, 'seed': 1}).json()
+
+        self.assertEqual(result['runs'], 500)
+        self.assertFalse(result['truncated'])
+        self.assertEqual(result['hp_loss'][0]['name'], 'Aeda')
+        self.assertEqual(self.client.get(self.url, data={'npcs': self.wolf.pk, 'runs': 500, 'seed': 1}).json(), result)
+
+    @override_settings(ENCOUNTER_DEFAULT_RUNS=300)
+    def test_default_runs(self):
+        self.login_user(self.gm)
+
+        self.assertEqual(self.client.get(self.url, data={'npcs': self.wolf.pk}).json()['runs'], 300)
+
+    @override_settings(ENCOUNTER_TIME_BUDGET=0)
+    def test_time_budget(self):
+        self.login_user(self.gm)
+
+        result = self.client.get(self.url, data={'npcs': self.wolf.pk, 'runs': 500}).json()
+
+        self.assertTrue(result['truncated'])
+
+    @override_settings(ENCOUNTER_MAX_RUNS=1000)
+    def test_bad_parameters(self):
+        self.login_user(self.gm)
+
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, data={'npcs': 'wolf'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, data={'npcs': self.wolf.pk, 'runs': 1001}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, data={'npcs': self.wolf.pk, 'seed': 'x'}).status_code, 400)
+
+    def test_only_the_gm_can_simulate(self):
+        self.login_user(self.player)
+
+        self.assertEqual(self.client.get(self.url, data={'npcs': self.wolf.pk}).status_code, 404)
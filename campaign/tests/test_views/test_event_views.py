@@ -0,0 +1,42 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from campaign.models import Campaign, NPCInstance, CampaignEvent
+from campaign.tests.test_views.base_views import BaseViewsTestClass
+
+User = get_user_model()
+
+
+class CampaignEventViewTests(BaseViewsTestClass):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        cls.campaign.players.add(cls.player)
+        cls.wolf = NPCInstance.objects.create(
+            player=cls.gm, campaign=cls.campaign, character_name='Wolf', max_hp=6, damage='D6', instinct='...',
+        )
+
+    def test_a_round_is_logged_and_exported(self):
+        self.login_user(self.gm)
+        self.client.post(
+            reverse('combat-round', args=[self.campaign.pk]),
+            data=json.dumps({'changes': [{'target_type': 'npc', 'id': self.wolf.pk, 'field': 'hp', 'delta': -4}]}),
+            content_type='application/json',
+        )
+
+        response = self.client.get(reverse('export-events', args=[self.campaign.pk]))
+
+        self.assertEqual(CampaignEvent.objects.count(), 1)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        line = json.loads(b''.join(response.streaming_content))
+        self.assertEqual((line['target_type'], line['target'], line['value']), ('npc', self.wolf.pk, 2))
+
+    def test_only_the_gm_exports(self):
+        self.login_user(self.player)
+
+        self.assertEqual(self.client.get(reverse('export-events', args=[self.campaign.pk])).status_code, 404)
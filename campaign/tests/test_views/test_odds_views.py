@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from campaign.models import Campaign, CharacterClass, Background, TheBlessed
+from campaign.tests.test_views.base_views import BaseViewsTestClass
+
+User = get_user_model()
+
+
+class OddsViewTests(BaseViewsTestClass):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.other = User.objects.create_user(username='other', email='other@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        the_blessed = CharacterClass.objects.create(class_name='The Blessed')
+        background = Background.objects.create(character_class=the_blessed, background='INITIATE', description='...')
+        for name, player in (('Aeda', cls.player), ('Bram', cls.gm)):
+            TheBlessed.objects.create(
+                player=player, campaign=cls.campaign, character_name=name, background=background,
+                strength=2, dexterity=1, intelligence=1, wisdom=0, constitution=0, charisma=-1, weakened=True,
+            )
+        cls.character = TheBlessed.objects.get(character_name='Aeda')
+        cls.url = reverse('character-odds', args=[cls.campaign.pk, cls.character.pk])
+
+    def test_character_odds(self):
+        self.login_user(self.player)
+
+        odds = self.client.get(self.url, data={'modifier': 1}).json()['odds']
+
+        self.assertEqual(odds['strength']['modifier'], 3)
+        self.assertEqual(odds['strength']['roll'], 'disadvantage')
+        self.assertEqual(odds['wisdom']['roll'], 'normal')
+        self.assertAlmostEqual(sum(odds['wisdom'][result] for result in ('hit', 'partial', 'miss')), 1)
+
+    def test_roll_with_advantage(self):
+        self.login_user(self.player)
+
+        odds = self.client.get(self.url, data={'roll': 'advantage'}).json()['odds']
+
+        self.assertEqual(odds['strength']['roll'], 'normal')
+        self.assertEqual(odds['wisdom']['roll'], 'advantage')
+
+    def test_bad_parameters(self):
+        self.login_user(self.player)
+
+        self.assertEqual(self.client.get(self.url, data={'roll': 'lucky'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, data={'modifier': 'lots'}).status_code, 400)
+
+    def test_other_users_cannot_see_the_odds(self):
+        self.login_user(self.other)
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.get(reverse('campaign-odds', args=[self.campaign.pk])).status_code, 404)
+
+    def test_party_odds_in_a_fixed_number_of_queries(self):
+        self.login_user(self.player)
+
+        with self.assertNumQueries(4):
+            # The session, the user, the access check and the characters
+            response = self.client.get(reverse('campaign-odds', args=[self.campaign.pk]))
+
+        characters = response.json()['characters']
+        self.assertEqual([character['character_name'] for character in characters], ['Aeda', 'Bram'])
+
+    def test_stats_widget_shows_the_odds(self):
+        self.login_user(self.player)
+
+        response = self.client.get(reverse('the-blessed-detail', args=[self.campaign.pk, self.character.pk]))
+
+        self.assertContains(response, '10+ ')
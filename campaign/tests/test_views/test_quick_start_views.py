@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from campaign.models import Campaign, TheFox
+from campaign.tests.test_views.base_views import BaseViewsTestClass
+
+User = get_user_model()
+
+
+class QuickStartCharacterViewTests(BaseViewsTestClass):
+    fixtures = ['campaign_data.json']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        cls.campaign.players.add(cls.player)
+        cls.url = reverse('quick-start-character', args=[cls.campaign.pk, 'the-fox'])
+
+    def test_player_gets_a_character(self):
+        self.login_user(self.player)
+
+        response = self.client.post(self.url)
+
+        fox = TheFox.objects.get(campaign=self.campaign, player=self.player)
+        self.assertRedirects(response, reverse('the-fox-detail', args=[self.campaign.pk, fox.pk]))
+        self.assertEqual(self.client.session['current_character_id'], fox.pk)
+        self.assertTrue(fox.move_instances.exists())
+
+    def test_unknown_playbook(self):
+        self.login_user(self.player)
+
+        response = self.client.post(reverse('quick-start-character', args=[self.campaign.pk, 'the-bard']))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_only_members_of_the_campaign(self):
+        self.login_user(User.objects.create_user(username='other', email='other@example.com', password='x'))
+
+        self.assertEqual(self.client.post(self.url).status_code, 404)
+        self.assertFalse(TheFox.objects.exists())
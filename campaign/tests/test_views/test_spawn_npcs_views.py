@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from campaign.models import Campaign, DefaultNPC, NPCInstance
+from campaign.tests.test_views.base_views import BaseViewsTestClass
+
+User = get_user_model()
+
+
+class SpawnNPCsViewTests(BaseViewsTestClass):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        cls.villager = DefaultNPC.objects.create(name='Villager', default_max_hp=3)
+        cls.url = reverse('spawn-npcs', args=[cls.campaign.pk])
+
+    def test_gm_spawns_npcs(self):
+        self.login_user(self.gm)
+
+        response = self.client.post(self.url, data={'default_npc': self.villager.pk, 'count': 12})
+
+        self.assertRedirects(response, reverse('campaign-detail', args=[self.campaign.pk]))
+        self.assertEqual(NPCInstance.objects.filter(campaign=self.campaign, default_npc=self.villager).count(), 12)
+
+    def test_count_is_limited(self):
+        self.login_user(self.gm)
+
+        response = self.client.post(self.url, data={'default_npc': self.villager.pk, 'count': 1000})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(NPCInstance.objects.exists())
+
+    def test_only_the_gm_can_spawn(self):
+        self.login_user(self.player)
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -1,6 +1,6 @@
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from django.db.models import F
+from django.db.models import F, Q
 
 from unittest import skip
 
@@ -496,6 +496,11 @@ class TheBlessedDetailTests(BaseViewsTestClass):
         moves = list(Moves.objects.filter(
             character_class=self.the_blessed).exclude(
                 name__in=starting_moves
+            ).filter(
+                # A new character can't take the moves that need a higher level
+                # or a move they don't have yet
+                Q(move_requirements__move_restricted=None) | Q(move_requirements__move_restricted__name__in=starting_moves),
+                move_requirements__level_restricted=None,
             ).order_by(
                 F('move_requirements__level_restricted').asc(nulls_first=True), 
                 F('move_requirements__move_restricted').asc(nulls_first=True), 
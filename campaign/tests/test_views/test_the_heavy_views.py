@@ -1,6 +1,7 @@
 from django.urls import reverse
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import F
+from django.db.models import F, Q
 
 from unittest import skip
 
@@ -12,7 +13,7 @@ from campaign.models import (
     SpecialPossessions, SpecialPossessionInstance, 
     Moves, MoveInstance,
     TheHeavy, HistoryOfViolence,
-    MajorArcanaInstance,
+    MajorArcanaInstance, ItemInstance, SmallItemInstance,
 )
 from campaign.constants import HEAVY_STARTING_MOVES
 from campaign.tests.base import (
@@ -423,6 +424,11 @@ class TheHeavyDetailTests(BaseViewsTestClass):
         moves = list(Moves.objects.filter(
             character_class=self.the_heavy).exclude(
                 name__in=starting_moves
+            ).filter(
+                # A new character can't take the moves that need a higher level
+                # or a move they don't have yet
+                Q(move_requirements__move_restricted=None) | Q(move_requirements__move_restricted__name__in=starting_moves),
+                move_requirements__level_restricted=None,
             ).order_by(
                 F('move_requirements__level_restricted').asc(nulls_first=True), 
                 F('move_requirements__move_restricted').asc(nulls_first=True), 
@@ -433,3 +439,46 @@ class TheHeavyDetailTests(BaseViewsTestClass):
 
         move_instances = list(response.context['form'].fields['move_instances'].queryset)
         self.assertEqual(moves, move_instances)
+
+    def test_the_heavy_detail_page_does_not_save_session_on_repeat_views(self):
+        campaign, heavy = self.create_sheriff_background_heavy()
+        self.client.get(f'/campaigns/{campaign.pk}/{heavy.pk}/the_heavy_home/')
+
+        response = self.client.get(f'/campaigns/{campaign.pk}/{heavy.pk}/the_heavy_home/')
+
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_the_heavy_moves_page_uses_character_from_url_instead_of_session(self):
+        campaign, heavy = self.create_sheriff_background_heavy()
+        session = self.client.session
+        session.pop('current_character_id')
+        session.pop('current_character_class')
+        session.save()
+
+        response = self.client.get(f'/campaigns/{campaign.pk}/{heavy.pk}/moves/')
+
+        self.assertEqual(response.context['character'], heavy)
+        self.assertEqual(self.client.session['current_character_id'], heavy.pk)
+
+    def test_the_heavy_update_inventory_adds_items_owned_by_the_character(self):
+        campaign, heavy = self.create_sheriff_background_heavy()
+        current_items = set(heavy.items.values_list('id', flat=True))
+        response = self.client.get(f'/campaigns/{campaign.pk}/{heavy.pk}/inventory/update/')
+        item = response.context['form'].fields['items'].queryset[0]
+        small_item = response.context['form'].fields['small_items'].queryset[0]
+
+        self.client.post(
+            f'/campaigns/{campaign.pk}/{heavy.pk}/inventory/update/',
+            data={'items': [item.pk], 'small_items': [small_item.pk]},
+        )
+
+        new_item = ItemInstance.objects.get(item=item, character=heavy)
+        self.assertEqual(set(heavy.items.values_list('id', flat=True)), current_items | {new_item.pk})
+        self.assertEqual(list(heavy.small_items.all()), [SmallItemInstance.objects.get(small_item=small_item, character=heavy)])
+
+    def test_the_heavy_items_are_read_without_a_through_table(self):
+        campaign, heavy = self.create_sheriff_background_heavy()
+
+        query = str(heavy.items.all().query)
+
+        self.assertNotIn('campaign_character_items', query)
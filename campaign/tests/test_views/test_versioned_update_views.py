@@ -0,0 +1,124 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from campaign.models import (
+    Campaign, Character, CharacterClass, Background, TheBlessed,
+)
+from campaign.tests.test_views.base_views import BaseViewsTestClass
+from campaign.utils import ROW_VERSION_FIELD
+
+User = get_user_model()
+
+
+class VersionedUpdateViewTests(BaseViewsTestClass):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.gm = User.objects.create_user(username='gm', email='gm@example.com', password='x')
+        cls.campaign = Campaign.objects.create(gm=cls.gm, name='Stonetop', code='1234', status='Open')
+        the_blessed = CharacterClass.objects.create(class_name='The Blessed')
+        background = Background.objects.create(character_class=the_blessed, background='INITIATE', description='...')
+        cls.character = TheBlessed.objects.create(
+            player=cls.player, campaign=cls.campaign, character_name='Aeda', background=background,
+        )
+        # The post_save signal sets the starting HP
+        TheBlessed.objects.filter(pk=cls.character.pk).update(max_hp=16, current_hp=10, armor=0)
+        cls.url = reverse('character-stats', args=[cls.campaign.pk, cls.character.pk])
+
+    def shown_form_data(self):
+        """
+        The values of the stats form as a browser would submit them.
+        """
+        form = self.client.get(self.url).context['form']
+        data = {}
+        for field in form:
+            value = field.value()
+            if value is False or value is None:
+                continue
+            data[field.name] = 'on' if value is True else value
+        return data
+
+    def save_elsewhere(self, **values):
+        character = Character.objects.get(pk=self.character.pk)
+        for name, value in values.items():
+            setattr(character, name, value)
+        character.save()
+
+    def current(self):
+        return Character.objects.get(pk=self.character.pk)
+
+    def test_form_has_a_row_version(self):
+        self.login_user(self.player)
+
+        response = self.client.get(self.url)
+
+        self.assertContains(response, f'name="{ROW_VERSION_FIELD}"')
+
+    def test_saving_bumps_the_version(self):
+        self.login_user(self.player)
+        version = self.current().version
+        data = self.shown_form_data()
+        data['current_hp'] = 8
+
+        response = self.client.post(self.url, data=data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.current().current_hp, 8)
+        self.assertGreater(self.current().version, version)
+
+    def test_changes_to_other_fields_are_merged(self):
+        self.login_user(self.player)
+        data = self.shown_form_data()
+        self.save_elsewhere(armor=2)
+        data['current_hp'] = 8
+
+        response = self.client.post(self.url, data=data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.current().current_hp, 8)
+        self.assertEqual(self.current().armor, 2)
+
+    def test_changes_to_the_same_field_are_a_conflict(self):
+        self.login_user(self.player)
+        data = self.shown_form_data()
+        self.save_elsewhere(current_hp=5)
+        data['current_hp'] = 8
+
+        response = self.client.post(self.url, data=data)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, 'Someone else changed', status_code=409)
+        self.assertEqual(self.current().current_hp, 5)
+
+        # Saving again keeps the submitted values
+        data[ROW_VERSION_FIELD] = response.context['form'][ROW_VERSION_FIELD].value()
+        response = self.client.post(self.url, data=data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.current().current_hp, 8)
+
+    def test_counter_changes_are_a_conflict(self):
+        self.login_user(self.player)
+        data = self.shown_form_data()
+        self.client.post(
+            reverse('adjust-counter', args=[self.campaign.pk, self.character.pk, 'hp']), data={'delta': -4},
+        )
+        data['current_hp'] = 8
+
+        response = self.client.post(self.url, data=data)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.current().current_hp, 6)
+
+    def test_saving_without_a_row_version_overwrites(self):
+        self.login_user(self.player)
+        data = self.shown_form_data()
+        del data[ROW_VERSION_FIELD]
+        self.save_elsewhere(current_hp=5)
+        data['current_hp'] = 8
+
+        response = self.client.post(self.url, data=data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.current().current_hp, 8)
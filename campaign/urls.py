@@ -24,6 +24,7 @@ urlpatterns = [
     path('<int:pk>/update/', views.CampaignUpdateView.as_view(), name='update-campaign'), 
     path('<int:pk>/check_code/', views.CheckCampaignCodeView.as_view(), name='check-campaign-code'), 
     path('<int:pk>/choose_character/', views.ChooseCharacterView.as_view(), name='choose-character'),
+    path('<int:pk>/quick_start/<slug:playbook>/', views.QuickStartCharacterView.as_view(), name='quick-start-character'),
     # Create Character:
     path('<int:pk>/create_the_blessed/', views.CreateTheBlessedView.as_view(), name='the-blessed'),
     path('<int:pk>/create_the_fox/', views.CreateTheFoxView.as_view(), name='the-fox'),
@@ -47,6 +48,8 @@ urlpatterns = [
     # NPCs and followers:
     path('<int:pk>/create_npc/', views.CreateNPCView.as_view(), name='create-npc'),
     path('<int:pk>/gm_npc_instance/', views.GMCreateNPCInstanceView.as_view(), name='gm-npc-instance'),
+    path('<int:pk>/spawn_npcs/', views.SpawnNPCsView.as_view(), name='spawn-npcs'),
+    path('<int:pk>/dashboard/', views.PartyDashboardView.as_view(), name='party-dashboard'),
     path('<int:pk>/<int:pk_char>/player_create_npc/', views.PlayerCreateNPCInstanceView.as_view(), name='player-create-npc'),
     path('<int:pk>/<int:pk_char>/add_follower/', views.CreateFollowerInstanceView.as_view(), name='create-follower'),
     path('<int:pk>/<int:pk_char>/followers/', views.CharacterFollowersListView.as_view(), name='character-followers'),
@@ -86,6 +89,17 @@ urlpatterns = [
     path('<int:pk>/<int:pk_char>/minor_arcana/<int:pk_arcana>/', views.UpdateMinorArcanaInstancesView.as_view(), name='update-minor-arcana'),
     path('<int:pk>/<int:pk_char>/arcana_moves/<int:pk_arcana_move>/', views.UpdateArcanaMovesView.as_view(), name='update-arcana-move'), # TODO: Maybe change this so that it also correlates to the arcana in the URL
     
+    # Counters (HP, XP, uses, charges, stock and marks):
+    path('<int:pk>/<int:pk_char>/counters/<slug:counter>/', views.AdjustCounterView.as_view(), name='adjust-counter'),
+    path('<int:pk>/<int:pk_char>/counters/<slug:counter>/<int:pk_obj>/', views.AdjustCounterView.as_view(), name='adjust-counter'),
+    path('<int:pk>/round/', views.CombatRoundView.as_view(), name='combat-round'),
+    path('<int:pk>/events/', views.CampaignEventExportView.as_view(), name='export-events'),
+    # Odds of the move results:
+    path('<int:pk>/<int:pk_char>/odds/', views.CharacterOddsView.as_view(), name='character-odds'),
+    path('<int:pk>/odds/', views.CampaignOddsView.as_view(), name='campaign-odds'),
+    # Encounter simulations for the GM:
+    path('<int:pk>/encounter/', views.EncounterSimulationView.as_view(), name='simulate-encounter'),
+
     # The Blessed special views
     path('<int:pk>/<int:pk_char>/sacred_pouch/', views.TheBlessedSacredPouchDetailView.as_view(), name='character-sacred-pouch'),
     path('<int:pk>/<int:pk_char>/update_sacred_pouch/', views.TheBlessedSacredPouchUpdateView.as_view(), name='character-update-sacred-pouch'),
@@ -1,7 +1,14 @@
+import json
+
 from django.forms import MultiWidget 
 from django import forms 
+from django.forms.models import ModelChoiceIterator
+from django.core import signing
 from django.core.exceptions import ValidationError
 
+from campaign.catalog import get_catalog, invalidate_snapshot
+from campaign.values import CatalogValue
+
 
 class OptionalChoiceWidget(MultiWidget):
 
@@ -36,3 +43,139 @@ class OptionalChoiceField(forms.MultiValueField):
         else:
             return data_list[0]
 
+
+
+class CatalogChoiceIterator(ModelChoiceIterator):
+    """
+    Only gets the ids from the queryset and builds the choices
+    from the catalog value objects instead of model instances.
+    """
+    def get_values(self, pks):
+        catalog = get_catalog()
+        return [catalog.get(self.field.catalog_section, pk) for pk in pks]
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        pks = list(self.queryset.values_list('pk', flat=True))
+        values = self.get_values(pks)
+        if None in values:
+            # The snapshot is missing rows, so rebuild it once
+            invalidate_snapshot()
+            values = self.get_values(pks)
+        for value in values:
+            if value is not None:
+                yield self.choice(value)
+
+
+class CatalogChoiceMixin(object):
+    """
+    Add to a ModelChoiceField (or ModelMultipleChoiceField) to render the
+    choices from the catalog section named in catalog_section.
+    Cleaned values are still model instances.
+    """
+    catalog_section = None
+    iterator = CatalogChoiceIterator
+
+    def prepare_value(self, value):
+        if isinstance(value, CatalogValue):
+            return value.id
+        return super(CatalogChoiceMixin, self).prepare_value(value)
+
+
+ROW_VERSION_FIELD = 'row_version'
+
+
+class VersionedFormMixin(object):
+    """
+    For update forms of VersionedModel rows that the GM and players
+    can edit at the same time.
+
+    The form is shown with a signed row_version token holding the row
+    versions and the values it was shown with. Saving first claims the
+    rows with UPDATE ... WHERE version = n (see VersionedUpdateMixin);
+    if someone saved in between, merge() keeps their changes as long as
+    they changed other fields than this form did.
+    Templates have to render {{ form.row_version }}.
+    """
+    def __init__(self, *args, **kwargs):
+        super(VersionedFormMixin, self).__init__(*args, **kwargs)
+        # Callable so it's made once the subclass has set the initial values
+        self.fields[ROW_VERSION_FIELD] = forms.CharField(
+            widget=forms.HiddenInput, required=False, initial=self.make_token,
+        )
+
+    def versioned_instances(self):
+        return [self.instance]
+
+    def snapshot(self):
+        """
+        The values the form shows, as JSON data.
+        """
+        values = {}
+        for name, field in self.fields.items():
+            if name == ROW_VERSION_FIELD:
+                continue
+            value = field.prepare_value(self.get_initial_for_field(field, name))
+            if isinstance(value, (list, tuple)):
+                value = sorted(value, key=str)
+            values[name] = value
+        return json.loads(json.dumps(values, default=str))
+
+    def make_token(self):
+        versions = [row.version for row in self.versioned_instances()]
+        return signing.dumps({'versions': versions, 'base': self.snapshot()}, salt=ROW_VERSION_FIELD, compress=True)
+
+    @property
+    def shown_with(self):
+        """
+        The row versions and values the form was shown with (None without a token).
+        """
+        if not hasattr(self, '_shown_with'):
+            try:
+                self._shown_with = signing.loads(self.data.get(ROW_VERSION_FIELD, ''), salt=ROW_VERSION_FIELD)
+            except signing.BadSignature:
+                self._shown_with = None
+        return self._shown_with
+
+    def claim_rows(self):
+        """
+        Raises VersionConflict if a row was saved since the form was shown.
+        """
+        if self.shown_with is None:
+            return
+        for row, version in zip(self.versioned_instances(), self.shown_with['versions']):
+            row.claim_version(version)
+
+    def changed_since_shown(self):
+        base = self.shown_with['base']
+        return [
+            name for name, value in base.items()
+            if name in self.fields and self.fields[name].has_changed(value, self[name].data)
+        ]
+
+    def merge(self, current):
+        """
+        Takes over the changes of current (the same form for the rows as they are now)
+        and returns the fields both changed. Nothing is merged if there are any.
+        """
+        base = self.shown_with['base']
+        now = current.snapshot()
+        theirs = {name for name, value in base.items() if now.get(name) != value}
+        mine = set(self.changed_since_shown())
+        if theirs & mine:
+            return sorted(theirs & mine)
+
+        # Everything this form didn't change comes from the current rows
+        for row, current_row in zip(self.versioned_instances(), current.versioned_instances()):
+            for field in row._meta.concrete_fields:
+                if not field.primary_key and field.name not in mine:
+                    setattr(row, field.attname, getattr(current_row, field.attname))
+        for name in theirs:
+            self.cleaned_data[name] = current.get_initial_for_field(current.fields[name], name)
+        self._shown_with = {
+            'versions': [row.version for row in current.versioned_instances()],
+            'base': now,
+        }
+        return []
+
@@ -0,0 +1,89 @@
+"""
+Lightweight read-only versions of the rules models.
+
+These are named tuples (so they have no per-object __dict__ or _state)
+and are what the catalog snapshot returns and the choice field labels
+are rendered from.
+"""
+from collections import namedtuple
+
+
+class CatalogValue(object):
+    """
+    Base class for the catalog value objects.
+    """
+    __slots__ = ()
+    name_field = 'name'
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __str__(self):
+        return f"{getattr(self, self.name_field)}"
+
+
+class BackgroundValue(CatalogValue, namedtuple('BackgroundValue', [
+    'id', 'background', 'description', 'description2', 'description3',
+    'total_charges', 'charge_name', 'effect_name',
+])):
+    __slots__ = ()
+    name_field = 'background'
+
+
+class InstinctValue(CatalogValue, namedtuple('InstinctValue', [
+    'id', 'name', 'description',
+])):
+    __slots__ = ()
+
+
+class AppearanceAttributeValue(CatalogValue, namedtuple('AppearanceAttributeValue', [
+    'id', 'attribute_type', 'description',
+])):
+    __slots__ = ()
+    name_field = 'description'
+
+
+class SpecialPossessionValue(CatalogValue, namedtuple('SpecialPossessionValue', [
+    'id', 'possession_name', 'description', 'description2',
+    'total_uses', 'is_follower',
+])):
+    __slots__ = ()
+    name_field = 'possession_name'
+
+
+class MoveValue(CatalogValue, namedtuple('MoveValue', [
+    'id', 'name', 'take_move_limit', 'description', 'description2', 'description3',
+    'total_uses', 'uses_name', 'total_charges', 'charge_name', 'move_requirements',
+])):
+    __slots__ = ()
+
+
+class MajorArcanumValue(CatalogValue, namedtuple('MajorArcanumValue', [
+    'id', 'name', 'description1', 'description2', 'description3',
+    'weight', 'armor', 'total_marks', 'total_charges', 'charge_name',
+    'tags', 'tasks',
+])):
+    __slots__ = ()
+
+
+class MinorArcanumValue(CatalogValue, namedtuple('MinorArcanumValue', [
+    'id', 'name', 'front_description', 'weight', 'armor', 'total_marks',
+    'back_name', 'back_description', 'total_charges', 'charge_name',
+    'tags', 'tasks',
+])):
+    __slots__ = ()
+
+
+class ItemValue(CatalogValue, namedtuple('ItemValue', [
+    'id', 'name', 'weight', 'description', 'total_uses',
+    'uses_name', 'damage', 'armor',
+])):
+    __slots__ = ()
+
+
+class SmallItemValue(CatalogValue, namedtuple('SmallItemValue', [
+    'id', 'name', 'description', 'total_uses',
+    'uses_name', 'damage', 'armor',
+])):
+    __slots__ = ()
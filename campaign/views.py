@@ -1,9 +1,16 @@
+import json
+
+from django.conf import settings
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
 from django.urls import reverse, reverse_lazy
-from django.views.generic import ListView, DetailView, FormView
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.utils.text import slugify
+from django.views.generic import ListView, DetailView, FormView, View
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
+from django.db.models import Q
 
 from dal import autocomplete
 
@@ -32,7 +39,7 @@ from .forms import (
     CreateCampaignForm, CampaignUpdateForm, CheckCampaignCodeForm, 
     CreateCustomItemForm, CreateCustomSmallItemForm, 
     CreateNonPlayerCharacterForm, CreateTheSeekerForm, CreateTheWouldBeHeroForm, 
-    GMCreateNPCInstanceForm, PlayerCreateNPCInstanceForm, 
+    GMCreateNPCInstanceForm, SpawnNPCsForm, PlayerCreateNPCInstanceForm, 
     CreateFollowerInstanceForm,
     CreateTheBlessedForm, CreateTheFoxForm, CreateTheHeavyForm, 
     CreateTheJudgeForm, CreateTheLightbearerForm, CreateTheMarshalForm, 
@@ -49,11 +56,21 @@ from .forms import (
 from campaign.constants import (
     CHARACTERS, MARSHAL_CREW_TAGS,
 )
+from campaign.combat import apply_round
+from campaign.counters import COUNTERS, adjust
+from campaign.dashboard import party_dashboard
+from campaign.events import export_events
+from campaign.encounters import load_encounter, simulate
+from campaign.generator import create_characters, plan_character
+from campaign.spawning import spawn_npcs
+from campaign.odds import ROLLS, NORMAL, ODDS_FIELDS, stat_odds, odds_as_json
 from campaign.mixins import (
     CharacterDataMixin, CharacterDataAndInventoryURLMixin,
     CreateCharacterMixin, CharacterDataAndURLMixin,
     CampaignCharacterDataAndURLMixin, CampaignFormValidMixin,
     FollowerDataMixin, FollowerDataAndFollowersURLMixin, 
+    VersionedUpdateMixin,
+    update_session,
 )
 
 # Campaign Views:
@@ -128,12 +145,13 @@ class CampaignDetailView(LoginRequiredMixin, DetailView):
         when users go 
         """
         context = super(CampaignDetailView, self).get_context_data(**kwargs)
-        # Add the current campaign to the session
+        # Add the current campaign to the session (only if it has changed)
         campaign = context['campaign']
-        campaign_name = campaign.name
-        campaign_id = campaign.id
-        self.request.session['current_campaign'] = campaign_name
-        self.request.session['current_campaign_id'] = campaign_id
+        update_session(
+            self.request.session,
+            current_campaign=campaign.name,
+            current_campaign_id=campaign.id,
+        )
         return context
 
 
@@ -169,6 +187,31 @@ class ChooseCharacterView(LoginRequiredMixin, ListView):
         return context
 
 
+class QuickStartCharacterView(LoginRequiredMixin, View):
+    """
+    Makes a random, ready to play character of the playbook
+    (see campaign/generator.py) and opens its page.
+    """
+    login_url = reverse_lazy('login')
+    http_method_names = ['post']
+
+    def post(self, request, pk, playbook):
+        user = request.user
+        campaign = Campaign.objects.filter(
+            Q(gm=user) | Q(players=user) | Q(character__player=user), pk=pk,
+        ).distinct().first()
+        playbooks = {slugify(class_name): class_name for class_name in character_classes_dict}
+        if campaign is None or playbook not in playbooks:
+            raise Http404
+        character = create_characters([plan_character(playbooks[playbook])], campaign, user)[0]
+        update_session(
+            request.session,
+            current_character_id=character.pk,
+            current_character_class=character.character_class,
+        )
+        return redirect(f'{playbook}-detail', campaign.id, character.pk)
+
+
 class CreateTheBlessedView(LoginRequiredMixin, CreateCharacterMixin, CreateView):
     """
     Creates a character of The Blessed character class.
@@ -188,7 +231,7 @@ class CreateTheBlessedView(LoginRequiredMixin, CreateCharacterMixin, CreateView)
         character_class = self.object.character_class
         character_string = '-'.join(character_class.lower().split())
         character_string += '-detail'
-        if self.object.background.background == 'INITIATE':
+        if self.object.background.slug == 'initiate':
             return reverse_lazy('the-blessed-add-initiates', args=(campaign_id, self.object.pk))
         else:
             return reverse_lazy(character_string, args=(campaign_id, self.object.pk))
@@ -529,7 +572,7 @@ class CreateTheRangerView(LoginRequiredMixin, CreateCharacterMixin, CreateView):
         character_class = self.object.character_class
         character_string = '-'.join(character_class.lower().split())
         character_string += '-detail'
-        if self.object.background.background == 'BEAST-BONDED':
+        if self.object.background.slug == 'beast-bonded':
             return reverse_lazy('create-animal-companion', args=(campaign_id, self.object.pk))
         else:
             return reverse_lazy(character_string, args=(campaign_id, self.object.pk))
@@ -620,7 +663,7 @@ class CreateTheWouldBeHeroView(LoginRequiredMixin, CreateCharacterMixin, CreateV
         character_string += '-detail'
 
         # Driven background:
-        if self.object.background.background == 'IMPETUOUS YOUTH':
+        if self.object.background.slug == 'impetuous-youth':
             return reverse_lazy(character_string, args=(campaign_id, self.object.pk))
         else:
             return reverse_lazy('update-background', args=(campaign_id, self.object.pk, self.object.background_instance.pk))
@@ -813,6 +856,39 @@ class GMCreateNPCInstanceView(LoginRequiredMixin, CampaignFormValidMixin, Create
         return reverse_lazy('campaign-detail', campaign_id)
 
 
+class SpawnNPCsView(LoginRequiredMixin, FormView):
+    """
+    Lets the GM fill a village or a warband with NPCs
+    made from a default NPC (see campaign/spawning.py).
+    """
+    login_url = reverse_lazy('login')
+    template_name = 'campaign/spawn_npcs.html'
+    form_class = SpawnNPCsForm
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            self.campaign = Campaign.objects.filter(gm=request.user, pk=kwargs['pk']).first()
+            if self.campaign is None:
+                raise Http404
+        return super(SpawnNPCsView, self).dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super(SpawnNPCsView, self).get_context_data(**kwargs)
+        context['campaign'] = self.campaign
+        return context
+
+    def form_valid(self, form):
+        data = form.cleaned_data
+        spawn_npcs(
+            data['default_npc'], self.campaign, self.request.user, data['count'],
+            random_names=data['random_names'], random_pronouns=data['random_pronouns'],
+        )
+        return super(SpawnNPCsView, self).form_valid(form)
+
+    def get_success_url(self):
+        return reverse_lazy('campaign-detail', args=(self.campaign.id,))
+
+
 # TODO: Create a way for link to the page where players can create NPCs
 # Also figure out how the NPC creation process is going to go
 
@@ -889,7 +965,7 @@ class FollowerDetailView(LoginRequiredMixin, FollowerDataMixin, DetailView):
         return context
 
 
-class UpdateNPCInstanceAndFollowerView(LoginRequiredMixin, FollowerDataAndFollowersURLMixin, UpdateView):
+class UpdateNPCInstanceAndFollowerView(LoginRequiredMixin, VersionedUpdateMixin, FollowerDataAndFollowersURLMixin, UpdateView):
     """
     Allows character to update their follower
     Takes in the followers id.
@@ -902,7 +978,7 @@ class UpdateNPCInstanceAndFollowerView(LoginRequiredMixin, FollowerDataAndFollow
     pk_url_kwarg = 'pk_follower'
  
 
-class UpdateFollowerItemView(LoginRequiredMixin, FollowerDataAndFollowersURLMixin, UpdateView):
+class UpdateFollowerItemView(LoginRequiredMixin, VersionedUpdateMixin, FollowerDataAndFollowersURLMixin, UpdateView):
     """
     Allows character to update their follower
     Takes in the followers id.
@@ -915,7 +991,7 @@ class UpdateFollowerItemView(LoginRequiredMixin, FollowerDataAndFollowersURLMixi
     pk_url_kwarg = 'pk_item'
 
 
-class UpdateFollowerSmallItemView(LoginRequiredMixin, FollowerDataAndFollowersURLMixin, UpdateView):
+class UpdateFollowerSmallItemView(LoginRequiredMixin, VersionedUpdateMixin, FollowerDataAndFollowersURLMixin, UpdateView):
     """
     Allows character to update their follower
     Takes in the followers id.
@@ -1062,7 +1138,7 @@ class UpdateCharacterInventoryView(LoginRequiredMixin, CharacterDataAndURLMixin,
     pk_url_kwarg = 'pk_char'
 
 
-class UpdateItemInstanceView(LoginRequiredMixin, CharacterDataAndInventoryURLMixin, UpdateView):
+class UpdateItemInstanceView(LoginRequiredMixin, VersionedUpdateMixin, CharacterDataAndInventoryURLMixin, UpdateView):
     """
     Updates the Character's inventory.
     Takes in the characters id.
@@ -1075,7 +1151,7 @@ class UpdateItemInstanceView(LoginRequiredMixin, CharacterDataAndInventoryURLMix
     pk_url_kwarg = 'pk_item'
 
 
-class UpdateSmallItemInstanceView(LoginRequiredMixin, CharacterDataAndInventoryURLMixin, UpdateView):
+class UpdateSmallItemInstanceView(LoginRequiredMixin, VersionedUpdateMixin, CharacterDataAndInventoryURLMixin, UpdateView):
     """
     Updates the Character's inventory.
     Takes in the characters id.
@@ -1117,7 +1193,7 @@ class DeleteSmallItemInstanceView(LoginRequiredMixin, CharacterDataAndInventoryU
 
 # Stats:
 
-class CharacterUpdateStatsView(LoginRequiredMixin, CharacterDataAndURLMixin, UpdateView):
+class CharacterUpdateStatsView(LoginRequiredMixin, VersionedUpdateMixin, CharacterDataAndURLMixin, UpdateView):
     """
     Updates the characters stats.
     Takes in the characters id.
@@ -1131,7 +1207,7 @@ class CharacterUpdateStatsView(LoginRequiredMixin, CharacterDataAndURLMixin, Upd
 
 # Update Special Possessions:
 
-class UpdateSpecialPossessionView(LoginRequiredMixin, CampaignCharacterDataAndURLMixin, UpdateView):
+class UpdateSpecialPossessionView(LoginRequiredMixin, VersionedUpdateMixin, CampaignCharacterDataAndURLMixin, UpdateView):
     """
     Allows players to add (not create) new moves to their characters.
     Player can add a new move whenever they have enough experience to level up.
@@ -1154,7 +1230,7 @@ class UpdateSpecialPossessionView(LoginRequiredMixin, CampaignCharacterDataAndUR
 
 # Update Moves:
 
-class UpdateMoveInstanceView(LoginRequiredMixin, CampaignCharacterDataAndURLMixin, UpdateView):
+class UpdateMoveInstanceView(LoginRequiredMixin, VersionedUpdateMixin, CampaignCharacterDataAndURLMixin, UpdateView):
     """
     Allows players to add (not create) new moves to their characters.
     Player can add a new move whenever they have enough experience to level up.
@@ -1194,7 +1270,7 @@ class CreateMajorArcanaInstanceView(LoginRequiredMixin, CharacterDataAndURLMixin
     form_class = CharacterUpdateMajorArcanaForm
 
 
-class UpdateMajorArcanaInstancesView(LoginRequiredMixin, CampaignCharacterDataAndURLMixin, UpdateView):
+class UpdateMajorArcanaInstancesView(LoginRequiredMixin, VersionedUpdateMixin, CampaignCharacterDataAndURLMixin, UpdateView):
     """
     Allows players to update their progress with their arcana 
     and view all the aspects of the arcana. 
@@ -1207,7 +1283,7 @@ class UpdateMajorArcanaInstancesView(LoginRequiredMixin, CampaignCharacterDataAn
     pk_url_kwarg = 'pk_arcana'
 
 
-class UpdateMinorArcanaInstancesView(LoginRequiredMixin, CampaignCharacterDataAndURLMixin, UpdateView):
+class UpdateMinorArcanaInstancesView(LoginRequiredMixin, VersionedUpdateMixin, CampaignCharacterDataAndURLMixin, UpdateView):
     """
     Allows players to update their progress with their arcana 
     and view all the aspects of the arcana. 
@@ -1232,6 +1308,221 @@ class UpdateArcanaMovesView(LoginRequiredMixin, CampaignCharacterDataAndURLMixin
     pk_url_kwarg = 'pk_arcana_move'
 
 
+# Counters:
+
+class AdjustCounterView(LoginRequiredMixin, View):
+    """
+    Adds delta (1 by default, negative to spend) to one of the character's
+    counters (see campaign/counters.py) without going through the update forms.
+    Returns the new value as JSON, or redirects to next when the form sends one.
+    """
+    login_url = reverse_lazy('login')
+    http_method_names = ['post']
+
+    def post(self, request, pk, pk_char, counter, pk_obj=None):
+        if counter not in COUNTERS or (pk_obj is None) != COUNTERS[counter].per_character:
+            raise Http404
+        try:
+            delta = int(request.POST.get('delta', 1))
+        except ValueError:
+            return HttpResponseBadRequest('delta must be a whole number.')
+        try:
+            value = adjust(counter, request.user, pk, pk_char, delta, pk=pk_obj)
+        except ValueError as error:
+            return HttpResponseBadRequest(str(error))
+        except COUNTERS[counter].model.DoesNotExist:
+            raise Http404
+
+        next_url = request.POST.get('next')
+        if next_url and url_has_allowed_host_and_scheme(
+            next_url, allowed_hosts={request.get_host()}, require_https=request.is_secure()
+        ):
+            return redirect(next_url)
+        return JsonResponse({'counter': counter, 'value': value})
+
+
+class CombatRoundView(LoginRequiredMixin, View):
+    """
+    Applies a whole combat round at once (see campaign/combat.py).
+    The body is JSON: {"changes": [{"target_type": "npc", "id": 4, "field": "hp", "delta": -5}, ...]}.
+    Returns the new values as JSON, or a 400 with the problems when any
+    change can't be made (and then nothing is changed).
+    """
+    login_url = reverse_lazy('login')
+    http_method_names = ['post']
+
+    def post(self, request, pk):
+        user = request.user
+        if not Campaign.objects.filter(
+            Q(gm=user) | Q(players=user) | Q(character__player=user), pk=pk,
+        ).exists():
+            raise Http404
+        try:
+            changes = json.loads(request.body).get('changes')
+        except (ValueError, AttributeError):
+            return HttpResponseBadRequest('The body must be a JSON object with the changes.')
+        try:
+            values = apply_round(user, pk, changes)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        return JsonResponse({'values': values})
+
+
+class CampaignEventExportView(LoginRequiredMixin, View):
+    """
+    Streams the campaign's event log to the GM as JSON lines
+    (see campaign/events.py).
+    """
+    login_url = reverse_lazy('login')
+    http_method_names = ['get']
+
+    def get(self, request, pk):
+        if not Campaign.objects.filter(gm=request.user, pk=pk).exists():
+            raise Http404
+        response = StreamingHttpResponse(export_events(pk), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="campaign-{pk}-events.jsonl"'
+        return response
+
+
+# Odds:
+
+class OddsMixin(object):
+    """
+    Reads the roll (normal, advantage or disadvantage) and the
+    extra modifier (like +1 forward) from the query string.
+    """
+    def get_roll(self):
+        roll = self.request.GET.get('roll', NORMAL)
+        if roll not in ROLLS:
+            raise ValueError(f"roll must be one of {', '.join(ROLLS)}.")
+        try:
+            modifier = int(self.request.GET.get('modifier', 0))
+        except ValueError:
+            raise ValueError('modifier must be a whole number.')
+        return roll, modifier
+
+    def get(self, request, *args, **kwargs):
+        try:
+            roll, modifier = self.get_roll()
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        return JsonResponse(self.get_odds(roll, modifier, *args, **kwargs))
+
+
+class CharacterOddsView(LoginRequiredMixin, OddsMixin, View):
+    """
+    The chances of 10+, 7-9 and 6- on a move with each of the character's stats
+    (see campaign/odds.py), for the character's player and the GM.
+    """
+    login_url = reverse_lazy('login')
+    http_method_names = ['get']
+
+    def get_odds(self, roll, modifier, pk, pk_char):
+        character = Character.objects.filter(
+            Q(player=self.request.user) | Q(campaign__gm=self.request.user),
+            id=pk_char, campaign_id=pk,
+        ).values(*ODDS_FIELDS).first()
+        if character is None:
+            raise Http404
+        return {'odds': odds_as_json(stat_odds(character, roll, modifier))}
+
+
+class CampaignOddsView(LoginRequiredMixin, OddsMixin, View):
+    """
+    The odds of every character of the campaign, for its GM and players.
+    """
+    login_url = reverse_lazy('login')
+    http_method_names = ['get']
+
+    def get_odds(self, roll, modifier, pk):
+        user = self.request.user
+        if not Campaign.objects.filter(
+            Q(gm=user) | Q(players=user) | Q(character__player=user), pk=pk,
+        ).exists():
+            raise Http404
+        characters = Character.objects.filter(campaign_id=pk).order_by('character_name').values(
+            'id', 'character_name', *ODDS_FIELDS,
+        )
+        return {'characters': [
+            {
+                'id': character['id'],
+                'character_name': character['character_name'],
+                'odds': odds_as_json(stat_odds(character, roll, modifier)),
+            }
+            for character in characters
+        ]}
+
+
+class PartyDashboardView(LoginRequiredMixin, DetailView):
+    """
+    Every character of the campaign on one page for the GM
+    (see campaign/dashboard.py).
+    """
+    login_url = reverse_lazy('login')
+    template_name = 'campaign/party_dashboard.html'
+    model = Campaign
+    context_object_name = 'campaign'
+
+    def get_queryset(self):
+        return Campaign.objects.filter(gm=self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super(PartyDashboardView, self).get_context_data(**kwargs)
+        context['party'] = party_dashboard(self.object.id)
+        return context
+
+
+class EncounterSimulationView(LoginRequiredMixin, View):
+    """
+    Simulates a fight between the party and some of the campaign's NPCs
+    (see campaign/encounters.py), for the GM:
+    ?npcs=1&npcs=2 the NPC instances to fight,
+    ?characters=3 only these characters (and their followers and companions),
+    ?runs=5000 the number of fights (settings.ENCOUNTER_DEFAULT_RUNS by default),
+    up to settings.ENCOUNTER_MAX_RUNS,
+    ?seed=7 to repeat a simulation.
+    The fights stop after settings.ENCOUNTER_TIME_BUDGET seconds
+    ("truncated" is then true and "runs" says how many were played).
+    """
+    login_url = reverse_lazy('login')
+    http_method_names = ['get']
+
+    def get_ids(self, name):
+        try:
+            return [int(pk) for pk in self.request.GET.getlist(name)]
+        except ValueError:
+            raise ValueError(f'{name} must be ids.')
+
+    def get_number(self, name, default):
+        value = self.request.GET.get(name)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f'{name} must be a whole number.')
+
+    def get(self, request, pk):
+        if not Campaign.objects.filter(gm=request.user, pk=pk).exists():
+            raise Http404
+        try:
+            npc_ids = self.get_ids('npcs')
+            character_ids = self.get_ids('characters') or None
+            runs = self.get_number('runs', settings.ENCOUNTER_DEFAULT_RUNS)
+            seed = self.get_number('seed', None)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        if not npc_ids:
+            return HttpResponseBadRequest('Choose the npcs to fight.')
+        if not 0 < runs <= settings.ENCOUNTER_MAX_RUNS:
+            return HttpResponseBadRequest(f'runs must be between 1 and {settings.ENCOUNTER_MAX_RUNS}.')
+
+        encounter = load_encounter(pk, npc_ids, character_ids)
+        # Web workers play the fights themselves rather than forking a pool
+        result = simulate(encounter, runs, seed=seed, time_budget=settings.ENCOUNTER_TIME_BUDGET)
+        return JsonResponse(result.as_json())
+
+
 # Autocomplete views:
 
 class TagsAutoCompleteView(autocomplete.Select2QuerySetView):
@@ -1279,10 +1570,9 @@ class NPCInstanceAutoCompleteView(autocomplete.Select2QuerySetView):
 
         campaign_id = self.request.session['current_campaign_id']
 
-        campaign_followers = FollowerInstance.objects.filter(campaign__id=campaign_id)
-        id_list = []
-        for follower in campaign_followers:
-            id_list.append(follower.npc_instance.id)
+        id_list = FollowerInstance.objects.filter(
+            campaign__id=campaign_id
+            ).values_list('npc_instance_id', flat=True)
 
         qs = NPCInstance.objects.filter(
             campaign__id=campaign_id
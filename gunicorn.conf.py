@@ -0,0 +1,41 @@
+"""
+Gunicorn settings for the production web process (see the Procfile).
+
+    gunicorn stonetop_site.wsgi
+
+Every setting can be tuned with an environment variable.
+With preload_app, SIGHUP restarts the workers from the code the master
+already loaded. Deploys need a full restart (or USR2, then TERM to the old
+master), see the README.
+"""
+import multiprocessing
+import os
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# Preforked workers (WEB_CONCURRENCY is set by Heroku based on dyno size)
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+
+# Load the app (and the catalog, templates...) once in the master
+# so the workers share it copy-on-write
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers now and then so a slow leak can't build up
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    if preload_app:
+        from stonetop_site.warmup import warm_up
+        warm_up()
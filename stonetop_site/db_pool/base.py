@@ -0,0 +1,237 @@
+"""
+PostgreSQL backend that keeps each thread's connection open between requests.
+
+Django already reuses a connection for CONN_MAX_AGE seconds. On top of that,
+the first query of every request checks the connection out:
+- with HEALTH_CHECKS a quick SELECT 1 replaces connections that went away,
+- MAX_SIZE caps the connections of this process in use at once: a request
+  waits up to TIMEOUT seconds for a slot and gives it back when it ends.
+  After a request, its connection is closed if more than MAX_SIZE are open,
+  so no more than MAX_SIZE stay open between requests.
+At the end of every request, the connections of this process that have been
+unused for more than IDLE_TIMEOUT seconds are closed.
+
+The POOL options come from settings.DB_POOL.
+"""
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import Counter
+
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.postgresql import base
+from django.db.utils import OperationalError
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL = {
+    'MAX_SIZE': 0,
+    'TIMEOUT': 10,
+    'IDLE_TIMEOUT': 60,
+    'HEALTH_CHECKS': True,
+}
+
+# Running totals of the connections of this process
+POOL_METRICS = Counter()
+
+# Caps the connections in use of each database (for MAX_SIZE)
+_slots = {}
+# Open connections of each database
+_open = Counter()
+_slots_lock = threading.Lock()
+
+# Every pooled connection of this process, for closing the idle ones
+_wrappers = weakref.WeakSet()
+
+
+def reset_slots():
+    _slots.clear()
+
+
+def reset_pool():
+    reset_slots()
+    _open.clear()
+
+
+# Forked workers start with their own (empty) pool
+os.register_at_fork(after_in_child=reset_pool)
+
+
+def get_slots(alias, size):
+    with _slots_lock:
+        if alias not in _slots:
+            _slots[alias] = threading.BoundedSemaphore(size)
+        return _slots[alias]
+
+
+def count_open(alias, change):
+    with _slots_lock:
+        _open[alias] += change
+        return _open[alias]
+
+
+def pool_metrics():
+    """
+    The running totals of this process and its open connections.
+    """
+    with _slots_lock:
+        return {**POOL_METRICS, 'open': sum(_open.values())}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, settings_dict, *args, **kwargs):
+        super().__init__(settings_dict, *args, **kwargs)
+        self.pool = {**DEFAULT_POOL, **settings_dict.get('POOL', {})}
+        self.checkout_pending = False
+        # Set between requests, guarded by pool_lock as close_idle() reads it from other threads
+        self.idle_since = None
+        self.closed_idle = False
+        self.pool_lock = threading.Lock()
+        self.holds_slot = False
+        _wrappers.add(self)
+
+    def connect(self):
+        self.acquire_slot()
+        start = time.monotonic()
+        try:
+            super().connect()
+        except Exception:
+            POOL_METRICS['errors'] += 1
+            self.release_slot()
+            raise
+        wait = time.monotonic() - start
+        count_open(self.alias, 1)
+        POOL_METRICS['connects'] += 1
+        POOL_METRICS['wait_seconds'] += wait
+        logger.debug('db connect alias=%s wait=%.1fms', self.alias, wait * 1000)
+
+    def close(self):
+        with self.pool_lock:
+            # close_idle() already counted it
+            closed_idle, self.closed_idle = self.closed_idle, False
+        was_open = self.connection is not None and not self.closed_in_transaction and not closed_idle
+        try:
+            super().close()
+        finally:
+            if was_open and self.connection is None:
+                POOL_METRICS['closes'] += 1
+                count_open(self.alias, -1)
+            self.release_slot()
+
+    def ensure_connection(self):
+        idle_since = self.idle_since
+        if idle_since is not None:
+            with self.pool_lock:
+                self.idle_since = None
+                closed_idle, self.closed_idle = self.closed_idle, False
+            if closed_idle:
+                # close_idle() already closed the socket and counted it
+                base.DatabaseWrapper.close(self)
+        if self.checkout_pending:
+            self.checkout_pending = False
+            self.check_out(idle_since)
+        super().ensure_connection()
+
+    def check_out(self, idle_since=None):
+        """
+        Takes a slot and replaces the connection if it was idle for too long or is broken.
+        """
+        POOL_METRICS['checkouts'] += 1
+        if self.connection is not None and not self.in_atomic_block:
+            if idle_since is not None and time.monotonic() - idle_since > self.pool['IDLE_TIMEOUT']:
+                POOL_METRICS['idle_closes'] += 1
+                self.close()
+            elif self.pool['HEALTH_CHECKS'] and not self.is_usable():
+                POOL_METRICS['health_check_failures'] += 1
+                logger.warning('Replacing a broken connection to %s', self.alias)
+                self.close()
+            else:
+                POOL_METRICS['reuses'] += 1
+        self.acquire_slot()
+
+    def check_in(self):
+        """
+        Gives the slot back at the end of a request, and the connection too
+        when more than MAX_SIZE are open.
+        """
+        size = self.pool['MAX_SIZE']
+        if size and self.connection is not None and not self.in_atomic_block and _open[self.alias] > size:
+            self.close()
+        self.release_slot()
+        with self.pool_lock:
+            self.idle_since = time.monotonic()
+
+    def close_idle(self, now):
+        """
+        Closes the connection if it has been unused for more than IDLE_TIMEOUT
+        seconds. Called from other threads: it only closes the socket (which
+        psycopg2 allows from any thread), the owning thread drops the
+        connection the next time it needs one.
+        """
+        with self.pool_lock:
+            if (
+                self.idle_since is None or self.closed_idle or self.connection is None
+                or self.in_atomic_block or now - self.idle_since <= self.pool['IDLE_TIMEOUT']
+            ):
+                return False
+            try:
+                self.connection.close()
+            except Exception:
+                logger.warning('Could not close an idle connection to %s', self.alias, exc_info=True)
+            self.closed_idle = True
+        count_open(self.alias, -1)
+        POOL_METRICS['idle_closes'] += 1
+        POOL_METRICS['closes'] += 1
+        return True
+
+    def acquire_slot(self):
+        size = self.pool['MAX_SIZE']
+        if not size or self.holds_slot:
+            return
+        start = time.monotonic()
+        if not get_slots(self.alias, size).acquire(timeout=self.pool['TIMEOUT']):
+            POOL_METRICS['timeouts'] += 1
+            raise OperationalError(
+                f"No connection to '{self.alias}' became free within {self.pool['TIMEOUT']}s "
+                f"({size} are in use in this process)."
+            )
+        POOL_METRICS['wait_seconds'] += time.monotonic() - start
+        self.holds_slot = True
+
+    def release_slot(self):
+        if self.holds_slot:
+            self.holds_slot = False
+            get_slots(self.alias, self.pool['MAX_SIZE']).release()
+
+
+def pooled_connections():
+    for conn in connections.all():
+        if isinstance(conn, DatabaseWrapper):
+            yield conn
+
+
+def close_idle_connections():
+    now = time.monotonic()
+    for conn in list(_wrappers):
+        conn.close_idle(now)
+
+
+def checkout_on_first_query(**kwargs):
+    for conn in pooled_connections():
+        conn.checkout_pending = True
+
+
+def check_in(**kwargs):
+    for conn in pooled_connections():
+        conn.checkout_pending = False
+        conn.check_in()
+    close_idle_connections()
+
+
+request_started.connect(checkout_on_first_query)
+request_finished.connect(check_in)
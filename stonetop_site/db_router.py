@@ -0,0 +1,93 @@
+"""
+Sends the reads of safe (GET, HEAD...) requests to the read replica.
+
+Everything else reads from the primary: unsafe requests, requests that
+have written anything, clients that have written in the last
+REPLICA_STICKY_SECONDS (so they read their own writes) and code that
+runs outside of a request (management commands, the shell...).
+Without a 'replica' database everything uses 'default'.
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+REPLICA_DB_ALIAS = 'replica'
+STICKY_COOKIE_NAME = 'use_primary'
+
+# Routing state of the current request (None outside of requests)
+_request_state = ContextVar('replica_request_state', default=None)
+
+
+class RequestState(object):
+    __slots__ = ('use_replica', 'wrote')
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+def replica_configured():
+    """
+    Whether there is a replica other than the primary itself
+    (in tests the replica is a mirror of the primary's test database).
+    """
+    if REPLICA_DB_ALIAS not in settings.DATABASES:
+        return False
+    replica = connections[REPLICA_DB_ALIAS].settings_dict
+    primary = connections[DEFAULT_DB_ALIAS].settings_dict
+    return any(str(replica[key]) != str(primary[key]) for key in ('NAME', 'HOST', 'PORT'))
+
+
+class PrimaryReplicaRouter(object):
+
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if state is not None and state.use_replica and replica_configured():
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            # Read what was just written for the rest of the request
+            state.use_replica = False
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware(object):
+    """
+    Decides for each request whether its reads can go to the replica,
+    and keeps clients on the primary for a while after they wrote.
+    """
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestState(
+            use_replica=request.method in self.safe_methods and STICKY_COOKIE_NAME not in request.COOKIES
+        )
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+
+        if (state.wrote or request.method not in self.safe_methods) and replica_configured():
+            response.set_cookie(
+                STICKY_COOKIE_NAME, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -98,10 +98,13 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'stonetop_site.db_router.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'users.middleware.SessionMetricsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'campaign.middleware.EventLogMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -141,6 +144,51 @@ DATABASES = {
     }
 }
 
+# Set DATABASE_REPLICA_URL (ex: postgres://...) to send the reads of GET requests to a read replica
+if env('DATABASE_REPLICA_URL', default=''):
+    DATABASES['replica'] = env.db('DATABASE_REPLICA_URL')
+    # Tests use the primary's test database for the replica too
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['stonetop_site.db_router.PrimaryReplicaRouter']
+
+# Seconds a client keeps reading from the primary after it wrote something
+REPLICA_STICKY_SECONDS = env.int('REPLICA_STICKY_SECONDS', default=5)
+
+# Persistent connections (see stonetop_site/db_pool/base.py), applied to
+# every database at the end of this file
+DB_CONN_MAX_AGE = env.int('DB_CONN_MAX_AGE', default=600)
+DB_POOL = {
+    # Connections in use at once per process (0: no limit), also the most kept open between requests
+    'MAX_SIZE': env.int('DB_POOL_MAX_SIZE', default=0),
+    # Seconds a request waits for a free connection once MAX_SIZE are in use
+    'TIMEOUT': env.float('DB_POOL_TIMEOUT', default=10),
+    # Seconds a connection can stay unused before it is closed
+    'IDLE_TIMEOUT': env.int('DB_POOL_IDLE_TIMEOUT', default=60),
+    'HEALTH_CHECKS': env.bool('DB_POOL_HEALTH_CHECKS', default=True),
+}
+
+
+# Cache
+# Set CACHE_URL (ex: rediscache://...) to share the cache between workers.
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Caches that only live in one process. A session cached in one worker
+# would outlive a logout handled by another, so they keep sessions in the database.
+LOCAL_CACHES = [
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+]
+
+# With a shared cache, sessions are read from it and fall back to the database on a miss
+if CACHES['default']['BACKEND'] in LOCAL_CACHES:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+else:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -199,6 +247,26 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media/'
 X_FRAME_OPTIONS = 'SAMEORIGIN'
 
+# Memory-mapped rules catalog shared by the workers (see campaign/catalog.py)
+CATALOG_SNAPSHOT_PATH = env('CATALOG_SNAPSHOT_PATH', default=str(BASE_DIR / 'catalog.snapshot'))
+
+# Encounter simulations run from the GM's browser (see campaign/encounters.py).
+# They hold a web worker until they finish: 5000 fights of a party of 6
+# against 12 NPCs take about a third of a second, the budget is a backstop
+# for bigger fights and slower machines.
+ENCOUNTER_DEFAULT_RUNS = env.int('ENCOUNTER_DEFAULT_RUNS', default=5000)
+ENCOUNTER_MAX_RUNS = env.int('ENCOUNTER_MAX_RUNS', default=10000)
+ENCOUNTER_TIME_BUDGET = env.float('ENCOUNTER_TIME_BUDGET', default=1.0)
+
+# Events older than this are compacted into snapshots (see campaign/events.py)
+EVENT_LOG_RETENTION_DAYS = env.int('EVENT_LOG_RETENTION_DAYS', default=90)
+
 # Configure Django App for Heroku.
 import django_on_heroku
 django_on_heroku.settings(locals())
+
+# After django_on_heroku, which can replace DATABASES['default'] with $DATABASE_URL
+for database in DATABASES.values():
+    database['ENGINE'] = 'stonetop_site.db_pool'
+    database['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    database['POOL'] = DB_POOL
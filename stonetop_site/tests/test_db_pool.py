@@ -0,0 +1,129 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.utils import OperationalError
+from django.test import TestCase
+
+from stonetop_site.db_pool.base import DatabaseWrapper, POOL_METRICS, close_idle_connections, reset_slots
+
+
+class ConnectionPoolTests(TestCase):
+
+    def setUp(self):
+        self.before = POOL_METRICS.copy()
+        self.conns = []
+
+    def tearDown(self):
+        for conn in self.conns:
+            conn.close()
+        reset_slots()
+
+    def new_connection(self, **pool):
+        """
+        A connection of its own to the test database (outside of the test's transaction).
+        """
+        conn = connections.create_connection('default')
+        conn.pool.update(pool)
+        self.conns.append(conn)
+        return conn
+
+    def metric(self, name):
+        return POOL_METRICS[name] - self.before[name]
+
+    def test_databases_use_the_pool(self):
+        self.assertIsInstance(connections['default'], DatabaseWrapper)
+        self.assertGreater(connections['default'].settings_dict['CONN_MAX_AGE'], 0)
+
+    def test_requests_check_out_the_connection(self):
+        user = get_user_model().objects.create_user(username='test1234', email='test1234@example.com', password='x')
+        self.client.force_login(user)
+        self.before = POOL_METRICS.copy()
+
+        self.client.get('/campaigns/')
+
+        self.assertEqual(self.metric('checkouts'), 1)
+
+    def test_checkout_reuses_a_healthy_connection(self):
+        conn = self.new_connection()
+        conn.ensure_connection()
+        raw = conn.connection
+
+        conn.checkout_pending = True
+        conn.ensure_connection()
+
+        self.assertIs(conn.connection, raw)
+        self.assertEqual(self.metric('reuses'), 1)
+
+    def test_checkout_replaces_a_broken_connection(self):
+        conn = self.new_connection()
+        conn.ensure_connection()
+        conn.connection.close()
+
+        conn.checkout_pending = True
+        with self.assertLogs('stonetop_site.db_pool.base', 'WARNING'):
+            conn.ensure_connection()
+
+        self.assertTrue(conn.is_usable())
+        self.assertEqual(self.metric('health_check_failures'), 1)
+        self.assertEqual(self.metric('connects'), 2)
+
+    def test_checkout_replaces_an_idle_connection(self):
+        conn = self.new_connection(IDLE_TIMEOUT=60)
+        conn.ensure_connection()
+        raw = conn.connection
+        conn.idle_since = time.monotonic() - 61
+
+        conn.checkout_pending = True
+        conn.ensure_connection()
+
+        self.assertIsNot(conn.connection, raw)
+        self.assertEqual(self.metric('idle_closes'), 1)
+
+    def test_max_size_limits_the_open_connections(self):
+        first = self.new_connection(MAX_SIZE=1, TIMEOUT=0)
+        second = self.new_connection(MAX_SIZE=1, TIMEOUT=0)
+        first.ensure_connection()
+
+        with self.assertRaises(OperationalError):
+            second.ensure_connection()
+        self.assertEqual(self.metric('timeouts'), 1)
+
+        first.close()
+        second.ensure_connection()
+        self.assertTrue(second.is_usable())
+
+    def test_requests_give_their_slot_back(self):
+        conn = self.new_connection(MAX_SIZE=10, TIMEOUT=0)
+        conn.checkout_pending = True
+        conn.ensure_connection()
+        raw = conn.connection
+
+        conn.check_in()
+
+        self.assertFalse(conn.holds_slot)
+        self.assertIs(conn.connection, raw)
+
+    def test_connections_over_max_size_are_closed_after_a_request(self):
+        first = self.new_connection(MAX_SIZE=1, TIMEOUT=0)
+        second = self.new_connection(MAX_SIZE=1, TIMEOUT=0)
+        first.ensure_connection()
+
+        first.check_in()
+
+        self.assertIsNone(first.connection)
+        second.ensure_connection()
+        self.assertTrue(second.is_usable())
+
+    def test_idle_connections_are_closed(self):
+        conn = self.new_connection(IDLE_TIMEOUT=60)
+        conn.ensure_connection()
+        conn.idle_since = time.monotonic() - 61
+
+        close_idle_connections()
+
+        self.assertTrue(conn.closed_idle)
+        self.assertEqual(self.metric('idle_closes'), 1)
+        conn.ensure_connection()
+        self.assertTrue(conn.is_usable())
+        self.assertEqual(self.metric('closes'), 1)
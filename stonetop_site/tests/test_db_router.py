@@ -0,0 +1,112 @@
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from campaign.models import Campaign
+from stonetop_site.db_router import (
+    PrimaryReplicaRouter, ReplicaRoutingMiddleware,
+    REPLICA_DB_ALIAS, STICKY_COOKIE_NAME,
+)
+
+User = get_user_model()
+
+REPLICA_CONFIGURED = REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def reads_then_writes(write):
+    """
+    A view that reports where its reads went (before and after an optional write).
+    """
+    router = PrimaryReplicaRouter()
+
+    def view(request):
+        before = router.db_for_read(Campaign)
+        if write:
+            router.db_for_write(Campaign)
+        return HttpResponse(f'{before} {router.db_for_read(Campaign)}')
+    return view
+
+
+@mock.patch('stonetop_site.db_router.replica_configured', return_value=True)
+class PrimaryReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def get_response(self, request, write=False):
+        return ReplicaRoutingMiddleware(reads_then_writes(write))(request)
+
+    def test_get_reads_from_the_replica(self, configured):
+        response = self.get_response(self.factory.get('/'))
+
+        self.assertEqual(response.content.decode(), 'replica replica')
+        self.assertNotIn(STICKY_COOKIE_NAME, response.cookies)
+
+    def test_post_reads_from_the_primary_and_sets_the_cookie(self, configured):
+        response = self.get_response(self.factory.post('/'))
+
+        self.assertEqual(response.content.decode(), 'default default')
+        self.assertEqual(response.cookies[STICKY_COOKIE_NAME]['max-age'], settings.REPLICA_STICKY_SECONDS)
+
+    def test_get_reads_from_the_primary_after_a_write(self, configured):
+        response = self.get_response(self.factory.get('/'), write=True)
+
+        self.assertEqual(response.content.decode(), 'replica default')
+        self.assertIn(STICKY_COOKIE_NAME, response.cookies)
+
+    def test_get_with_the_cookie_reads_from_the_primary(self, configured):
+        request = self.factory.get('/')
+        request.COOKIES[STICKY_COOKIE_NAME] = '1'
+
+        response = self.get_response(request)
+
+        self.assertEqual(response.content.decode(), 'default default')
+
+    def test_reads_outside_of_requests_use_the_primary(self, configured):
+        self.assertEqual(PrimaryReplicaRouter().db_for_read(Campaign), 'default')
+
+    def test_without_a_replica_everything_uses_the_primary(self, configured):
+        configured.return_value = False
+
+        response = self.get_response(self.factory.post('/'))
+
+        self.assertEqual(response.content.decode(), 'default default')
+        self.assertNotIn(STICKY_COOKIE_NAME, response.cookies)
+
+
+@skipUnless(REPLICA_CONFIGURED, 'DATABASE_REPLICA_URL is not set')
+@mock.patch('stonetop_site.db_router.replica_configured', return_value=True)
+class ReplicaDatabaseTests(TransactionTestCase):
+    """
+    The test replica mirrors the primary's database through its own connection.
+    """
+    # The runner sets up every database a test case names, even when it is skipped
+    databases = {'default', REPLICA_DB_ALIAS} if REPLICA_CONFIGURED else {'default'}
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='test1234', email='test1234@example.com', password='x')
+        self.client.force_login(self.user)
+
+    def test_campaign_list_reads_from_the_replica(self, configured):
+        Campaign.objects.create(gm=self.user, name='Stonetop', code='1234', status='Open')
+
+        with CaptureQueriesContext(connections[REPLICA_DB_ALIAS]) as replica_queries:
+            response = self.client.get(reverse('campaign-list'))
+
+        self.assertContains(response, 'Stonetop')
+        self.assertGreater(len(replica_queries), 0)
+
+    def test_client_reads_from_the_primary_after_creating_a_campaign(self, configured):
+        self.client.post(reverse('create-campaign'), data={'name': 'Stonetop', 'code': '1234', 'status': 'Open'})
+
+        with CaptureQueriesContext(connections[REPLICA_DB_ALIAS]) as replica_queries:
+            response = self.client.get(reverse('campaign-list'))
+
+        self.assertContains(response, 'Stonetop')
+        self.assertEqual(len(replica_queries), 0)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -49,4 +50,32 @@ class TestRegisterPage(TestCase):
     def test_view_accessible_by_name(self):
         response = self.client.get(reverse('register'))
         self.assertEqual(response.status_code, 200)
-    
\ No newline at end of file
+    
+
+class MetricsViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user(username='player', email='player@example.com', password='x')
+        cls.staff = User.objects.create_user(username='staff', email='staff@example.com', password='x')
+        User.objects.filter(pk=cls.staff.pk).update(is_staff=True)
+
+    def test_staff_get_the_session_metrics(self):
+        self.client.force_login(self.staff)
+
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('requests', response.json()['sessions'])
+        self.assertIn('checkouts', response.json()['db_pool'])
+
+    def test_players_cannot_see_the_metrics(self):
+        self.client.force_login(self.player)
+
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_sessions_stay_in_the_database_with_a_local_cache(self):
+        self.assertIn(settings.CACHES['default']['BACKEND'], settings.LOCAL_CACHES)
+        self.assertEqual(settings.SESSION_ENGINE, 'django.contrib.sessions.backends.db')
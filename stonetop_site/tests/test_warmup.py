@@ -0,0 +1,9 @@
+from django.test import TestCase
+
+from stonetop_site.warmup import compile_templates
+
+
+class WarmUpTests(TestCase):
+
+    def test_compile_templates_compiles_project_templates(self):
+        self.assertGreater(compile_templates(), 0)
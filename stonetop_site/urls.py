@@ -18,7 +18,7 @@ from django.urls import path, include, re_path
 from django.contrib.auth import views as auth_views
 
 from .views import (
-    LoginView, RegisterView, HomePageView, 
+    LoginView, RegisterView, HomePageView, MetricsView,
     ResetPasswordView, ResetPasswordConfirmView,
     password_reset_request
 )
@@ -27,6 +27,7 @@ from .forms import ResetPasswordForm
 urlpatterns = [
     path('', HomePageView.as_view(), name='home'),
     path('admin/', admin.site.urls),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path('summernote/', include('django_summernote.urls')),
     path('campaigns/', include('campaign.urls')),
     path('users/', include('users.urls')),
@@ -1,9 +1,11 @@
+import os
+
 from django.contrib.auth import views as auth_views
 from django.views.generic import CreateView, TemplateView
 from django.urls import reverse_lazy
 from django.shortcuts import render, redirect
 from django.core.mail import send_mail, BadHeaderError
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.contrib.auth.forms import PasswordResetForm
 from django.template.loader import render_to_string
 from django.db.models.query_utils import Q
@@ -12,6 +14,11 @@ from django.contrib.auth.tokens import default_token_generator
 from django.utils.encoding import force_bytes
 from django.contrib.auth import get_user_model
 from django.contrib import messages
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.views import View
+
+from users.middleware import SESSION_METRICS
+from stonetop_site.db_pool.base import pool_metrics
 
 from .forms import LoginForm, RegisterForm, ResetPasswordForm
 from .settings import (
@@ -36,6 +43,24 @@ class HomePageView(TemplateView):
     template_name = 'home.html'
 
 
+class MetricsView(UserPassesTestMixin, View):
+    """
+    The running totals of the worker process that handles the request,
+    for staff only. Every worker counts on its own.
+    """
+    login_url = reverse_lazy('login')
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({
+            'pid': os.getpid(),
+            'sessions': dict(SESSION_METRICS),
+            'db_pool': pool_metrics(),
+        })
+
+
 class ResetPasswordView(auth_views.PasswordResetView):
     template_name= 'password/password_reset.html'
     email_template_name = "password/password_reset_email.html"
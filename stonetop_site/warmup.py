@@ -0,0 +1,48 @@
+"""
+Loads the shared, read-only data in the app server's master process before
+the workers are forked, so every worker shares it copy-on-write.
+"""
+import logging
+from pathlib import Path
+
+from django.db import connections
+from django.template import engines, TemplateDoesNotExist, TemplateSyntaxError
+
+
+logger = logging.getLogger(__name__)
+
+
+def compile_templates():
+    """
+    Compiles every project and app template into the cached template loader.
+    """
+    count = 0
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            directory = Path(directory)
+            for path in directory.rglob('*.html'):
+                try:
+                    engine.get_template(path.relative_to(directory).as_posix())
+                    count += 1
+                except (TemplateDoesNotExist, TemplateSyntaxError):
+                    logger.warning('Could not compile template %s', path)
+    return count
+
+
+def warm_up():
+    """
+    Maps the catalog snapshot and compiles the templates.
+    The database connections are closed afterwards since
+    they must not be shared with the forked workers.
+    """
+    from campaign.catalog import get_catalog
+
+    try:
+        get_catalog()
+    except Exception:
+        # The workers will build the snapshot themselves on first use
+        logger.exception('Could not load the catalog snapshot')
+    finally:
+        connections.close_all()
+    count = compile_templates()
+    logger.info('Compiled %s templates', count)
@@ -0,0 +1,46 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    """
+    Deletes expired sessions in small batches so that
+    the session table is never locked for long.
+    """
+    help = 'Deletes expired sessions from the database in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of sessions to delete per batch.',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help='Seconds to wait between batches.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        sleep = options['sleep']
+        now = timezone.now()
+        expired_keys = Session.objects.filter(
+            expire_date__lt=now
+        ).values_list('session_key', flat=True)
+
+        total = 0
+        batches = 0
+        while True:
+            # Each batch is deleted in its own short transaction
+            keys = list(expired_keys[:batch_size])
+            if not keys:
+                break
+            deleted, _ = Session.objects.filter(session_key__in=keys).delete()
+            total += deleted
+            batches += 1
+            if sleep:
+                time.sleep(sleep)
+
+        self.stdout.write(f'Deleted {total} expired sessions in {batches} batches.')
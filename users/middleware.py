@@ -0,0 +1,34 @@
+import logging
+from collections import Counter
+
+
+logger = logging.getLogger(__name__)
+
+# Running totals of session reads and writes for this process (served at /metrics/)
+SESSION_METRICS = Counter()
+
+
+class SessionMetricsMiddleware(object):
+    """
+    Records whether each request read from or wrote to the session.
+    Needs to come after the SessionMiddleware.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        session = getattr(request, 'session', None)
+        if session is None:
+            return response
+
+        reads = int(session.accessed)
+        writes = int(session.modified)
+        SESSION_METRICS['requests'] += 1
+        SESSION_METRICS['reads'] += reads
+        SESSION_METRICS['writes'] += writes
+        logger.debug(
+            'session reads=%s writes=%s path=%s',
+            reads, writes, request.path,
+        )
+        return response
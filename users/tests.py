@@ -1,7 +1,15 @@
+from datetime import timedelta
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 
 from campaign.tests.test_views.base_views import BaseViewsTestClass
+from users.middleware import SESSION_METRICS
 
 User = get_user_model()
 
@@ -29,3 +37,43 @@ class UserAccountPageTests(BaseViewsTestClass):
         self.assertRedirects(response, f'/login/?next=/users/{self.testuser.pk}/')
 
 
+
+
+class PurgeSessionsCommandTests(TestCase):
+
+    def create_sessions(self, count, expire_date):
+        Session.objects.bulk_create([
+            Session(session_key=f'{expire_date:%Y%m%d%H%M%S}{i}', session_data='', expire_date=expire_date)
+            for i in range(count)
+        ])
+
+    def test_purge_sessions_deletes_only_expired_sessions(self):
+        self.create_sessions(5, timezone.now() - timedelta(days=1))
+        self.create_sessions(2, timezone.now() + timedelta(days=1))
+        out = StringIO()
+
+        call_command('purge_sessions', '--batch-size=2', stdout=out)
+
+        self.assertEqual(Session.objects.count(), 2)
+        self.assertIn('Deleted 5 expired sessions in 3 batches.', out.getvalue())
+
+
+class SessionMetricsMiddlewareTests(BaseViewsTestClass):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.testuser = User.objects.create(
+            username='testuser',
+            email='player1@test.com',
+            password='109wdmgbowei8idj',
+        )
+
+    def test_session_reads_and_writes_are_counted(self):
+        self.login_user(self.testuser)
+        before = SESSION_METRICS.copy()
+
+        self.client.get(f'/users/{self.testuser.pk}/')
+
+        self.assertEqual(SESSION_METRICS['requests'] - before['requests'], 1)
+        self.assertEqual(SESSION_METRICS['reads'] - before['reads'], 1)
+        self.assertEqual(SESSION_METRICS['writes'] - before['writes'], 0)